@@ -0,0 +1,77 @@
+import csv
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from absl import app, flags
+
+from scenario import load_team
+from solver import Solver, split_cores
+
+# Parámetros de la línea de comandos
+_SCENARIO_DIR = flags.DEFINE_string("scenario_dir", "scenarios", "Directory with the scenario files (*.json).")
+_PROCESSES = flags.DEFINE_integer("processes", 0, "Number of parallel processes (0 = one per core, "
+                                                  "at most one per scenario).")
+_TIME_LIMIT = flags.DEFINE_float("time_limit", 10.0, "Default time limit per scenario in seconds, unless the "
+                                                     "scenario sets its own 'time_limit'.")
+_SUMMARY = flags.DEFINE_string("summary", "summary.json", "Output file for the summary (.json or .csv).")
+
+
+def solve_scenario(path, time_limit, num_workers):
+    """Resuelve un escenario en el proceso actual y devuelve su resumen."""
+    start = time.perf_counter()
+    summary = {"scenario": Path(path).name, "status": "ERROR", "objective": None, "wall_time": None}
+    try:
+        with open(path, encoding="utf-8") as scenario_file:
+            time_limit = json.load(scenario_file).get("time_limit", time_limit)
+        model = load_team(path).build_model()
+        solver = Solver(model)
+        status = solver.solve(f"max_time_in_seconds:{time_limit},num_workers:{num_workers}", "",
+                              log_solutions=False)
+        summary["status"] = solver.solver.status_name(status)
+        if solver.solver.response_proto.solution:
+            summary["objective"] = solver.solver.objective_value
+    except (ValueError, KeyError, TypeError, OSError) as error:
+        summary["status"] = f"ERROR: {type(error).__name__}: {error}"
+    summary["wall_time"] = round(time.perf_counter() - start, 3)
+    return summary
+
+
+def solve_all(paths, time_limit, processes=0):
+    """Resuelve los escenarios en paralelo con un ProcessPoolExecutor."""
+    processes, num_workers = split_cores(len(paths), processes)
+    print(f"Solving {len(paths)} scenarios with {processes} processes x {num_workers} workers")
+    summaries = []
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(solve_scenario, str(path), time_limit, num_workers) for path in paths]
+        for future in as_completed(futures):
+            summary = future.result()
+            print(f"  {summary['scenario']}: {summary['status']}, objective={summary['objective']}, "
+                  f"wall_time={summary['wall_time']}s")
+            summaries.append(summary)
+    return sorted(summaries, key=lambda summary: summary["scenario"])
+
+
+def write_summary(summaries, path):
+    """Escribe el resumen en JSON o en CSV según la extensión."""
+    with open(path, "w", encoding="utf-8", newline="") as summary_file:
+        if path.endswith(".csv"):
+            writer = csv.DictWriter(summary_file, fieldnames=["scenario", "status", "objective", "wall_time"])
+            writer.writeheader()
+            writer.writerows(summaries)
+        else:
+            json.dump(summaries, summary_file, ensure_ascii=False, indent=2)
+
+
+def main(_):
+    paths = sorted(Path(_SCENARIO_DIR.value).glob("*.json"))
+    if not paths:
+        raise app.UsageError(f"No scenarios found in {_SCENARIO_DIR.value}")
+    summaries = solve_all(paths, _TIME_LIMIT.value, _PROCESSES.value)
+    write_summary(summaries, _SUMMARY.value)
+    print(f"Summary written to {_SUMMARY.value}")
+
+
+if __name__ == "__main__":
+    app.run(main)
@@ -0,0 +1,647 @@
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from absl import app, flags
+from ortools.sat.python import cp_model
+
+from constraint import Constraint
+from day_index import DayIndex
+from export import schedule_table, write_calendars, write_table
+from heuristic import GreedyRoster
+from instrumentation import solve_recorded
+from lns import LargeNeighborhoodSearch
+from mappings import Mappings
+from model import Model
+from progress import ProgressRecorder
+from proto_io import load_model
+from rolling_horizon import RollingHorizon, window_inputs
+from scenario import load_team
+from scenario_generator import generate_scenario, scaled_scenario
+from solver import Solver
+
+# Parámetros de la línea de comandos
+_EMPLOYEES = flags.DEFINE_integer("employees", 200, "Number of employees of the generated instance.")
+_WEEKS = flags.DEFINE_integer("weeks", 12, "Number of weeks of the generated instance.")
+_TIME_LIMIT = flags.DEFINE_float("time_limit", 10.0, "Time limit of each solve in seconds.")
+_WORKERS = flags.DEFINE_integer("workers", 8, "Number of CP-SAT search workers.")
+_REPLAY_PROTO = flags.DEFINE_string("replay_proto", "", "Model dumped with --output_proto to solve instead.")
+_COMPACT = flags.DEFINE_bool("compact", False, "Compare the compact cover and weekly sum encoding with the "
+                                              "default one instead.")
+_OBJECTIVE_TERMS = flags.DEFINE_integer("objective_terms", 0, "Micro-benchmark of the objective construction "
+                                                              "with this many terms instead.")
+_SYMMETRY = flags.DEFINE_bool("symmetry", False, "Compare the lexicographic symmetry breaking with the plain "
+                                                "model on generated scenarios instead.")
+_GREEDY = flags.DEFINE_bool("greedy", False, "Compare the solve with and without the greedy roster as hint "
+                                            "instead.")
+_LNS = flags.DEFINE_bool("lns", False, "Compare the large neighborhood search from the greedy roster with a "
+                                        "single solve on a generated scenario instead.")
+_STARTUP = flags.DEFINE_string("startup", "", "Compare the startup time of the cli.py subcommands on this "
+                                               "scenario file with importing main.py instead.")
+_LOADER = flags.DEFINE_integer("loader", 0, "Time loading a team scenario with this many requests (and a third "
+                                            "as many fixed assignments) from CSV with --employees and --weeks "
+                                            "instead.")
+_PROFILES = flags.DEFINE_bool("profiles", False, "Compare the model of a team where only some employees can work "
+                                                  "nights with the uniform model instead.")
+_PRESOLVE = flags.DEFINE_float("presolve", 0.0, "Compare the model with and without the presolve of fixed "
+                                                "assignments when this fraction of the days is fixed instead.")
+_DAY_INDEX = flags.DEFINE_bool("day_index", False, "Compare recurring fixed assignments and requests stored as "
+                                                  "patterns in a DayIndex with the expanded lists instead.")
+_EXPORT = flags.DEFINE_bool("export", False, "Time the schedule exporters against writing the rows one by one on "
+                                            "a greedy roster of --employees and --weeks instead.")
+_WINDOW_WEEKS = flags.DEFINE_integer("window_weeks", 0, "Compare a rolling horizon of this many weeks with a "
+                                                        "monolithic solve instead.")
+
+
+def run_instance(num_employees, num_weeks, inputs, time_limit, num_workers):
+    """Construye y resuelve una instancia, devolviendo sus métricas."""
+    start = time.perf_counter()
+    model = Model.build(num_employees, num_weeks, inputs)
+    build_time = time.perf_counter() - start
+
+    proto = model.model.Proto()
+    solver, status, history = solve_recorded(model.model, time_limit, num_workers)
+    return {
+        "variables": len(proto.variables),
+        "constraints": len(proto.constraints),
+        "proto_bytes": proto.ByteSize(),
+        "build_time": build_time,
+        "first_solution_time": history[0][0] if history else None,
+        "solve_time": solver.wall_time,
+        "status": solver.status_name(status),
+        "objective": history[-1][1] if history else None,
+    }
+
+
+def print_results(title, results):
+    """Imprime una tabla comparativa con una columna por variante."""
+    print(f"=== {title} ===")
+    print(f"{'':<22}| " + " | ".join(f"{name:<14}" for name in results) + " |")
+    for metric in next(iter(results.values())):
+        cells = []
+        for result in results.values():
+            value = result[metric]
+            cells.append(f"{value:<14.3f}" if isinstance(value, float) else f"{str(value):<14}")
+        print(f"{metric:<22}| " + " | ".join(cells) + " |")
+    print()
+
+
+def benchmark_sequence_encodings(num_employees, num_weeks, time_limit, num_workers):
+    """Compara la codificación por spans con la del autómata."""
+    results = {}
+    for encoding in Constraint.SEQUENCE_ENCODINGS:
+        inputs = scaled_scenario(num_employees, encoding)
+        results[encoding] = run_instance(num_employees, num_weeks, inputs, time_limit, num_workers)
+    print_results(f"Sequence encodings ({num_employees} employees, {num_weeks} weeks)", results)
+
+
+def benchmark_rolling_horizon(num_employees, num_weeks, window_weeks, time_limit, num_workers):
+    """Compara el horizonte deslizante con la resolución monolítica con el mismo tiempo total."""
+    inputs = scaled_scenario(num_employees)
+    monolithic = run_instance(num_employees, num_weeks, inputs, time_limit, num_workers)
+
+    # El tiempo total se reparte entre las ventanas
+    num_windows = max(num_weeks - window_weeks + 1, 1)
+    params = f"max_time_in_seconds:{time_limit / num_windows},num_workers:{num_workers}"
+    start = time.perf_counter()
+    rolling = RollingHorizon(num_employees, num_weeks, inputs, window_weeks)
+    status, schedule = rolling.solve(params)
+    runtime = time.perf_counter() - start
+    objective = None
+    if schedule is not None:
+        solver, _ = rolling.evaluate(schedule)
+        objective = solver.solver.objective_value
+
+    print_results(f"Rolling horizon ({num_employees} employees, {num_weeks} weeks)", {
+        "monolithic": {
+            "runtime": monolithic["build_time"] + monolithic["solve_time"],
+            "status": monolithic["status"],
+            "objective": monolithic["objective"],
+        },
+        f"rolling({window_weeks}w)": {
+            "runtime": runtime,
+            "status": cp_model.CpSolver().status_name(status),
+            "objective": objective,
+        },
+    })
+
+
+def presolve_time(model, num_workers):
+    """Tiempo que tarda CP-SAT en el presolve del modelo, sin buscar soluciones."""
+    solver = cp_model.CpSolver()
+    solver.parameters.stop_after_presolve = True
+    solver.parameters.num_workers = num_workers
+    solver.solve(model.model)
+    return solver.wall_time
+
+
+def benchmark_compact_encoding(num_employees, num_weeks, time_limit, num_workers):
+    """Compara la codificación compacta de cobertura y sumas semanales con la original.
+
+    Las penalizaciones de la codificación compacta solo están acotadas por debajo, así
+    que una solución factible no óptima puede sobrestimarlas. Para comparar ambas, el
+    horario obtenido con cada codificación se evalúa además con las dos codificaciones.
+    """
+    inputs = scaled_scenario(num_employees)
+    params = f"max_time_in_seconds:{time_limit},num_workers:{num_workers}"
+    results = {}
+    schedules = {}
+    for compact in (False, True):
+        start = time.perf_counter()
+        model = Model.build(num_employees, num_weeks, inputs, compact=compact)
+        build_time = time.perf_counter() - start
+        proto = model.model.Proto()
+        solver = Solver(model)
+        status = solver.solve(params, "", log_solutions=False)
+        has_solution = bool(solver.solver.response_proto.solution)
+        name = "compact" if compact else "default"
+        results[name] = {
+            "variables": len(proto.variables),
+            "constraints": len(proto.constraints),
+            "build_time": build_time,
+            "presolve_time": presolve_time(model, num_workers),
+            "status": solver.solver.status_name(status),
+            "objective": solver.solver.objective_value if has_solution else None,
+        }
+        schedules[name] = solver.schedule_matrix() if has_solution else None
+
+    for name, schedule in schedules.items():
+        for compact in (False, True):
+            objective = None
+            if schedule is not None:
+                solver = Solver(Model.build(num_employees, num_weeks, inputs, compact=compact))
+                solver.freeze_weeks(schedule, range(num_weeks))
+                solver.solve(f"num_workers:{num_workers}", "", log_solutions=False)
+                objective = solver.solver.objective_value
+            results[name]["eval_compact" if compact else "eval_default"] = objective
+    print_results(f"Compact encoding ({num_employees} employees, {num_weeks} weeks)", results)
+
+
+def measure(build):
+    """Tiempo y pico de memoria de Python de build().
+
+    La memoria se mide en una segunda llamada, porque tracemalloc ralentiza la primera.
+    """
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"time": elapsed, "peak_memory_mb": peak / (1 << 20)}
+
+
+def benchmark_objective(num_terms):
+    """Compara el objetivo construido con sum() de Python y con LinearExpr.weighted_sum.
+
+    La mitad de los términos son literales (como las penalizaciones de las secuencias)
+    y la otra mitad variables enteras (como los excesos de cobertura).
+    """
+    model = cp_model.CpModel()
+    bool_vars = [model.new_bool_var("") for _ in range(num_terms // 2)]
+    int_vars = [model.new_int_var(0, 7, "") for _ in range(num_terms - num_terms // 2)]
+    bool_coeffs = [i % 7 + 1 for i in range(len(bool_vars))]
+    int_coeffs = [i % 5 + 1 for i in range(len(int_vars))]
+
+    def python_sum():
+        model.minimize(
+            sum(bool_vars[i] * bool_coeffs[i] for i in range(len(bool_vars)))
+            + sum(int_vars[i] * int_coeffs[i] for i in range(len(int_vars)))
+        )
+
+    def weighted_sum():
+        model.minimize(cp_model.LinearExpr.weighted_sum(bool_vars + int_vars, bool_coeffs + int_coeffs))
+
+    print_results(f"Objective construction ({num_terms} terms)", {
+        "sum": measure(python_sum),
+        "weighted_sum": measure(weighted_sum),
+    })
+
+
+def benchmark_symmetry_breaking(num_employees, num_weeks, time_limit, num_workers, seeds=range(3)):
+    """Compara el tiempo hasta probar el óptimo con y sin ruptura de simetrías.
+
+    Los escenarios se generan sin asignaciones fijas ni peticiones, de modo que
+    todos los empleados son intercambiables.
+    """
+    params = f"max_time_in_seconds:{time_limit},num_workers:{num_workers}"
+    for seed in seeds:
+        _, _, inputs = generate_scenario(num_employees, num_weeks, seed=seed, fixed_rate=0, request_rate=0)
+        results = {}
+        for symmetry_breaking in (False, True):
+            start = time.perf_counter()
+            model = Model.build(num_employees, num_weeks, inputs, symmetry_breaking=symmetry_breaking)
+            build_time = time.perf_counter() - start
+            solver = Solver(model)
+            status = solver.solve(params, "", log_solutions=False)
+            results["lex" if symmetry_breaking else "plain"] = {
+                "constraints": len(model.model.Proto().constraints),
+                "build_time": build_time,
+                "solve_time": solver.solver.wall_time,
+                "status": solver.solver.status_name(status),
+                "objective": solver.solver.objective_value,
+                "bound": solver.solver.best_objective_bound,
+            }
+        print_results(f"Symmetry breaking ({num_employees} employees, {num_weeks} weeks, seed {seed})", results)
+
+
+def benchmark_greedy_hint(num_employees, num_weeks, time_limit, num_workers):
+    """Compara la primera solución y el objetivo final con y sin la pista de la heurística."""
+    inputs = scaled_scenario(num_employees)
+    params = f"max_time_in_seconds:{time_limit},num_workers:{num_workers}"
+    model = Model.build(num_employees, num_weeks, inputs)
+
+    start = time.perf_counter()
+    schedule = GreedyRoster(num_employees, num_weeks, inputs).build()
+    greedy_time = time.perf_counter() - start
+    results = {}
+    for hint in (False, True):
+        solver = Solver(model)
+        model.model.clear_hints()
+        if hint:
+            solver.add_schedule_hint(schedule)
+        progress = ProgressRecorder(model, verbose=False)
+        status = solver.solve(params, "", progress=progress)
+        history = progress.history
+        results["greedy_hint" if hint else "no_hint"] = {
+            "greedy_time": greedy_time if hint else 0.0,
+            "first_solution_time": history[0]["time"] if history else None,
+            "first_objective": history[0]["objective"] if history else None,
+            "status": solver.solver.status_name(status),
+            "objective": history[-1]["objective"] if history else None,
+        }
+    print_results(f"Greedy hint ({num_employees} employees, {num_weeks} weeks)", results)
+
+
+def benchmark_rule_profiles(num_employees, num_weeks, time_limit, num_workers, qualified_fraction=2 / 3):
+    """Compara el modelo uniforme con el de un equipo en el que solo algunos hacen noches.
+
+    Sin variables de noche para el resto, las reglas de secuencia, semanales y de
+    transición sobre la noche solo se generan para los empleados que pueden hacerla.
+    """
+    inputs = scaled_scenario(num_employees)
+    eligible = np.ones((num_employees, 4), dtype=bool)
+    eligible[int(num_employees * qualified_fraction):, 3] = False
+    results = {}
+    for name, options in (("uniform", {}), ("night_qualified", {"eligible": eligible})):
+        start = time.perf_counter()
+        model = Model.build(num_employees, num_weeks, inputs, **options)
+        build_time = time.perf_counter() - start
+        proto = model.model.Proto()
+        solver = Solver(model)
+        solver.add_schedule_hint(GreedyRoster(num_employees, num_weeks, inputs, eligible=model.eligible).build())
+        status = solver.solve(f"max_time_in_seconds:{time_limit},num_workers:{num_workers}", "")
+        has_solution = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        results[name] = {
+            "variables": len(proto.variables),
+            "constraints": len(proto.constraints),
+            "objective_terms": len(model.obj_bool_vars) + len(model.obj_int_vars),
+            "build_time": build_time,
+            "status": solver.solver.status_name(status),
+            "objective": solver.solver.objective_value if has_solution else None,
+        }
+    print_results(f"Rule profiles ({num_employees} employees, {num_weeks} weeks, "
+                  f"{int(num_employees * qualified_fraction)} night-qualified)", results)
+
+
+def benchmark_presolve(num_employees, num_weeks, fixed_fraction, time_limit, num_workers):
+    """Compara el modelo con y sin el presolve de las asignaciones fijas.
+
+    Se fija una fracción de los días (empleado, día) al turno que les da el horario
+    de la heurística, como si fueran asignaciones ya publicadas o vacaciones.
+    """
+    inputs = scaled_scenario(num_employees)
+    schedule = GreedyRoster(num_employees, num_weeks, inputs).build()
+    rng = np.random.default_rng(0)
+    cells = np.argwhere(rng.random(schedule.shape) < fixed_fraction)
+    inputs["fixed_assignments"] = [(e, int(schedule[e, d]), d) for e, d in cells.tolist()]
+    results = {}
+    for presolve in (False, True):
+        start = time.perf_counter()
+        model = Model.build(num_employees, num_weeks, inputs, presolve=presolve)
+        build_time = time.perf_counter() - start
+        proto = model.model.Proto()
+        solver = Solver(model)
+        solver.add_schedule_hint(schedule)
+        progress = ProgressRecorder(model, verbose=False)
+        status = solver.solve(f"max_time_in_seconds:{time_limit},num_workers:{num_workers}", "", progress=progress)
+        history = progress.history
+        results["presolve" if presolve else "plain"] = {
+            "variables": len(proto.variables),
+            "constraints": len(proto.constraints),
+            "build_time": build_time,
+            "first_solution_time": history[0]["time"] if history else None,
+            "status": solver.solver.status_name(status),
+            "objective": history[-1]["objective"] if history else None,
+        }
+    print_results(f"Presolve ({num_employees} employees, {num_weeks} weeks, {len(cells)} fixed days)", results)
+    print(model.presolve_summary())
+
+
+def recurring_inputs(num_employees, num_weeks):
+    """Asignaciones fijas y peticiones recurrentes como DayIndex y como las listas equivalentes.
+
+    Cada empleado libra un día fijo entre semana y un fin de semana de cada dos,
+    pide una noche por semana y el equipo entero prefiere librar dos festivos.
+    """
+    num_days = num_weeks * 7
+    fixed = DayIndex(num_employees, num_days)
+    requests = DayIndex(num_employees, num_days, weighted=True)
+    for e in range(num_employees):
+        fixed.add_pattern(e, 0, weekdays=[e % 5])
+        fixed.add_pattern(e, 0, first=e % 2 * 7, weekdays=[5, 6], every=2)
+        requests.add_pattern(e, 3, weekdays=[(e + 2) % 5], weight=-1)
+    requests.add_dates(None, 0, [num_days // 3, 2 * num_days // 3], weight=-2)
+    return fixed, requests
+
+
+def benchmark_day_index(num_employees, num_weeks, window_weeks=4):
+    """Compara las entradas recurrentes guardadas como patrones con las listas expandidas.
+
+    Se mide la creación de las entradas, el recorte a las ventanas del horizonte
+    deslizante, la heurística y la construcción del modelo con presolve, que debe
+    dar el mismo proto con las dos representaciones.
+    """
+    base = scaled_scenario(num_employees)
+    variants = {
+        "lists": lambda: tuple(list(entries) for entries in recurring_inputs(num_employees, num_weeks)),
+        "day_index": lambda: recurring_inputs(num_employees, num_weeks),
+    }
+    results = {}
+    protos = []
+    for name, create in variants.items():
+        result = {f"create_{key}": value for key, value in measure(create).items()}
+        inputs = dict(base)
+        inputs["fixed_assignments"], inputs["requests"] = create()
+        result["stored_items"] = sum(len(entries.sources) if isinstance(entries, DayIndex) else len(entries)
+                                     for entries in (inputs["fixed_assignments"], inputs["requests"]))
+        start = time.perf_counter()
+        for first_week in range(num_weeks):
+            window_inputs(inputs, first_week * 7, window_weeks * 7)
+        result["windows_time"] = time.perf_counter() - start
+        start = time.perf_counter()
+        GreedyRoster(num_employees, num_weeks, inputs).build()
+        result["greedy_time"] = time.perf_counter() - start
+        start = time.perf_counter()
+        model = Model.build(num_employees, num_weeks, inputs, presolve=True)
+        result["build_time"] = time.perf_counter() - start
+        protos.append(model.model.Proto())
+        results[name] = result
+    for result in results.values():
+        result["same_proto"] = protos[0] == protos[1]
+    print_results(f"DayIndex ({num_employees} employees, {num_weeks} weeks)", results)
+
+
+def benchmark_export(num_employees, num_weeks, repeats=3):
+    """Compara los exportadores (tabla por columnas, bloques formateados) con escribir fila a fila.
+
+    La referencia recorre la matriz del horario celda a celda y escribe cada fila
+    con csv.DictWriter o json.dumps, como se haría partiendo de los bucles de
+    impresión.
+    """
+    inputs = scaled_scenario(num_employees)
+    schedule = GreedyRoster(num_employees, num_weeks, inputs).build()
+    employee_names = [f"Employee {e}" for e in range(num_employees)]
+    start = np.datetime64("2025-01-06")
+
+    def row_by_row(path):
+        columns = ["employee_id", "employee", "day", "week", "date", "shift_id", "shift"]
+        with open(path, "w", encoding="utf-8", newline="") as table_file:
+            writer = None
+            if path.endswith(".csv"):
+                writer = csv.DictWriter(table_file, columns, lineterminator="\n")
+                writer.writeheader()
+            for e in range(num_employees):
+                for d in range(num_weeks * 7):
+                    s = int(schedule[e, d])
+                    if s == 0:
+                        continue
+                    row = {"employee_id": e, "employee": employee_names[e], "day": d, "week": d // 7 + 1,
+                           "date": str(start + d), "shift_id": s, "shift": Mappings.SHIFT_NAMES[s]}
+                    if writer:
+                        writer.writerow(row)
+                    else:
+                        table_file.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for suffix in (".csv", ".jsonl"):
+            path = os.path.join(directory, "schedule" + suffix)
+            times, baseline_times = [], []
+            for _ in range(repeats):
+                begin = time.perf_counter()
+                write_table(path, schedule_table(schedule, employee_names=employee_names, start_date="2025-01-06"))
+                times.append(time.perf_counter() - begin)
+                exported = os.path.getsize(path)
+                begin = time.perf_counter()
+                row_by_row(path)
+                baseline_times.append(time.perf_counter() - begin)
+            results[suffix.lstrip(".")] = {
+                "export_time": float(np.median(times)),
+                "row_by_row_time": float(np.median(baseline_times)),
+                "same_size": exported == os.path.getsize(path),
+            }
+        begin = time.perf_counter()
+        write_calendars(os.path.join(directory, "calendars"), schedule, employee_names=employee_names,
+                        start_date="2025-01-06")
+        results["ics"] = {"export_time": time.perf_counter() - begin, "row_by_row_time": None, "same_size": None}
+    print_results(f"Export ({num_employees} employees, {num_weeks} weeks, "
+                  f"{int((schedule != 0).sum())} shifts)", results)
+
+
+def benchmark_lns(num_employees, num_weeks, time_limit, num_workers):
+    """Compara el objetivo de una resolución única con el de la LNS con el mismo tiempo.
+
+    Ambas parten de la pista del horario de la heurística; la LNS usa num_workers
+    hilos con un trabajador de CP-SAT cada uno.
+    """
+    _, _, inputs = generate_scenario(num_employees, num_weeks)
+    model = Model.build(num_employees, num_weeks, inputs)
+    schedule = GreedyRoster(num_employees, num_weeks, inputs).build()
+
+    solver = Solver(model)
+    solver.add_schedule_hint(schedule)
+    progress = ProgressRecorder(model, verbose=False)
+    status = solver.solve(f"max_time_in_seconds:{time_limit},num_workers:{num_workers}", "", progress=progress)
+    history = progress.history
+    results = {"single_solve": {
+        "status": solver.solver.status_name(status),
+        "objective": history[-1]["objective"] if history else None,
+    }}
+    model.model.clear_hints()
+
+    lns = LargeNeighborhoodSearch(model, num_workers=num_workers)
+    _, objective = lns.run(schedule, time_limit)
+    results["lns"] = {
+        "status": "FEASIBLE" if objective is not None else "UNKNOWN",
+        "objective": objective,
+        "initial_objective": lns.history[0]["objective"] if lns.history else None,
+        "improvements": max(len(lns.history) - 1, 0),
+    }
+    print_results(f"LNS ({num_employees} employees, {num_weeks} weeks)", results)
+
+
+def benchmark_startup(scenario_path, repeats=5):
+    """Mide el tiempo de proceso completo de cada subcomando de cli.py frente a importar main.py.
+
+    Cada comando se ejecuta repeats veces en un intérprete nuevo y se informa de la
+    mediana, así que el tiempo incluye el arranque de Python y las importaciones.
+    """
+    source_dir = os.path.dirname(os.path.abspath(__file__))
+    cli = os.path.join(source_dir, "cli.py")
+    with tempfile.TemporaryDirectory() as directory:
+        schedule_path = os.path.join(directory, "schedule.npy")
+        with open(scenario_path, encoding="utf-8") as scenario_file:
+            scenario = json.load(scenario_file)
+        np.save(schedule_path, np.zeros((scenario["num_employees"], scenario["num_weeks"] * 7), dtype=np.int8))
+        commands = {
+            "import main": [sys.executable, "-c", "import main"],
+            "cli validate": [sys.executable, cli, "validate", scenario_path],
+            "cli render": [sys.executable, cli, "render", schedule_path],
+            "cli build": [sys.executable, cli, "build", scenario_path],
+        }
+        results = {}
+        for name, command in commands.items():
+            times = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                subprocess.run(command, cwd=source_dir, check=True, stdout=subprocess.DEVNULL)
+                times.append(time.perf_counter() - start)
+            results[name] = {"median_time": float(np.median(times)), "min_time": min(times)}
+    baseline = results["import main"]["median_time"]
+    for result in results.values():
+        result["vs_import_main"] = result["median_time"] / baseline
+    print_results(f"Startup ({repeats} runs each)", results)
+
+
+def write_team_scenario(directory, num_employees, num_weeks, num_requests, seed=0):
+    """Escribe un escenario con nombres propios y sus tablas en CSV. Devuelve la ruta del JSON."""
+    rng = np.random.default_rng(seed)
+    employees = [f"employee_{e:05d}" for e in range(num_employees)]
+    shifts = ["off", "early", "late", "night"]
+    days = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+    with open(os.path.join(directory, "employees.csv"), "w", encoding="utf-8") as employees_file:
+        employees_file.write("name\n" + "\n".join(employees) + "\n")
+    for name, rows, weighted in (("requests.csv", num_requests, True), ("fixed.csv", num_requests // 3, False)):
+        with open(os.path.join(directory, name), "w", encoding="utf-8") as table_file:
+            table_file.write("employee,shift,day,week" + (",weight" if weighted else "") + "\n")
+            for e, s, d, w, weight in zip(rng.integers(num_employees, size=rows), rng.integers(4, size=rows),
+                                          rng.integers(7, size=rows), rng.integers(1, num_weeks + 1, size=rows),
+                                          rng.integers(-3, 4, size=rows)):
+                table_file.write(f"{employees[e]},{shifts[s]},{days[d]},{w}" + (f",{weight}" if weighted else "")
+                                 + "\n")
+    path = os.path.join(directory, "team.json")
+    with open(path, "w", encoding="utf-8") as scenario_file:
+        json.dump({
+            "num_weeks": num_weeks, "employees": "employees.csv", "shifts": shifts, "days": days,
+            "fixed_assignments": "fixed.csv", "requests": "requests.csv",
+            "shift_constraints": [["night", 1, 2, 20, 3, 4, 5]], "weekly_constraints": [["off", 1, 2, 7, 2, 3, 4]],
+            "penalized_transitions": [["late", "early", 4], ["night", "early", 0]],
+            "weekly_cover_demands": [[num_employees // 5] * 3] * 7, "excess_cover_penalties": [2, 2, 5],
+        }, scenario_file)
+    return path
+
+
+def benchmark_scenario_loader(num_employees, num_weeks, num_requests, repeats=5):
+    """Mide load_team sobre un escenario con sus tablas en CSV frente a traducir fila a fila.
+
+    La referencia lee las mismas tablas y traduce cada fila con búsquedas en
+    diccionarios y lower(), como las funciones create_* de data_conversion.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_team_scenario(directory, num_employees, num_weeks, num_requests)
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            team = load_team(path)
+            times.append(time.perf_counter() - start)
+
+        def row_by_row():
+            employee_ids = {name: e for e, name in enumerate(team.employees)}
+            converted = []
+            for name, weighted in (("requests.csv", True), ("fixed.csv", False)):
+                with open(os.path.join(directory, name), encoding="utf-8") as table_file:
+                    next(table_file)
+                    for line in table_file:
+                        employee, shift, day, week, *weight = line.rstrip("\n").split(",")
+                        if employee not in employee_ids or shift.lower() not in team.shift_ids \
+                                or day.lower() not in team.day_ids:
+                            raise ValueError(line)
+                        row = (employee_ids[employee], team.shift_ids[shift.lower()],
+                               (int(week) - 1) * 7 + team.day_ids[day.lower()])
+                        converted.append(row + (int(weight[0]),) if weighted else row)
+            return converted
+
+        baseline_times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            row_by_row()
+            baseline_times.append(time.perf_counter() - start)
+    print_results(f"Scenario loader ({num_employees} employees, {num_weeks} weeks, {num_requests} requests, "
+                  f"{num_requests // 3} fixed assignments)", {
+        "load_team": {"median_time": float(np.median(times)), "requests": len(team.inputs["requests"])},
+        "row_by_row": {"median_time": float(np.median(baseline_times)), "requests": len(team.inputs["requests"])},
+    })
+
+
+def replay_proto(path, time_limit, num_workers):
+    """Resuelve un modelo volcado con --output_proto."""
+    start = time.perf_counter()
+    model = load_model(path)
+    load_time = time.perf_counter() - start
+
+    solver, status, history = solve_recorded(model, time_limit, num_workers)
+    print_results(f"Replay {path}", {"replay": {
+        "variables": len(model.Proto().variables),
+        "constraints": len(model.Proto().constraints),
+        "load_time": load_time,
+        "first_solution_time": history[0][0] if history else None,
+        "status": solver.status_name(status),
+        "objective": history[-1][1] if history else None,
+    }})
+
+
+# Modos del benchmark: flag -> función que lo ejecuta con el valor del flag.
+# Sin ninguno se comparan las codificaciones de secuencias.
+_MODES = [
+    (_LOADER, lambda value: benchmark_scenario_loader(_EMPLOYEES.value, _WEEKS.value, value)),
+    (_STARTUP, benchmark_startup),
+    (_REPLAY_PROTO, lambda value: replay_proto(value, _TIME_LIMIT.value, _WORKERS.value)),
+    (_WINDOW_WEEKS, lambda value: benchmark_rolling_horizon(_EMPLOYEES.value, _WEEKS.value, value, _TIME_LIMIT.value,
+                                                            _WORKERS.value)),
+    (_OBJECTIVE_TERMS, benchmark_objective),
+    (_GREEDY, lambda _: benchmark_greedy_hint(_EMPLOYEES.value, _WEEKS.value, _TIME_LIMIT.value, _WORKERS.value)),
+    (_EXPORT, lambda _: benchmark_export(_EMPLOYEES.value, _WEEKS.value)),
+    (_DAY_INDEX, lambda _: benchmark_day_index(_EMPLOYEES.value, _WEEKS.value)),
+    (_PRESOLVE, lambda value: benchmark_presolve(_EMPLOYEES.value, _WEEKS.value, value, _TIME_LIMIT.value,
+                                                 _WORKERS.value)),
+    (_PROFILES, lambda _: benchmark_rule_profiles(_EMPLOYEES.value, _WEEKS.value, _TIME_LIMIT.value, _WORKERS.value)),
+    (_LNS, lambda _: benchmark_lns(_EMPLOYEES.value, _WEEKS.value, _TIME_LIMIT.value, _WORKERS.value)),
+    (_SYMMETRY, lambda _: benchmark_symmetry_breaking(_EMPLOYEES.value, _WEEKS.value, _TIME_LIMIT.value,
+                                                      _WORKERS.value)),
+    (_COMPACT, lambda _: benchmark_compact_encoding(_EMPLOYEES.value, _WEEKS.value, _TIME_LIMIT.value,
+                                                    _WORKERS.value)),
+]
+
+
+def main(_):
+    selected = [(flag, run) for flag, run in _MODES if flag.value]
+    if len(selected) > 1:
+        raise app.UsageError("Choose one benchmark mode: " + ", ".join(f"--{flag.name}" for flag, _ in selected))
+    if selected:
+        flag, run = selected[0]
+        run(flag.value)
+        return
+    benchmark_sequence_encodings(_EMPLOYEES.value, _WEEKS.value, _TIME_LIMIT.value, _WORKERS.value)
+
+
+if __name__ == "__main__":
+    app.run(main)
@@ -0,0 +1,130 @@
+import json
+import multiprocessing
+import platform
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from importlib.metadata import version
+
+from absl import app, flags
+
+from instrumentation import solve_recorded
+from model import Model
+from scenario_generator import generate_scenario
+
+# Parámetros de la línea de comandos
+_EMPLOYEES = flags.DEFINE_list("employees", ["10", "25", "50"], "Employee counts of the size grid.")
+_WEEKS = flags.DEFINE_list("weeks", ["2", "4"], "Week counts of the size grid.")
+_RULES = flags.DEFINE_list("rules", ["2"], "Number of sequence, weekly and transition rules of the size grid.")
+_SEEDS = flags.DEFINE_list("seeds", ["0"], "Seeds of the scenario generator; each size runs once per seed.")
+_TIME_LIMIT = flags.DEFINE_float("time_limit", 10.0, "Time limit of each solve in seconds.")
+_WORKERS = flags.DEFINE_integer("workers", 8, "Number of CP-SAT search workers.")
+_COMPACT = flags.DEFINE_bool("compact", False, "Build the models with the compact encoding.")
+_OUTPUT = flags.DEFINE_string("output", "benchmark_results.json", "Output file with the results.")
+_BASELINE = flags.DEFINE_string("baseline", "", "Results file of a previous version to compare with.")
+
+# Métricas que se comparan con la referencia (cuanto menores, mejor)
+COMPARED_METRICS = ("build_time", "variables", "constraints", "first_solution_time", "objective", "peak_rss_mb")
+
+
+def run_case(case, time_limit, num_workers, compact):
+    """Genera, construye y resuelve un caso del grid. Se ejecuta en un proceso nuevo.
+
+    Returns:
+        dict: el caso con sus métricas; peak_rss_mb es el pico de memoria del proceso.
+    """
+    num_employees, num_weeks, inputs = generate_scenario(
+        case["employees"], case["weeks"], seed=case["seed"], num_rules=case["rules"]
+    )
+    start = time.perf_counter()
+    model = Model.build(num_employees, num_weeks, inputs, compact=compact)
+    build_time = time.perf_counter() - start
+
+    proto = model.model.Proto()
+    solver, status, history = solve_recorded(model.model, time_limit, num_workers)
+    return dict(
+        case,
+        build_time=round(build_time, 3),
+        variables=len(proto.variables),
+        constraints=len(proto.constraints),
+        proto_bytes=proto.ByteSize(),
+        first_solution_time=history[0][0] if history else None,
+        solve_time=round(solver.wall_time, 3),
+        status=solver.status_name(status),
+        objective=history[-1][1] if history else None,
+        best_bound=solver.best_objective_bound if history else None,
+        objective_history=history,
+        build_phases=model.phases,
+        # En Linux ru_maxrss está en KB
+        peak_rss_mb=round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    )
+
+
+def run_suite(cases, time_limit, num_workers, compact=False):
+    """Ejecuta cada caso en un proceso propio para medir su pico de memoria por separado."""
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for case in cases:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(run_case, case, time_limit, num_workers, compact).result()
+        print(f"  {case}: build={result['build_time']}s, variables={result['variables']}, "
+              f"first_solution={result['first_solution_time']}s, {result['status']}, "
+              f"objective={result['objective']}, peak_rss={result['peak_rss_mb']}MB")
+        results.append(result)
+    return results
+
+
+def environment():
+    """Datos de la ejecución para poder comparar resultados entre versiones."""
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "ortools": version("ortools"),
+        "machine": platform.machine(),
+    }
+
+
+def compare(results, baseline_results):
+    """Imprime el cociente actual / referencia de cada métrica en los casos comunes."""
+    def case_key(result):
+        return result["employees"], result["weeks"], result["rules"], result["seed"]
+
+    baseline = {case_key(result): result for result in baseline_results}
+    print("=== Comparison with baseline (current / baseline) ===")
+    for result in results:
+        previous = baseline.get(case_key(result))
+        if previous is None:
+            continue
+        ratios = []
+        for metric in COMPARED_METRICS:
+            if result[metric] is not None and previous[metric]:
+                ratios.append(f"{metric}={result[metric] / previous[metric]:.2f}")
+        print(f"  {case_key(result)}: " + ", ".join(ratios))
+
+
+def main(_):
+    cases = [
+        {"employees": int(employees), "weeks": int(weeks), "rules": int(rules), "seed": int(seed)}
+        for employees in _EMPLOYEES.value
+        for weeks in _WEEKS.value
+        for rules in _RULES.value
+        for seed in _SEEDS.value
+    ]
+    print(f"Running {len(cases)} benchmark cases")
+    results = run_suite(cases, _TIME_LIMIT.value, _WORKERS.value, _COMPACT.value)
+    with open(_OUTPUT.value, "w", encoding="utf-8") as output_file:
+        json.dump({
+            "environment": environment(),
+            "settings": {"time_limit": _TIME_LIMIT.value, "workers": _WORKERS.value, "compact": _COMPACT.value},
+            "results": results,
+        }, output_file, indent=2)
+    print(f"Results written to {_OUTPUT.value}")
+
+    if _BASELINE.value:
+        with open(_BASELINE.value, encoding="utf-8") as baseline_file:
+            compare(results, json.load(baseline_file)["results"])
+
+
+if __name__ == "__main__":
+    app.run(main)
@@ -0,0 +1,166 @@
+"""Línea de comandos por subcomandos: validate, build, solve y render.
+
+Cada subcomando importa solo lo que necesita: validate y render no cargan OR-Tools
+(ni absl), de modo que arrancan en una fracción del tiempo de main.py.
+
+    python cli.py validate scenario.json
+    python cli.py build scenario.json --output_proto model.pb
+    python cli.py solve scenario.json --time_limit 10 --schedule schedule.npy
+    python cli.py render schedule.npy
+"""
+import argparse
+import sys
+import time
+
+
+def validate(args):
+    """Comprueba que el escenario se puede cargar: nombres conocidos y semanas dentro del horizonte."""
+    from scenario import load_team
+
+    team = load_team(args.scenario)
+    print(f"{args.scenario}: valid, {team.num_employees} employees, {team.num_weeks} weeks, "
+          f"{team.num_shifts} shifts, "
+          + ", ".join(f"{len(values)} {name}" for name, values in team.inputs.items()
+                      if name.endswith(("assignments", "requests", "constraints", "transitions"))))
+
+
+def build(args):
+    """Construye el modelo e informa de su tamaño; opcionalmente lo vuelca a un proto."""
+    _, model = _build_model(args)
+    proto = model.model.Proto()
+    print(f"Model: {len(proto.variables)} variables, {len(proto.constraints)} constraints")
+    if args.output_proto:
+        from proto_io import write_model_proto
+
+        write_model_proto(proto, args.output_proto)
+        print(f"Proto written to {args.output_proto}")
+
+
+def solve(args):
+    """Construye y resuelve el modelo, imprime la solución y opcionalmente guarda o exporta el horario."""
+    import os
+
+    from ortools.sat.python import cp_model
+
+    from solver import Solver
+
+    team, model = _build_model(args)
+    solver = Solver(model)
+    if args.schedule and os.path.exists(args.schedule):
+        solver.add_schedule_hint(Solver.load_schedule(args.schedule))
+    params = f"max_time_in_seconds:{args.time_limit},num_workers:{args.workers}"
+    if args.params:
+        params += "," + args.params
+    status = solver.solve(params, "")
+    print()
+    solver.print_solution(status)
+    if args.schedule and status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        Solver.save_schedule(args.schedule, solver.schedule_matrix())
+        print(f"Schedule written to {args.schedule}")
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        for path in args.export:
+            solver.export_schedule(path, args.start_date or team.start_date)
+            print(f"Schedule exported to {path}")
+        if args.export_penalties:
+            solver.export_penalties(args.export_penalties)
+            print(f"Penalties exported to {args.export_penalties}")
+
+
+def render(args):
+    """Imprime o exporta un horario guardado (.npy) sin cargar OR-Tools."""
+    import numpy as np
+
+    from export import write_schedule
+    from mappings import Mappings
+    from render import print_schedule
+
+    schedule = np.load(args.schedule)
+    shifts, days, employees, start_date = Mappings.SHIFT_NAMES, Mappings.DAY_NAMES, None, None
+    if args.scenario:
+        from scenario import load_team
+
+        team = load_team(args.scenario)
+        shifts, days, employees = team.shifts or shifts, team.days or days, team.employees
+        start_date = team.start_date
+    if not args.export:
+        print_schedule(schedule, shifts, days, employees)
+    for path in args.export:
+        write_schedule(path, schedule, shifts, employees, args.start_date or start_date)
+        print(f"Schedule exported to {path}")
+
+
+def _build_model(args):
+    from scenario import load_team
+
+    team = load_team(args.scenario)
+    start = time.perf_counter()
+    model = team.build_model(compact=args.compact, symmetry_breaking=args.symmetry_breaking, presolve=args.presolve)
+    print(f"Model built in {time.perf_counter() - start:.3f} s")
+    if args.presolve:
+        print(model.presolve_summary())
+    return team, model
+
+
+def parser():
+    """Analizador de la línea de comandos con un subanalizador por subcomando."""
+    root = argparse.ArgumentParser(description="Employee scheduling command line.")
+    commands = root.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("validate", help="Check a scenario file without loading OR-Tools.")
+    command.add_argument("scenario", help="Scenario file (.json).")
+    command.set_defaults(run=validate)
+
+    for name, run, help_text in (("build", build, "Build the model and report its size."),
+                                 ("solve", solve, "Build and solve the model.")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("scenario", help="Scenario file (.json).")
+        command.add_argument("--compact", action="store_true",
+                             help="Use the compact encoding of the cover and weekly sum constraints.")
+        command.add_argument("--symmetry_breaking", action="store_true",
+                             help="Order the schedules of interchangeable employees lexicographically.")
+        command.add_argument("--presolve", action="store_true",
+                             help="Fold the fixed assignments into constants before generating the constraints.")
+        command.set_defaults(run=run)
+        if name == "build":
+            command.add_argument("--output_proto", default="",
+                                 help="Output file to write the cp_model proto to (.pb binary, text otherwise, "
+                                      ".gz compressed).")
+        else:
+            command.add_argument("--time_limit", type=float, default=10.0, help="Time limit in seconds.")
+            command.add_argument("--workers", type=int, default=8, help="Number of CP-SAT search workers.")
+            command.add_argument("--params", default="", help="Additional sat solver parameters.")
+            command.add_argument("--schedule", default="",
+                                 help="Schedule file (.npy) used as a hint if it exists, and overwritten with "
+                                      "the new solution.")
+            command.add_argument("--export_penalties", default="",
+                                 help="File to export the penalties of the solution to (.csv, .jsonl, .gz or "
+                                      ".parquet).")
+            _add_export_arguments(command)
+
+    command = commands.add_parser("render", help="Print a stored schedule without loading OR-Tools.")
+    command.add_argument("schedule", help="Schedule file (.npy) saved by solve or main.py.")
+    command.add_argument("--scenario", default="", help="Scenario file (.json) with the names of the team.")
+    _add_export_arguments(command)
+    command.set_defaults(run=render)
+    return root
+
+
+def _add_export_arguments(command):
+    command.add_argument("--export", action="append", default=[],
+                         help="File to export the schedule to (.csv, .jsonl, .gz compressed, or .parquet); a .ics "
+                              "path is a directory with one calendar per employee. Can be repeated.")
+    command.add_argument("--start_date", default="",
+                         help="Date of the first Monday of the schedule (YYYY-MM-DD); by default the scenario "
+                              "start_date.")
+
+
+def main(argv=None):
+    args = parser().parse_args(argv)
+    try:
+        args.run(args)
+    except (ValueError, OSError) as error:
+        sys.exit(f"Error: {type(error).__name__}: {error}")
+
+
+if __name__ == "__main__":
+    main()
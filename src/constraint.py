@@ -1,8 +1,31 @@
 from ortools.sat.python import cp_model
+from mappings import Mappings
 
 class Constraint:
     """Clase para métodos estáticos relacionados con restricciones."""
 
+    # Codificaciones disponibles para las restricciones de secuencia.
+    SPAN_ENCODING = Mappings.SPAN_ENCODING
+    AUTOMATON_ENCODING = Mappings.AUTOMATON_ENCODING
+    SEQUENCE_ENCODINGS = Mappings.SEQUENCE_ENCODINGS
+
+    @staticmethod
+    def negate(literal):
+        """Negates a literal; known values are plain Python bools."""
+        return not literal if isinstance(literal, bool) else ~literal
+
+    @staticmethod
+    def fold_clause(literals):
+        """Simplifies a clause whose known literals are Python bools.
+
+        Returns:
+          None if a known literal is True (the clause always holds), otherwise
+          the unknown literals. An empty list means the clause can not hold.
+        """
+        if any(literal is True for literal in literals):
+            return None
+        return [literal for literal in literals if not isinstance(literal, bool)]
+
     @staticmethod
     def negated_bounded_span(
             works: list[cp_model.BoolVarT], start: int, length: int
@@ -28,7 +51,7 @@ class Constraint:
         if start > 0:
             sequence.append(works[start - 1])
         for i in range(length):
-            sequence.append(~works[start + i])
+            sequence.append(Constraint.negate(works[start + i]))
         # right border (end of works or works[start + length])
         if start + length < len(works):
             sequence.append(works[start + length])
@@ -45,6 +68,8 @@ class Constraint:
             hard_max: int,
             max_cost: int,
             prefix: str,
+            initial_run: int = 0,
+            stats=None,
     ) -> tuple[list[cp_model.BoolVarT], list[int]]:
         """Sequence constraint on true variables with soft and hard bounds.
 
@@ -68,24 +93,49 @@ class Constraint:
           max_cost: the coefficient of the linear penalty if the length is more than
             soft_max.
           prefix: a base name for penalty literals.
+          initial_run: number of true values right before works, so that the
+            sequence starting at 0 continues it.
+          stats: optional Counter; its "clauses" entry is increased by the number
+            of clauses (and penalty literals) that known values of works remove.
 
         Returns:
           a tuple (variables_list, coefficient_list) containing the different
           penalties created by the sequence constraint.
         """
+        if initial_run > hard_max:
+            raise ValueError(f"La secuencia inicial ({initial_run}) supera hard_max ({hard_max}).")
         cost_literals = []
         cost_coefficients = []
+        # With an initial run, sequences starting at 0 are handled at the end.
+        first_start = 1 if initial_run else 0
+        # Known values of works (Python bools) are folded into each clause.
+        folded = any(isinstance(work, bool) for work in works)
+
+        def clause(literals):
+            if not folded:
+                return literals
+            literals = Constraint.fold_clause(literals)
+            if literals is None and stats is not None:
+                stats["clauses"] += 1
+            return literals
+
+        def add_clause(literals):
+            literals = clause(literals)
+            if literals is not None:
+                model.add_bool_or(literals)
 
         # Forbid sequences that are too short.
         for length in range(1, hard_min):
-            for start in range(len(works) - length + 1):
-                model.add_bool_or(Constraint.negated_bounded_span(works, start, length))
+            for start in range(first_start, len(works) - length + 1):
+                add_clause(Constraint.negated_bounded_span(works, start, length))
 
         # Penalize sequences that are below the soft limit.
         if min_cost > 0:
             for length in range(hard_min, soft_min):
-                for start in range(len(works) - length + 1):
-                    span = Constraint.negated_bounded_span(works, start, length)
+                for start in range(first_start, len(works) - length + 1):
+                    span = clause(Constraint.negated_bounded_span(works, start, length))
+                    if span is None:
+                        continue
                     name = f": under_span(start={start}, length={length})"
                     lit = model.new_bool_var(prefix + name)
                     span.append(lit)
@@ -98,8 +148,10 @@ class Constraint:
         # Penalize sequences that are above the soft limit.
         if max_cost > 0:
             for length in range(soft_max + 1, hard_max + 1):
-                for start in range(len(works) - length + 1):
-                    span = Constraint.negated_bounded_span(works, start, length)
+                for start in range(first_start, len(works) - length + 1):
+                    span = clause(Constraint.negated_bounded_span(works, start, length))
+                    if span is None:
+                        continue
                     name = f": over_span(start={start}, length={length})"
                     lit = model.new_bool_var(prefix + name)
                     span.append(lit)
@@ -110,9 +162,120 @@ class Constraint:
 
         # Just forbid any sequence of true variables with length hard_max + 1
         for start in range(len(works) - hard_max):
-            model.add_bool_or([~works[i] for i in range(start, start + hard_max + 1)])
+            add_clause([Constraint.negate(works[i]) for i in range(start, start + hard_max + 1)])
+
+        if initial_run:
+            # The sequence starting at 0 (possibly empty) extends the initial run.
+            for length in range(min(hard_max - initial_run, len(works)) + 1):
+                total = initial_run + length
+                span = clause(Constraint.negated_bounded_span(works, 0, length))
+                if span is None:
+                    continue
+                if total < hard_min:
+                    model.add_bool_or(span)
+                elif total < soft_min and min_cost > 0:
+                    lit = model.new_bool_var(prefix + f": under_span(start=0, length={length})")
+                    model.add_bool_or(span + [lit])
+                    cost_literals.append(lit)
+                    cost_coefficients.append(min_cost * (soft_min - total))
+                elif total > soft_max and max_cost > 0:
+                    lit = model.new_bool_var(prefix + f": over_span(start=0, length={length})")
+                    model.add_bool_or(span + [lit])
+                    cost_literals.append(lit)
+                    cost_coefficients.append(max_cost * (total - soft_max))
+            if hard_max - initial_run < len(works):
+                add_clause([Constraint.negate(works[i]) for i in range(hard_max - initial_run + 1)])
         return cost_literals, cost_coefficients
 
+    @staticmethod
+    def add_automaton_sequence_constraint(
+            model: cp_model.CpModel,
+            works: list[cp_model.BoolVarT],
+            hard_min: int,
+            soft_min: int,
+            min_cost: int,
+            soft_max: int,
+            hard_max: int,
+            max_cost: int,
+            prefix: str,
+            initial_run: int = 0,
+    ) -> tuple[list[cp_model.IntVar], list[int]]:
+        """Sequence constraint encoded as a state machine over the run length.
+
+        Same semantics as add_soft_sequence_constraint, but instead of one clause
+        per (start, length) span, the hard bounds are a single automaton whose
+        state is the length of the current sequence of true variables, and the
+        soft bounds are carried by the labels of the same automaton.
+
+        Args:
+          model: the sequence constraint is built on this model.
+          works: a list of Boolean variables.
+          hard_min: any sequence of true variables must have a length of at least
+            hard_min.
+          soft_min: any sequence should have a length of at least soft_min, or a
+            linear penalty on the delta will be added to the objective.
+          min_cost: the coefficient of the linear penalty if the length is less than
+            soft_min.
+          soft_max: any sequence should have a length of at most soft_max, or a linear
+            penalty on the delta will be added to the objective.
+          hard_max: any sequence of true variables must have a length of at most
+            hard_max.
+          max_cost: the coefficient of the linear penalty if the length is more than
+            soft_max.
+          prefix: a base name for penalty variables.
+          initial_run: number of true values right before works; it is used as
+            the starting state of the automaton.
+
+        Returns:
+          a tuple (variables_list, coefficient_list) containing the different
+          penalties created by the sequence constraint.
+        """
+        if initial_run > hard_max:
+            raise ValueError(f"La secuencia inicial ({initial_run}) supera hard_max ({hard_max}).")
+        cost_variables = []
+        cost_coefficients = []
+        shortest = max(hard_min, 1)
+        penalize_under = soft_min > shortest and min_cost > 0
+        penalize_over = soft_max < hard_max and max_cost > 0
+
+        # El estado es la longitud de la secuencia actual de variables a True y la
+        # etiqueta de cada transición es work + 2 * coste, de modo que el autómata
+        # también fija la penalización pagada en cada posición.
+        transitions = []
+        for state in range(hard_max + 1):
+            if state < hard_max:
+                over = max_cost if penalize_over and state + 1 > soft_max else 0
+                transitions.append((state, 1 + 2 * over, state + 1))
+            if state == 0 or state >= shortest:
+                under = min_cost * max(0, soft_min - state) if penalize_under and state > 0 else 0
+                transitions.append((state, 2 * under, 0))
+
+        if not penalize_under and not penalize_over:
+            # Sin costes las etiquetas son directamente las variables de works.
+            final_states = [0] + list(range(shortest, hard_max + 1))
+            model.add_automaton(works, initial_run, final_states, transitions)
+            return cost_variables, cost_coefficients
+
+        label_values = sorted({label for _, label, _ in transitions})
+        label_domain = cp_model.Domain.from_values(label_values)
+        cost_domain = cp_model.Domain.from_values(sorted({label // 2 for label in label_values}))
+        labels = []
+        # La posición extra cierra la última secuencia como si le siguiera un False.
+        for d, work in enumerate(works + [0]):
+            label = model.new_int_var_from_domain(label_domain, "")
+            cost = model.new_int_var_from_domain(cost_domain, prefix + f": run_cost(day={d})")
+            model.add(label == work + 2 * cost)
+            labels.append(label)
+            cost_variables.append(cost)
+            cost_coefficients.append(1)
+        model.add_automaton(labels, initial_run, [0], transitions)
+        if penalize_over and initial_run > soft_max:
+            # El exceso ya acumulado antes de works no pasa por ninguna transición.
+            initial_over = max_cost * (initial_run - soft_max)
+            cost_variables.append(model.new_int_var(initial_over, initial_over, prefix + ": initial_over_run"))
+            cost_coefficients.append(1)
+        return cost_variables, cost_coefficients
+
     @staticmethod
     def add_soft_sum_constraint(
             model: cp_model.CpModel,
@@ -124,6 +287,7 @@ class Constraint:
             hard_max: int,
             max_cost: int,
             prefix: str,
+            compact: bool = False,
     ) -> tuple[list[cp_model.IntVar], list[int]]:
         """sum constraint with soft and hard bounds.
 
@@ -147,34 +311,96 @@ class Constraint:
           max_cost: the coefficient of the linear penalty if the sum is more than
             soft_max.
           prefix: a base name for penalty variables.
+          compact: if True, the hard bounds are a single bounded linear constraint
+            on the sum and each penalty is bounded below by one linear inequality,
+            without the intermediate sum and delta variables.
 
         Returns:
           a tuple (variables_list, coefficient_list) containing the different
           penalties created by the sequence constraint.
         """
+        if compact:
+            return Constraint.add_compact_soft_sum_constraint(
+                model, works, hard_min, soft_min, min_cost, soft_max, hard_max, max_cost, prefix
+            )
         cost_variables = []
         cost_coefficients = []
         sum_var = model.new_int_var(hard_min, hard_max, "")
         # This adds the hard constraints on the sum.
-        model.add(sum_var == sum(works))
+        model.add(sum_var == cp_model.LinearExpr.sum(works))
 
         # Penalize sums below the soft_min target.
         if soft_min > hard_min and min_cost > 0:
             delta = model.new_int_var(-len(works), len(works), "")
             model.add(delta == soft_min - sum_var)
             # TODO(user): Compare efficiency with only excess >= soft_min - sum_var.
-            excess = model.new_int_var(0, 7, prefix + ": under_sum")
+            excess = model.new_int_var(0, len(works), prefix + ": under_sum")
             model.add_max_equality(excess, [delta, 0])
             cost_variables.append(excess)
             cost_coefficients.append(min_cost)
 
         # Penalize sums above the soft_max target.
         if soft_max < hard_max and max_cost > 0:
-            delta = model.new_int_var(-7, 7, "")
+            delta = model.new_int_var(-len(works), len(works), "")
             model.add(delta == sum_var - soft_max)
-            excess = model.new_int_var(0, 7, prefix + ": over_sum")
+            excess = model.new_int_var(0, len(works), prefix + ": over_sum")
             model.add_max_equality(excess, [delta, 0])
             cost_variables.append(excess)
             cost_coefficients.append(max_cost)
 
         return cost_variables, cost_coefficients
+
+    @staticmethod
+    def add_compact_soft_sum_constraint(
+            model: cp_model.CpModel,
+            works: list[cp_model.BoolVarT],
+            hard_min: int,
+            soft_min: int,
+            min_cost: int,
+            soft_max: int,
+            hard_max: int,
+            max_cost: int,
+            prefix: str,
+    ) -> tuple[list[cp_model.IntVar], list[int]]:
+        """Compact version of add_soft_sum_constraint.
+
+        The sum of works is never materialized: the hard bounds are one bounded
+        linear constraint, and each penalty variable is only bounded below by the
+        distance to its soft bound. As the penalties are minimized, they take the
+        same value as the max equalities of the default encoding.
+
+        Args:
+          model: the sum constraint is built on this model.
+          works: a list of Boolean variables.
+          hard_min: same as in add_soft_sum_constraint.
+          soft_min: same as in add_soft_sum_constraint.
+          min_cost: same as in add_soft_sum_constraint.
+          soft_max: same as in add_soft_sum_constraint.
+          hard_max: same as in add_soft_sum_constraint.
+          max_cost: same as in add_soft_sum_constraint.
+          prefix: a base name for penalty variables.
+
+        Returns:
+          a tuple (variables_list, coefficient_list) containing the different
+          penalties created by the sum constraint.
+        """
+        cost_variables = []
+        cost_coefficients = []
+        total = cp_model.LinearExpr.sum(works)
+        model.add_linear_constraint(total, hard_min, hard_max)
+
+        # The sum can not be below hard_min, so the penalty is at most soft_min - hard_min.
+        if soft_min > hard_min and min_cost > 0:
+            excess = model.new_int_var(0, soft_min - hard_min, prefix + ": under_sum")
+            model.add(excess + total >= soft_min)
+            cost_variables.append(excess)
+            cost_coefficients.append(min_cost)
+
+        # Likewise, the penalty above soft_max is at most hard_max - soft_max.
+        if soft_max < hard_max and max_cost > 0:
+            excess = model.new_int_var(0, hard_max - soft_max, prefix + ": over_sum")
+            model.add(total - excess <= soft_max)
+            cost_variables.append(excess)
+            cost_coefficients.append(max_cost)
+
+        return cost_variables, cost_coefficients
@@ -1,7 +1,7 @@
 from mappings import Mappings
 
 
-def create_request(employee_name: str, shift: str, day_of_week: str, weight: int) -> tuple:
+def create_request(employee_name: str, shift: str, day_of_week: str, weight: int, week: int = 1) -> tuple:
     if employee_name not in Mappings.EMPLOYEES:
         raise ValueError(f"Empleado '{employee_name}' no encontrado.")
     if shift.lower() not in Mappings.SHIFT:
@@ -9,8 +9,9 @@ def create_request(employee_name: str, shift: str, day_of_week: str, weight: int
     if day_of_week.lower() not in Mappings.DAYS:
         raise ValueError(f"Día '{day_of_week}' no reconocido. Usa: {', '.join(Mappings.DAYS.keys())}")
 
-    return (
-    Mappings.EMPLOYEES[employee_name], Mappings.SHIFT[shift.lower()], Mappings.DAYS[day_of_week.lower()], weight)
+    # Como en create_fixed_assignment, el día es absoluto (semana 1 por defecto)
+    return (Mappings.EMPLOYEES[employee_name], Mappings.SHIFT[shift.lower()],
+            Mappings.calculate_day_index(week, day_of_week), weight)
 
 
 def create_fixed_assignment(employee_name: str, shift: str, day_of_week: str, week: int = 1) -> tuple:
@@ -37,11 +38,13 @@ def create_fixed_assignment(employee_name: str, shift: str, day_of_week: str, we
     return Mappings.EMPLOYEES[employee_name], Mappings.SHIFT[shift.lower()], day_index
 
 def create_shift_constraint(shift: str, hard_min: int, soft_min: int, min_penalty: int, soft_max: int, hard_max: int,
-                            max_penalty: int) -> tuple:
+                            max_penalty: int, encoding: str = Mappings.SPAN_ENCODING) -> tuple:
     if shift.lower() not in Mappings.SHIFT:
         raise ValueError(f"Turno '{shift}' no es válido. Usa 'libre', 'mañana', 'tarde' o 'noche'.")
+    if encoding not in Mappings.SEQUENCE_ENCODINGS:
+        raise ValueError(f"Codificación '{encoding}' no válida. Usa: {', '.join(Mappings.SEQUENCE_ENCODINGS)}")
 
-    return (Mappings.SHIFT[shift.lower()], hard_min, soft_min, min_penalty, soft_max, hard_max, max_penalty)
+    return (Mappings.SHIFT[shift.lower()], hard_min, soft_min, min_penalty, soft_max, hard_max, max_penalty, encoding)
 
 
 def create_weekly_sum_constraint(shift: str, hard_min: int, soft_min: int, min_penalty: int, soft_max: int,
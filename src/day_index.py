@@ -0,0 +1,306 @@
+import datetime
+import json
+
+import numpy as np
+
+
+class DayIndex:
+    """Asignaciones fijas o peticiones indexadas por empleado cuyos patrones se expanden al recorrerlas.
+
+    Además de entradas sueltas (e, s, d[, peso]) admite patrones: fechas
+    absolutas, rangos de días y repeticiones semanales (todos los lunes, un fin de
+    semana de cada dos...). Los patrones se guardan como reglas y no se convierten
+    en tuplas hasta que el modelo recorre el índice, semana a semana, en el mismo
+    orden que la lista equivalente replicada por semanas. Así Model, GreedyRoster y
+    el resto lo aceptan en lugar de la lista de tuplas; columns() da los arrays
+    por columnas sin crear tuplas, que es lo que usan el presolve, la heurística y
+    las comprobaciones del modelo. employee_sources() da las entradas y patrones
+    de un empleado sin expandirlos, y con ellos la ruptura de simetrías agrupa a
+    los empleados (signature).
+
+    Los días son índices absolutos del horizonte (0 es el lunes de la primera
+    semana); con start_date también se aceptan fechas (date o "AAAA-MM-DD").
+    """
+
+    def __init__(self, num_employees, num_days, weighted=False, start_date=None):
+        self.num_employees = num_employees
+        self.num_days = num_days
+        self.weighted = weighted
+        self.start_date = None if start_date is None else _as_date(start_date)
+        # Entradas sueltas (tuplas) y patrones, en orden de inserción
+        self.sources = []
+        # Índice por empleado: sus entradas sueltas y patrones, y los patrones de todo el equipo
+        self._employee_sources = {}
+        self._team_patterns = []
+
+    def day(self, value):
+        """Índice del día de una fecha (date o ISO) o de un día ya expresado como entero."""
+        if isinstance(value, (int, np.integer)):
+            return int(value)
+        if self.start_date is None:
+            raise ValueError(f"La fecha {value} necesita la fecha de inicio del horizonte (start_date).")
+        return (_as_date(value) - self.start_date).days
+
+    def add(self, e, s, d, weight=None):
+        """Añade una entrada suelta en el día (o fecha) d."""
+        d = self._check_day(self.day(d))
+        self._add((e, s, d) if not self.weighted else (e, s, d, self._weight(weight)))
+
+    def extend(self, entries):
+        """Añade una lista de entradas (e, s, d[, peso]) ya traducidas."""
+        for entry in entries:
+            self.add(*entry)
+
+    def add_dates(self, employees, s, dates, weight=None):
+        """Asigna el turno s a los empleados indicados en cada una de las fechas (o días)."""
+        days = np.unique([self._check_day(self.day(date)) for date in dates])
+        self._add(_Pattern(self._employees(employees), s, self._weight(weight), days=days.astype(np.int64),
+                           hi=self.num_days - 1))
+
+    def add_pattern(self, employees, s, first=0, last=None, weekdays=None, every=1, weight=None):
+        """Asigna el turno s a los empleados en los días de un rango que cumplen un patrón semanal.
+
+        Args:
+            employees: identificador, lista de identificadores o None (todos).
+            s: turno.
+            first, last: primer y último día (o fecha) incluidos; por defecto todo el horizonte.
+            weekdays: días de la semana (0 es el lunes) o None para todos.
+            every: cada cuántas semanas se repite, contando desde la semana de first.
+            weight: peso de la petición (solo en índices de peticiones).
+
+        Por ejemplo, todos los lunes: add_pattern(e, s, weekdays=[0]); un fin de
+        semana libre de cada dos: add_pattern(e, 0, weekdays=[5, 6], every=2); unas
+        vacaciones: add_pattern(e, 0, first="2025-08-04", last="2025-08-17").
+        """
+        first = self.day(first)
+        last = self.num_days - 1 if last is None else self.day(last)
+        if every < 1:
+            raise ValueError(f"every tiene que ser al menos 1 ({every}).")
+        mask = None
+        if weekdays is not None:
+            mask = np.zeros(7, dtype=bool)
+            mask[list(weekdays)] = True
+        self._add(_Pattern(self._employees(employees), s, self._weight(weight), first=first, last=last,
+                           weekdays=mask, every=every, anchor=first - first % 7,
+                           hi=self.num_days - 1))
+
+    def __len__(self):
+        return sum(1 if isinstance(source, tuple) else source.size(self.num_employees) for source in self.sources)
+
+    def __iter__(self):
+        """Recorre las entradas semana a semana; en cada semana, en el orden en que se añadieron."""
+        weeks = [[] for _ in range((self.num_days + 6) // 7)]
+        for source in self.sources:
+            if isinstance(source, tuple):
+                weeks[source[2] // 7].append(source)
+                continue
+            days = source.days()
+            for chunk in np.split(days, np.flatnonzero(np.diff(days // 7)) + 1) if len(days) else []:
+                weeks[chunk[0] // 7].append((source, chunk.tolist()))
+        for week in weeks:
+            for source in week:
+                if isinstance(source[0], _Pattern):
+                    pattern, days = source
+                    for e in pattern.members(self.num_employees):
+                        for d in days:
+                            yield pattern.entry(e, d)
+                else:
+                    yield source
+
+    def columns(self):
+        """Arrays (empleados, turnos, días[, pesos]) de todas las entradas, sin crear tuplas.
+
+        El orden es el de las fuentes, no el de la iteración.
+        """
+        width = 4 if self.weighted else 3
+        parts = [np.array([source for source in self.sources if isinstance(source, tuple)],
+                          dtype=np.int64).reshape(-1, width).T]
+        for source in self.sources:
+            if isinstance(source, _Pattern):
+                members = np.asarray(source.members(self.num_employees), dtype=np.int64)
+                days = source.days()
+                rows = [np.repeat(members, len(days)), np.full(len(members) * len(days), source.shift),
+                        np.tile(days, len(members))]
+                if self.weighted:
+                    rows.append(np.full(len(members) * len(days), source.weight))
+                parts.append(np.array(rows, dtype=np.int64).reshape(width, -1))
+        return tuple(np.concatenate(parts, axis=1))
+
+    def employee_sources(self, e):
+        """Entradas sueltas y patrones (sin expandir) que afectan al empleado e."""
+        return self._employee_sources.get(e, []) + self._team_patterns
+
+    def signature(self, e):
+        """Clave de las entradas del empleado e sin su identificador, construida con los patrones sin expandir.
+
+        Dos empleados con la misma clave tienen las mismas entradas; con patrones
+        distintos que cubren los mismos días las claves pueden diferir.
+        """
+        entries, patterns = [], []
+        for source in self.employee_sources(e):
+            if isinstance(source, tuple):
+                entries.append(source[1:])
+            else:
+                patterns.append(json.dumps({**source.describe(), "employees": None}, sort_keys=True))
+        return tuple(sorted(entries)), tuple(sorted(patterns))
+
+    def window(self, first_day, last_day):
+        """Índice de los días [first_day, last_day), con los días desplazados a first_day."""
+        index = DayIndex(self.num_employees, last_day - first_day, self.weighted)
+        for source in self.sources:
+            if isinstance(source, tuple):
+                if first_day <= source[2] < last_day:
+                    index.add(source[0], source[1], source[2] - first_day, *source[3:])
+            else:
+                index._add(source.shifted(first_day, last_day))
+        return index
+
+    def select(self, local_ids):
+        """Índice de un subconjunto de empleados, con sus identificadores locales (global -> local)."""
+        index = DayIndex(len(local_ids), self.num_days, self.weighted)
+        for source in self.sources:
+            if isinstance(source, tuple):
+                if source[0] in local_ids:
+                    index.add(local_ids[source[0]], *source[1:])
+            else:
+                members = [local_ids[e] for e in source.members(self.num_employees) if e in local_ids]
+                index._add(source.renamed(members))
+        return index
+
+    def describe(self):
+        """Descripción serializable en JSON (p. ej. para las claves de la caché de modelos)."""
+        return [list(source) if isinstance(source, tuple) else source.describe() for source in self.sources]
+
+    def _add(self, source):
+        self.sources.append(source)
+        if isinstance(source, tuple):
+            self._employee_sources.setdefault(source[0], []).append(source)
+        elif source.employees is None:
+            self._team_patterns.append(source)
+        else:
+            for e in source.employees:
+                self._employee_sources.setdefault(e, []).append(source)
+
+    def _employees(self, employees):
+        if employees is None:
+            return None
+        employees = [employees] if isinstance(employees, (int, np.integer)) else list(employees)
+        for e in employees:
+            if not 0 <= e < self.num_employees:
+                raise ValueError(f"Empleado {e} fuera del equipo de {self.num_employees}.")
+        return tuple(int(e) for e in employees)
+
+    def _weight(self, weight):
+        if self.weighted and weight is None:
+            raise ValueError("Las peticiones necesitan un peso.")
+        return weight
+
+    def _check_day(self, d):
+        if not 0 <= d < self.num_days:
+            raise ValueError(f"Día {d} fuera del horizonte de {self.num_days} días.")
+        return d
+
+
+class _Pattern:
+    """Regla de un DayIndex: empleados, turno, peso y los días en que se aplica.
+
+    Los días son los explícitos (days) o los de [first, last] con el día de la
+    semana en weekdays y una semana de cada every desde anchor. Todo se guarda en
+    los días originales; offset y [lo, hi] recortan y desplazan las ventanas.
+    """
+
+    def __init__(self, employees, shift, weight, first=0, last=-1, weekdays=None, every=1, anchor=0, days=None,
+                 offset=0, lo=0, hi=None):
+        self.employees = employees
+        self.shift = shift
+        self.weight = weight
+        self.first = first
+        self.last = last
+        self.weekdays = weekdays
+        self.every = every
+        self.anchor = anchor
+        self.explicit = days
+        self.offset = offset
+        self.lo = lo
+        self.hi = hi
+
+    def days(self):
+        """Días (en el horizonte actual) en que se aplica, ordenados."""
+        hi = self.last if self.hi is None else self.hi
+        if self.explicit is not None:
+            days = self.explicit[(self.explicit >= self.lo) & (self.explicit <= hi)]
+        else:
+            days = np.arange(max(self.first, self.lo), min(self.last, hi) + 1)
+            if self.weekdays is not None:
+                days = days[self.weekdays[days % 7]]
+            if self.every > 1:
+                days = days[(days - self.anchor) // 7 % self.every == 0]
+        return days - self.offset
+
+    def members(self, num_employees):
+        return range(num_employees) if self.employees is None else self.employees
+
+    def size(self, num_employees):
+        return len(self.members(num_employees)) * len(self.days())
+
+    def entry(self, e, d):
+        return (e, self.shift, d) if self.weight is None else (e, self.shift, d, self.weight)
+
+    def shifted(self, first_day, last_day):
+        """El patrón en la ventana [first_day, last_day) del horizonte actual."""
+        pattern = self.renamed(self.employees)
+        pattern.lo = max(self.lo, first_day + self.offset)
+        pattern.hi = last_day - 1 + self.offset if self.hi is None else min(self.hi, last_day - 1 + self.offset)
+        pattern.offset = self.offset + first_day
+        return pattern
+
+    def renamed(self, employees):
+        return _Pattern(None if employees is None else tuple(employees), self.shift, self.weight, self.first,
+                        self.last, self.weekdays, self.every, self.anchor, self.explicit, self.offset, self.lo,
+                        self.hi)
+
+    def describe(self):
+        """Parámetros del patrón serializables en JSON, sin calcular sus días."""
+        return {
+            "employees": None if self.employees is None else list(self.employees), "shift": self.shift,
+            "weight": self.weight, "first": self.first, "last": self.last,
+            "weekdays": None if self.weekdays is None else np.flatnonzero(self.weekdays).tolist(),
+            "every": self.every, "anchor": self.anchor,
+            "days": None if self.explicit is None else self.explicit.tolist(),
+            "offset": self.offset, "lo": self.lo, "hi": self.hi,
+        }
+
+
+def entry_columns(entries, width):
+    """Arrays por columna de una lista de entradas o de un DayIndex."""
+    if isinstance(entries, DayIndex):
+        return entries.columns()
+    return tuple(np.array(list(entries), dtype=np.int64).reshape(-1, width).T)
+
+
+def employee_signatures(entries, num_employees):
+    """Clave de las entradas de cada empleado sin su identificador (ver DayIndex.signature)."""
+    if isinstance(entries, DayIndex):
+        return [entries.signature(e) for e in range(num_employees)]
+    signatures = [[] for _ in range(num_employees)]
+    for e, *rest in entries:
+        signatures[e].append(tuple(rest))
+    return [(tuple(sorted(entries)), ()) for entries in signatures]
+
+
+def window(entries, first_day, last_day):
+    """Entradas de los días [first_day, last_day) con los días desplazados a first_day."""
+    if isinstance(entries, DayIndex):
+        return entries.window(first_day, last_day)
+    return [(e, s, d - first_day, *rest) for e, s, d, *rest in entries if first_day <= d < last_day]
+
+
+def select(entries, local_ids):
+    """Entradas de los empleados de local_ids (global -> local) con sus identificadores locales."""
+    if isinstance(entries, DayIndex):
+        return entries.select(local_ids)
+    return [(local_ids[e], s, d, *rest) for e, s, d, *rest in entries if e in local_ids]
+
+
+def _as_date(value):
+    return value if isinstance(value, datetime.date) else datetime.date.fromisoformat(value)
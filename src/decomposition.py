@@ -0,0 +1,193 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from day_index import select
+from model import Model
+from solver import Solver, split_cores
+
+
+def group_inputs(inputs, group, cover_demands, shortage_penalty):
+    """Entradas de add_constraints restringidas a un grupo de empleados.
+
+    Los identificadores de empleado (también los de los selectores de las reglas)
+    se renumeran según su posición en el grupo; las reglas cuyo selector no tiene a
+    nadie del grupo se descartan. La demanda de cobertura pasa a ser la parte
+    asignada al grupo, día a día.
+    """
+    local_ids = {int(e): i for i, e in enumerate(group)}
+    sub_inputs = dict(inputs)
+    sub_inputs["fixed_assignments"] = select(inputs["fixed_assignments"], local_ids)
+    sub_inputs["requests"] = select(inputs["requests"], local_ids)
+    for name, position in (("shift_constraints", 8), ("weekly_constraints", 7), ("penalized_transitions", 3)):
+        sub_inputs[name] = [rule for rule in (_local_rule(rule, position, local_ids) for rule in inputs[name])
+                            if rule is not None]
+    sub_inputs["weekly_cover_demands"] = [tuple(day) for day in cover_demands.tolist()]
+    sub_inputs["cover_shortage_penalty"] = shortage_penalty
+    return sub_inputs
+
+
+def _local_rule(rule, position, local_ids):
+    """La regla con su selector de empleados (en position) renumerado, o None si no afecta al grupo."""
+    if len(rule) <= position or rule[position] is None:
+        return rule
+    selector = tuple(local_ids[e] for e in rule[position] if e in local_ids)
+    if not selector:
+        return None
+    return (*rule[:position], selector, *rule[position + 1:])
+
+
+class Decomposition:
+    """Descomposición por grupos de empleados coordinada por la cobertura.
+
+    La cobertura es lo único que acopla a los empleados: la demanda de cada día y
+    turno se reparte entre los grupos, cada grupo se resuelve por separado (en
+    paralelo, con la demanda mínima como restricción blanda) y el reparto se
+    reequilibra en cada iteración moviendo la demanda no cubierta hacia los grupos
+    que tienen personal de sobra o, si no los hay, hacia los que menos déficit han
+    acumulado. Además, cada (día, turno) sin cubrir acumula un precio (multiplicador
+    tipo Lagrange, actualizado por subgradiente) que premia en todos los grupos cubrir
+    por encima de su parte, de modo que aparece personal de sobra donde hace falta.
+
+    model_options son las opciones de Model; eligible (empleados x turnos) se
+    recorta a las filas de cada grupo.
+    """
+
+    def __init__(self, num_employees, num_weeks, inputs, num_groups, shortage_penalty=1000, max_iterations=20,
+                 price_step=250, model_options=None):
+        self.num_employees = num_employees
+        self.num_weeks = num_weeks
+        self.num_days = num_weeks * 7
+        self.inputs = inputs
+        self.model_options = dict(model_options or {})
+        self.shortage_penalty = shortage_penalty
+        self.max_iterations = max_iterations
+        self.price_step = price_step
+        # Reparto round-robin para que los grupos tengan tamaños parecidos
+        self.groups = [np.arange(g, num_employees, num_groups) for g in range(min(num_groups, num_employees))]
+
+        weekly = np.asarray(inputs["weekly_cover_demands"], dtype=np.int64)
+        self.demand = weekly[np.arange(self.num_days) % len(weekly)]  # (días x turnos de trabajo)
+
+    def initial_split(self):
+        """Reparte la demanda proporcionalmente al tamaño de cada grupo."""
+        sizes = np.array([len(group) for group in self.groups])
+        exact = self.demand[np.newaxis] * (sizes / self.num_employees)[:, np.newaxis, np.newaxis]
+        split = np.floor(exact).astype(np.int64)
+        # El resto se asigna a los grupos con mayor parte fraccionaria
+        remainder = self.demand - split.sum(axis=0)
+        order = np.argsort(-(exact - split), axis=0, kind="stable")
+        for d, s in np.ndindex(*self.demand.shape):
+            for g in order[:remainder[d, s], d, s]:
+                split[g, d, s] += 1
+        return split
+
+    def solve_group(self, g, split, prices, params, hint=None):
+        """Resuelve el subproblema de un grupo y devuelve (status, horario)."""
+        group = self.groups[g]
+        inputs = group_inputs(self.inputs, group, split[g], self.shortage_penalty)
+        options = dict(self.model_options)
+        if options.get("eligible") is not None:
+            options["eligible"] = np.asarray(options["eligible"], dtype=bool)[group].tolist()
+        model = Model.build(len(group), self.num_weeks, inputs, **options)
+        # Premio por cubrir por encima de la parte del grupo donde falta personal
+        for d, s in zip(*np.nonzero(prices)):
+            bonus = model.model.new_int_var(0, len(group), f"cover_bonus(shift={s + 1}, day={d})")
+            has_bonus = model.model.new_bool_var("")
+            model.model.add(bonus <= cp_model.LinearExpr.sum(model.shift_day(s + 1, d)) - int(split[g, d, s])).only_enforce_if(has_bonus)
+            model.model.add(bonus == 0).only_enforce_if(~has_bonus)
+            model.obj_int_vars.append(bonus)
+            model.obj_int_coeffs.append(-int(prices[d, s]))
+        model.set_objective()
+        solver = Solver(model)
+        # El horario de la iteración anterior sirve de punto de partida
+        if hint is not None:
+            solver.add_schedule_hint(hint)
+        status = solver.solve(params, "", log_solutions=False)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return status, None
+        return status, solver.schedule_matrix()
+
+    def coverage(self, schedules):
+        """Personas asignadas a cada (grupo, día, turno de trabajo)."""
+        num_shifts = self.demand.shape[1] + 1
+        return np.stack([
+            (schedule[:, :, np.newaxis] == np.arange(1, num_shifts)).sum(axis=0) for schedule in schedules
+        ])
+
+    def rebalance(self, split, covered, shortfalls):
+        """Mueve la demanda no cubierta de cada grupo hacia otros grupos."""
+        shortage = np.maximum(split - covered, 0)
+        surplus = np.maximum(covered - split, 0)
+        shortfalls += shortage
+        for g, d, s in zip(*np.nonzero(shortage)):
+            missing = shortage[g, d, s]
+            # Primero, grupos que ya cubren más de lo que se les pidió
+            for h in np.argsort(-surplus[:, d, s], kind="stable"):
+                moved = min(missing, surplus[h, d, s])
+                if moved <= 0:
+                    break
+                split[g, d, s] -= moved
+                split[h, d, s] += moved
+                surplus[h, d, s] -= moved
+                missing -= moved
+            # Después, el grupo con menos déficit acumulado que aún tenga gente disponible
+            if missing > 0:
+                candidates = [h for h in np.argsort(shortfalls[:, d, s], kind="stable")
+                              if h != g and split[h, d, s] < len(self.groups[h])]
+                if candidates:
+                    h = candidates[0]
+                    moved = min(missing, len(self.groups[h]) - split[h, d, s])
+                    split[g, d, s] -= moved
+                    split[h, d, s] += moved
+        return split
+
+    def solve(self, params, num_threads=None):
+        """Resuelve los grupos iterativamente hasta cubrir la demanda.
+
+        Los núcleos se reparten entre los grupos que se resuelven a la vez (ver
+        split_cores), salvo que params ya fije num_workers.
+
+        Returns:
+            tuple: (status, horario empleados x días, iteraciones realizadas).
+        """
+        num_threads, num_workers = split_cores(len(self.groups), num_threads or 0)
+        if "num_workers" not in params:
+            params = ",".join(filter(None, [params, f"num_workers:{num_workers}"]))
+        split = self.initial_split()
+        shortfalls = np.zeros(split.shape, dtype=np.int64)
+        prices = np.zeros(self.demand.shape, dtype=np.int64)
+        schedule = None
+        status = cp_model.UNKNOWN
+        with ThreadPoolExecutor(max_workers=num_threads) as pool:
+            for iteration in range(1, self.max_iterations + 1):
+                hints = [None] * len(self.groups) if schedule is None else [schedule[group] for group in self.groups]
+                results = list(pool.map(lambda g: self.solve_group(g, split, prices, params, hints[g]),
+                                        range(len(self.groups))))
+                if any(group_schedule is None for _, group_schedule in results):
+                    return cp_model.INFEASIBLE, None, iteration
+                schedules = [group_schedule for _, group_schedule in results]
+                schedule = np.zeros((self.num_employees, self.num_days), dtype=np.int8)
+                for group, group_schedule in zip(self.groups, schedules):
+                    schedule[group] = group_schedule
+
+                covered = self.coverage(schedules)
+                uncovered = np.maximum(self.demand - covered.sum(axis=0), 0)
+                if not uncovered.any():
+                    return cp_model.FEASIBLE, schedule, iteration
+                # Paso de subgradiente decreciente: el precio sube donde falta personal
+                # y baja donde sobra
+                step = int(np.ceil(self.price_step / np.sqrt(iteration)))
+                prices = np.maximum(prices + step * (self.demand - covered.sum(axis=0)), 0)
+                split = self.rebalance(split, covered, shortfalls)
+        # Sin convergencia: se devuelve el último horario, que no cubre toda la demanda
+        return status, schedule, self.max_iterations
+
+    def evaluate(self, schedule, params=""):
+        """Evalúa el horario completo sobre el modelo monolítico (ver RollingHorizon.evaluate)."""
+        options = dict(self.model_options, symmetry_breaking=False)
+        model = Model.build(self.num_employees, self.num_weeks, self.inputs, **options)
+        solver = Solver(model)
+        solver.freeze_weeks(schedule, range(self.num_weeks))
+        return solver, solver.solve(params, "")
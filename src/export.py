@@ -0,0 +1,190 @@
+import csv
+import datetime
+import gzip
+import json
+import os
+import re
+
+import numpy as np
+
+from mappings import Mappings
+
+# Horas de inicio y fin de los turnos de Mappings en iCalendar (el de noche termina al día siguiente).
+# Los turnos sin horas se exportan como eventos de día completo.
+SHIFT_HOURS = {1: (6, 14), 2: (14, 22), 3: (22, 6)}
+# Filas que se formatean y escriben de una vez
+CHUNK_ROWS = 1 << 16
+TABLE_SUFFIXES = (".csv", ".jsonl", ".parquet")
+
+
+def schedule_table(schedule, shifts=Mappings.SHIFT_NAMES, employee_names=None, start_date=None, include_off=False):
+    """Columnas (empleado, día, turno) de un horario (empleados x días), calculadas de una vez con NumPy.
+
+    Las filas van por empleado y, dentro de cada empleado, por día; sin
+    include_off se omiten los días libres. Con start_date (el lunes de la primera
+    semana) se añade la fecha de cada día.
+
+    Returns:
+        dict: columna -> array.
+    """
+    employee_names = _employee_names(schedule, employee_names)
+    employees, days = np.nonzero(np.ones(schedule.shape, dtype=bool) if include_off else schedule != 0)
+    shift_ids = schedule[employees, days].astype(np.int64)
+    table = {
+        "employee_id": employees,
+        "employee": np.asarray(employee_names, dtype=object)[employees],
+        "day": days,
+        "week": days // 7 + 1,
+    }
+    if start_date is not None:
+        table["date"] = (np.datetime64(start_date, "D") + days).astype(str).astype(object)
+    table["shift_id"] = shift_ids
+    table["shift"] = np.asarray(shifts, dtype=object)[shift_ids]
+    return table
+
+
+def write_table(path, table):
+    """Escribe una tabla (columna -> array) en CSV, JSON Lines o Parquet según la extensión.
+
+    Las filas se formatean por bloques de CHUNK_ROWS y cada bloque se escribe de
+    una vez; .csv.gz y .jsonl.gz se comprimen con gzip.
+    """
+    suffix = _table_suffix(path)
+    if suffix == ".parquet":
+        _write_parquet(path, table)
+        return
+    columns = list(table)
+    num_rows = len(table[columns[0]]) if columns else 0
+    with _open_text(path) as table_file:
+        if suffix == ".csv":
+            writer = csv.writer(table_file, lineterminator="\n")
+            writer.writerow(columns)
+            for start in range(0, num_rows, CHUNK_ROWS):
+                writer.writerows(zip(*(table[name][start:start + CHUNK_ROWS].tolist() for name in columns)))
+        else:
+            # Cada fila sale de una plantilla; los textos se codifican en JSON una vez por valor distinto
+            keys = (json.dumps(name, ensure_ascii=False).replace("{", "{{").replace("}", "}}") for name in columns)
+            template = "{{" + ", ".join(f"{key}: {{}}" for key in keys) + "}}\n"
+            encoded = [_json_column(table[name]) for name in columns]
+            for start in range(0, num_rows, CHUNK_ROWS):
+                chunk = [values[start:start + CHUNK_ROWS] for values in encoded]
+                table_file.write("".join(map(template.format, *chunk)))
+
+
+def write_schedule(path, schedule, shifts=Mappings.SHIFT_NAMES, employee_names=None, start_date=None,
+                   include_off=False, shift_hours=None):
+    """Exporta un horario según la extensión: tabla (ver write_table) o calendarios (.ics).
+
+    Con .ics, path es el directorio donde se escribe un calendario por empleado.
+    """
+    if path.endswith(".ics") or os.path.isdir(path):
+        write_calendars(path.removesuffix(".ics"), schedule, shifts, employee_names, start_date, shift_hours)
+    else:
+        write_table(path, schedule_table(schedule, shifts, employee_names, start_date, include_off))
+
+
+def write_calendars(directory, schedule, shifts=Mappings.SHIFT_NAMES, employee_names=None, start_date=None,
+                    shift_hours=None):
+    """Escribe un calendario iCalendar (.ics) por empleado con un evento por turno de trabajo.
+
+    Las horas de cada turno salen de shift_hours (turno -> (inicio, fin)), por
+    defecto SHIFT_HOURS si el horario usa los turnos de Mappings; los turnos sin
+    horas son eventos de día completo.
+
+    Returns:
+        list: rutas de los calendarios escritos.
+    """
+    if start_date is None:
+        raise ValueError("Los calendarios necesitan la fecha de inicio del horario (start_date).")
+    if shift_hours is None:
+        shift_hours = SHIFT_HOURS if len(shifts) == len(Mappings.SHIFT_NAMES) else {}
+    employee_names = _employee_names(schedule, employee_names)
+    table = schedule_table(schedule, shifts, employee_names, start_date)
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    start = np.datetime64(start_date, "D")
+    # Líneas DTSTART/DTEND de cada (turno, día), calculadas por columnas
+    dates = np.char.replace(table["date"].astype(str), "-", "")
+    next_dates = np.char.replace((start + table["day"] + 1).astype(str), "-", "")
+    times = np.empty(len(dates), dtype=object)
+    for s in np.unique(table["shift_id"]).tolist():
+        rows = table["shift_id"] == s
+        if s in shift_hours:
+            begin, end = shift_hours[s]
+            end_dates = next_dates[rows] if end <= begin else dates[rows]
+            times[rows] = [f"DTSTART:{date}T{begin:02d}0000\r\nDTEND:{end_date}T{end:02d}0000"
+                           for date, end_date in zip(dates[rows].tolist(), end_dates.tolist())]
+        else:
+            times[rows] = [f"DTSTART;VALUE=DATE:{date}\r\nDTEND;VALUE=DATE:{end_date}"
+                           for date, end_date in zip(dates[rows].tolist(), next_dates[rows].tolist())]
+    summaries = np.asarray([_ical_text(shift) for shift in shifts], dtype=object)[table["shift_id"]]
+    bounds = np.searchsorted(table["employee_id"], np.arange(schedule.shape[0] + 1))
+    paths = []
+    for e in range(schedule.shape[0]):
+        rows = slice(bounds[e], bounds[e + 1])
+        events = "".join(
+            f"BEGIN:VEVENT\r\nUID:{e}-{day}@employee-scheduling\r\nDTSTAMP:{stamp}\r\n{when}\r\n"
+            f"SUMMARY:{summary}\r\nEND:VEVENT\r\n"
+            for day, when, summary in zip(table["day"][rows].tolist(), times[rows], summaries[rows])
+        )
+        path = os.path.join(directory, f"{e:03d}-{_slug(employee_names[e])}.ics")
+        with open(path, "w", encoding="utf-8", newline="") as calendar_file:
+            calendar_file.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//employee-scheduling//EN\r\n"
+                                f"X-WR-CALNAME:{_ical_text(employee_names[e])}\r\n{events}END:VCALENDAR\r\n")
+        paths.append(path)
+    return paths
+
+
+def _employee_names(schedule, employee_names):
+    if employee_names is None:
+        return [Mappings.ID_TO_WORKER.get(e, f"Employee {e}") for e in range(schedule.shape[0])]
+    return employee_names
+
+
+def _table_suffix(path):
+    suffix = os.path.splitext(path.removesuffix(".gz"))[1]
+    if suffix not in TABLE_SUFFIXES or (suffix == ".parquet" and path.endswith(".gz")):
+        raise ValueError(f"Formato de exportación no reconocido: {path}. Usa .csv, .jsonl (o .gz), .parquet o .ics")
+    return suffix
+
+
+def _open_text(path):
+    """Abre el fichero de texto con un búfer grande, comprimiendo con gzip si termina en .gz."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="", buffering=1 << 20)
+
+
+def _json_column(values):
+    """Valores de una columna ya codificados en JSON."""
+    if values.dtype == object:
+        unique, inverse = np.unique(values.astype(str), return_inverse=True)
+        return np.asarray([json.dumps(value, ensure_ascii=False) for value in unique.tolist()],
+                          dtype=object)[inverse].tolist()
+    return values.tolist()
+
+
+def _write_parquet(path, table):
+    """Escribe la tabla en Parquet con pyarrow (opcional), un grupo de filas por bloque."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Exportar a Parquet necesita pyarrow (pip install pyarrow).") from None
+
+    schema = pa.schema([(name, pa.string() if values.dtype == object else pa.from_numpy_dtype(values.dtype))
+                        for name, values in table.items()])
+    num_rows = len(next(iter(table.values()))) if table else 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for start in range(0, max(num_rows, 1), CHUNK_ROWS):
+            writer.write_table(pa.table({name: values[start:start + CHUNK_ROWS] for name, values in table.items()},
+                                        schema=schema))
+
+
+def _ical_text(text):
+    """Escapa un texto para una propiedad de iCalendar."""
+    return str(text).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _slug(name):
+    return re.sub(r"[^\w-]+", "_", str(name)).strip("_") or "employee"
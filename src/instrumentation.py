@@ -0,0 +1,123 @@
+import cProfile
+import functools
+import json
+import pstats
+import re
+import time
+from contextlib import contextmanager
+
+from ortools.sat.python import cp_model
+
+# Estadísticas de la respuesta de CP-SAT que se guardan con las métricas
+RESPONSE_FIELDS = (
+    "num_booleans", "num_integers", "num_conflicts", "num_branches", "num_binary_propagations",
+    "num_integer_propagations", "num_restarts", "num_lp_iterations", "wall_time", "user_time",
+    "deterministic_time", "gap_integral",
+)
+# Línea del log de CP-SAT que marca el final del presolve
+_SEARCH_START = re.compile(r"Starting search at ([0-9.]+)s")
+
+
+def timed_phase(method):
+    """Decora un método de Model para medir su tiempo y lo que añade al modelo.
+
+    Cada llamada añade a model.phases un registro con el nombre del método, la
+    duración y el número de variables y restricciones creadas.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        proto = self.model.Proto()
+        variables, constraints = len(proto.variables), len(proto.constraints)
+        start = time.perf_counter()
+        result = method(self, *args, **kwargs)
+        self.phases.append({
+            "phase": method.__name__,
+            "time": time.perf_counter() - start,
+            "variables": len(proto.variables) - variables,
+            "constraints": len(proto.constraints) - constraints,
+        })
+        return result
+    return wrapper
+
+
+@contextmanager
+def timed(phases, name):
+    """Añade a phases la duración del bloque con el nombre indicado."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases.append({"phase": name, "time": time.perf_counter() - start})
+
+
+class PresolveTimer:
+    """Obtiene el tiempo de presolve del log de CP-SAT, que la respuesta no incluye.
+
+    Activa el log de búsqueda en los parámetros del solver; si no estaba activado
+    de antemano, el log no se imprime por pantalla.
+    """
+
+    def __init__(self, solver):
+        self.presolve_time = None
+        if not solver.parameters.log_search_progress:
+            solver.parameters.log_search_progress = True
+            solver.parameters.log_to_stdout = False
+        solver.log_callback = self
+
+    def __call__(self, line):
+        match = _SEARCH_START.search(line)
+        if match:
+            self.presolve_time = float(match.group(1))
+
+
+class ObjectiveRecorder(cp_model.CpSolverSolutionCallback):
+    """Registra (tiempo, objetivo, cota) de cada solución encontrada."""
+
+    def __init__(self):
+        super().__init__()
+        self.history = []
+
+    def on_solution_callback(self):
+        self.history.append((round(self.wall_time, 3), self.objective_value, self.best_objective_bound))
+
+
+def solve_recorded(model, time_limit, num_workers):
+    """Resuelve un CpModel registrando cada solución (ver ObjectiveRecorder).
+
+    Returns:
+        (solver, status, history): el CpSolver, el estado y el historial de soluciones.
+    """
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    solver.parameters.num_workers = num_workers
+    recorder = ObjectiveRecorder()
+    status = solver.solve(model, recorder)
+    return solver, status, recorder.history
+
+
+def response_stats(response):
+    """Extrae las estadísticas de un CpSolverResponse como diccionario."""
+    return {field: getattr(response, field) for field in RESPONSE_FIELDS}
+
+
+def write_metrics(path, metrics):
+    """Escribe las métricas en JSON."""
+    with open(path, "w", encoding="utf-8") as metrics_file:
+        json.dump(metrics, metrics_file, indent=2)
+
+
+@contextmanager
+def profiled(path, top=20):
+    """Perfila el bloque con cProfile.
+
+    Guarda las estadísticas en path (legibles con pstats o snakeviz) e imprime las
+    top funciones con más tiempo acumulado.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        pstats.Stats(profiler).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
@@ -0,0 +1,147 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from google.protobuf import text_format
+from ortools.sat.python import cp_model
+
+# Tipos de vecindario: empleados en todo el horizonte, todos los empleados en unos
+# días consecutivos y los empleados de un turno en una semana
+NEIGHBORHOODS = ("employees", "days", "shift_week")
+
+
+class LargeNeighborhoodSearch:
+    """Búsqueda en vecindarios grandes con vecindarios propios del problema de turnos.
+
+    En cada ronda cada hilo libera un vecindario del horario actual (el resto de
+    celdas (empleado, día) quedan fijadas), lo resuelve con un límite de tiempo
+    corto partiendo del horario actual como pista y, si mejora el objetivo, el
+    mejor resultado de la ronda pasa a ser el horario actual.
+
+    Cada hilo trabaja sobre su propia copia del modelo (CpModel.clone), ya que
+    CP-SAT libera el GIL mientras resuelve. El tamaño de cada tipo de vecindario se
+    adapta: crece cuando el subproblema se resuelve a optimalidad sin mejorar (el
+    vecindario se ha agotado) y decrece cuando se queda sin tiempo.
+    """
+
+    def __init__(self, model, num_workers=4, sub_time_limit=1.0, relaxed_fraction=0.1, seed=0):
+        """
+        Args:
+            model: Model ya construido (sin ruptura de simetrías, que podría no
+                respetar el horario actual).
+            num_workers: hilos, y por tanto vecindarios, por ronda.
+            sub_time_limit: límite de tiempo de cada subproblema en segundos.
+            relaxed_fraction: fracción inicial de celdas liberadas en cada vecindario.
+            seed: semilla de la elección de vecindarios.
+        """
+        if model.symmetry_breaking:
+            raise ValueError("La búsqueda en vecindarios necesita un modelo sin ruptura de simetrías.")
+        self.model = model
+        self.num_workers = num_workers
+        self.sub_time_limit = sub_time_limit
+        self.rng = np.random.default_rng(seed)
+        self.fractions = dict.fromkeys(NEIGHBORHOODS, relaxed_fraction)
+        self.copies = [model.model.clone() for _ in range(num_workers)]
+        self.history = []
+
+    def neighborhood(self, kind, schedule):
+        """Máscara (empleados x días) de las celdas liberadas por un vecindario del tipo indicado."""
+        model = self.model
+        num_employees, num_days = model.num_employees, model.num_days
+        fraction = self.fractions[kind]
+        mask = np.zeros((num_employees, num_days), dtype=bool)
+        if kind == "employees":
+            size = max(1, round(fraction * num_employees))
+            mask[self.rng.choice(num_employees, size, replace=False)] = True
+        elif kind == "days":
+            size = min(num_days, max(2, round(fraction * num_days)))
+            first = self.rng.integers(num_days - size + 1)
+            mask[:, first:first + size] = True
+        else:
+            # Empleados que trabajan el turno s en la semana w, más algunos que no
+            # lo trabajan para que puedan entrar en él
+            week = model.week_days(self.rng.integers(model.num_weeks))
+            s = self.rng.integers(1, model.num_shifts)
+            working = (schedule[:, week] == s).any(axis=1)
+            size = max(1, round(fraction * num_employees))
+            others = np.flatnonzero(~working)
+            extra = self.rng.choice(others, min(size, len(others)), replace=False)
+            mask[working, week] = True
+            mask[extra, week] = True
+        return mask
+
+    def solve_cells(self, worker, schedule, mask, params, time_limit=None):
+        """Resuelve el modelo liberando solo las celdas de mask, en la copia del hilo worker.
+
+        Returns:
+            tuple: (status, objetivo, horario), con objetivo y horario None si no hay solución.
+        """
+        cp = self.copies[worker]
+        proto = cp.Proto()
+        cp.clear_hints()
+        indices, values = self.model.hint_cells(schedule)
+        proto.solution_hint.vars.extend(indices)
+        proto.solution_hint.values.extend(values)
+
+        solver = cp_model.CpSolver()
+        if params:
+            text_format.Merge(params, solver.parameters)
+        if time_limit is not None:
+            solver.parameters.max_time_in_seconds = time_limit
+        solver.parameters.num_workers = 1
+        with self.model.fixed_cells(schedule, ~mask, cp):
+            status = solver.solve(cp)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return status, None, None
+        values = np.array(solver.response_proto.solution, dtype=np.int64)
+        return status, solver.objective_value, values[self.model.work_index].argmax(axis=1).astype(np.int8)
+
+    def adapt(self, kind, status, improved):
+        """Ajusta el tamaño del tipo de vecindario según el resultado del subproblema."""
+        if status == cp_model.OPTIMAL and not improved:
+            self.fractions[kind] = min(1.0, self.fractions[kind] * 1.25)
+        elif status != cp_model.OPTIMAL:
+            self.fractions[kind] = max(0.01, self.fractions[kind] / 1.25)
+
+    def schedule_cost(self, schedule, params=""):
+        """Objetivo del horario en el modelo, o None si no cumple las restricciones."""
+        _, objective, _ = self.solve_cells(0, schedule, np.zeros(schedule.shape, dtype=bool), params)
+        return objective
+
+    def run(self, schedule, time_limit, params=""):
+        """Mejora el horario (empleados x días) durante time_limit segundos.
+
+        Returns:
+            tuple: (mejor horario, su objetivo). El objetivo es None si el horario
+            inicial no cumple las restricciones duras, y entonces no se mejora.
+        """
+        start = time.perf_counter()
+        objective = self.schedule_cost(schedule, params)
+        if objective is None:
+            return schedule, None
+        self.history = [{"time": round(time.perf_counter() - start, 3), "objective": objective,
+                         "neighborhood": None}]
+        kinds = list(NEIGHBORHOODS)
+        with ThreadPoolExecutor(max_workers=self.num_workers) as pool:
+            round_number = 0
+            while time.perf_counter() - start + self.sub_time_limit <= time_limit:
+                # Los vecindarios se eligen aquí porque el generador aleatorio no es seguro entre hilos
+                round_kinds = [kinds[(round_number + worker) % len(kinds)] for worker in range(self.num_workers)]
+                futures = [
+                    pool.submit(self.solve_cells, worker, schedule, self.neighborhood(kind, schedule), params,
+                                self.sub_time_limit)
+                    for worker, kind in enumerate(round_kinds)
+                ]
+                best = None
+                for kind, future in zip(round_kinds, futures):
+                    status, candidate, repaired = future.result()
+                    improved = candidate is not None and candidate < objective
+                    self.adapt(kind, status, improved)
+                    if improved and (best is None or candidate < best[0]):
+                        best = (candidate, repaired, kind)
+                if best is not None:
+                    objective, schedule, kind = best
+                    self.history.append({"time": round(time.perf_counter() - start, 3), "objective": objective,
+                                         "neighborhood": kind})
+                round_number += 1
+        return schedule, objective
@@ -1,18 +1,120 @@
+import contextlib
+import os
+
+import numpy as np
+
 from absl import app, flags
+from ortools.sat.python import cp_model
+from day_index import DayIndex
 from model import Model
 from solver import Solver
 from data_conversion import create_shift_constraint, create_request, create_penalized_transition, create_weekly_sum_constraint, create_daily_demand, create_fixed_assignment
 
 # Definiciones de los parámetros de la línea de comandos
 _OUTPUT_PROTO = flags.DEFINE_string(
-    "output_proto", "", "Output file to write the cp_model proto to."
+    "output_proto", "", "Output file to write the cp_model proto to (.pb binary, text otherwise, .gz compressed)."
 )
 _PARAMS = flags.DEFINE_string(
     "params", "max_time_in_seconds:2.0", "Sat solver parameters."
 )
+_PREVIOUS_SCHEDULE = flags.DEFINE_string(
+    "previous_schedule", "", "Schedule file (.npy) used as a hint if it exists, and overwritten with the new solution."
+)
+_FREEZE_WEEKS = flags.DEFINE_list(
+    "freeze_weeks", [], "Weeks (1-based) fixed to the previous schedule."
+)
+_CACHE_DIR = flags.DEFINE_string(
+    "cache_dir", "", "Directory of the built model cache. Disabled if empty."
+)
+_CACHE_MAX_MB = flags.DEFINE_integer(
+    "cache_max_mb", 1024, "Maximum size of the model cache in MB."
+)
+_WINDOW_WEEKS = flags.DEFINE_integer(
+    "window_weeks", 0, "Solve with a rolling horizon of this many weeks (0 solves all weeks at once)."
+)
+_COMPACT = flags.DEFINE_bool(
+    "compact", False, "Use the compact encoding of the cover and weekly sum constraints."
+)
+_SYMMETRY_BREAKING = flags.DEFINE_bool(
+    "symmetry_breaking", False, "Order the schedules of interchangeable employees lexicographically."
+)
+_PRESOLVE = flags.DEFINE_bool(
+    "presolve", False, "Fold the fixed assignments into constants before generating the constraints."
+)
+_GREEDY_HINT = flags.DEFINE_bool(
+    "greedy_hint", False, "Hint the solver with a greedy roster when there is no previous schedule."
+)
+_QUICK = flags.DEFINE_bool(
+    "quick", False, "Print the greedy roster without running the solver."
+)
+_ABSENCES = flags.DEFINE_list(
+    "absences", [], "Repair --previous_schedule for these absences, given as name:day[:week] (e.g. Ana:lunes:2)."
+)
+_LNS_TIME = flags.DEFINE_float(
+    "lns_time", 0.0, "Improve the previous schedule (or the greedy roster) with a large neighborhood search for "
+    "this many seconds instead of a single solve (0 disables it)."
+)
+_LNS_WORKERS = flags.DEFINE_integer(
+    "lns_workers", 4, "Threads of the large neighborhood search, each solving its own neighborhood."
+)
+_METRICS = flags.DEFINE_string(
+    "metrics", "", "JSON file to write the build and solve metrics to (phase times, presolve time, search stats)."
+)
+_PROFILE = flags.DEFINE_string(
+    "profile", "", "File to write a cProfile profile of the model build to."
+)
+_PROGRESS_FILE = flags.DEFINE_string(
+    "progress_file", "", "JSON lines file to stream each improving solution to (time, objective, bound, gap)."
+)
+_SNAPSHOTS = flags.DEFINE_bool(
+    "snapshots", False, "Include the schedule of each improving solution in --progress_file."
+)
+_STOP_GAP = flags.DEFINE_float(
+    "stop_gap", None, "Stop the search once the relative gap is below this percentage."
+)
+_STOP_STALL = flags.DEFINE_float(
+    "stop_stall", None, "Stop the search after this many seconds without improving the objective."
+)
+_GROUPS = flags.DEFINE_integer(
+    "groups", 0, "Decompose the employees into this many groups coordinated by the cover demand (0 disables it)."
+)
+_EXPORT = flags.DEFINE_list(
+    "export", [], "Files to export the solved schedule to (.csv, .jsonl, .gz compressed, or .parquet); a .ics path "
+                  "is a directory with one calendar per employee."
+)
+_EXPORT_PENALTIES = flags.DEFINE_string(
+    "export_penalties", "", "File to export the penalties of the solution to (.csv, .jsonl, .gz or .parquet)."
+)
+_START_DATE = flags.DEFINE_string(
+    "start_date", "", "Date of the first Monday of the schedule (YYYY-MM-DD) used by --export."
+)
+
+
+def export_solution(solver, status):
+    """Exporta el horario y las penalizaciones de la solución a los ficheros de --export y --export_penalties."""
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return
+    for path in _EXPORT.value:
+        solver.export_schedule(path, _START_DATE.value or None)
+        print(f"Schedule exported to {path}")
+    if _EXPORT_PENALTIES.value:
+        solver.export_penalties(_EXPORT_PENALTIES.value)
+        print(f"Penalties exported to {_EXPORT_PENALTIES.value}")
 
 
 def main(_):
+    if _SYMMETRY_BREAKING.value and _FREEZE_WEEKS.value:
+        # El horario congelado no tiene por qué respetar el orden entre empleados
+        raise app.UsageError("--symmetry_breaking can not be combined with --freeze_weeks")
+    if _PRESOLVE.value and _ABSENCES.value:
+        # La reparación retira asignaciones fijas, que el presolve ha convertido en constantes
+        raise app.UsageError("--presolve can not be combined with --absences")
+    if _SYMMETRY_BREAKING.value and _ABSENCES.value:
+        # La reparación fija celdas del horario anterior, que no tiene por qué respetar el orden entre empleados
+        raise app.UsageError("--symmetry_breaking can not be combined with --absences")
+    if _SYMMETRY_BREAKING.value and _LNS_TIME.value > 0:
+        # El horario inicial (heurística o anterior) y la evaluación final fijan celdas sin respetar el orden
+        raise app.UsageError("--symmetry_breaking can not be combined with --lns_time")
     # Datos originales del problema
     num_employees = 8
     num_weeks = 3 # Setmanes per predir
@@ -38,11 +140,11 @@ def main(_):
         ("Sara", "noche", "martes", 1),
     ]
 
-    fixed_assignments = [
-        create_fixed_assignment(employee, shift, day, week)
-        for week in range(1, num_weeks + 1)  # Iterar sobre todas las semanas
-        for employee, shift, day, _ in values_week_1  # Reutilizar valores base
-    ]
+    # Cada valor base se repite todas las semanas como patrón, sin replicar la lista por semana
+    fixed_assignments = DayIndex(num_employees, num_weeks * 7)
+    for employee, shift, day, _ in values_week_1:
+        e, s, d = create_fixed_assignment(employee, shift, day)
+        fixed_assignments.add_pattern(e, s, weekdays=[d])
 
     # Preferències dels treballadors. IMPORTANT: Negatiu -> Torn desitjat. Positiu -> Torn no desitjat
     requests = [
@@ -92,20 +194,163 @@ def main(_):
     # Penalització per excés de personal en (matí, tarda, nit)
     excess_cover_penalties = (2, 2, 5) # Excés de personal en el torn de nit penalitza més que els torns de matí i tarda
 
-    # Inicializar modelo
-    model = Model(num_employees, num_weeks)
-    model.initialize_variables()
-    model.add_constraints(fixed_assignments, requests, shift_constraints, weekly_constraints, penalized_transitions,
-                          weekly_cover_demands, excess_cover_penalties)
+    inputs = dict(
+        fixed_assignments=fixed_assignments,
+        requests=requests,
+        shift_constraints=shift_constraints,
+        weekly_constraints=weekly_constraints,
+        penalized_transitions=penalized_transitions,
+        weekly_cover_demands=weekly_cover_demands,
+        excess_cover_penalties=excess_cover_penalties,
+    )
+
+    if _WINDOW_WEEKS.value > 0:
+        # Horizonte deslizante: se resuelve por ventanas y se evalúa el horario completo
+        from rolling_horizon import RollingHorizon
+
+        rolling = RollingHorizon(num_employees, num_weeks, inputs, _WINDOW_WEEKS.value, model_options=dict(
+            compact=_COMPACT.value, symmetry_breaking=_SYMMETRY_BREAKING.value, presolve=_PRESOLVE.value))
+        status, schedule = rolling.solve(_PARAMS.value)
+        if schedule is not None:
+            solver, status = rolling.evaluate(schedule)
+            print()
+            solver.print_fixed_assignments(fixed_assignments)
+            solver.print_solution(status)
+            export_solution(solver, status)
+        return
+
+    if _GROUPS.value > 0:
+        # Descomposición por grupos de empleados: se evalúa el horario resultante completo
+        from decomposition import Decomposition
+
+        decomposition = Decomposition(num_employees, num_weeks, inputs, _GROUPS.value, model_options=dict(
+            compact=_COMPACT.value, symmetry_breaking=_SYMMETRY_BREAKING.value, presolve=_PRESOLVE.value))
+        status, schedule, iterations = decomposition.solve(_PARAMS.value)
+        if status != cp_model.FEASIBLE:
+            print(f"Decomposition did not meet the cover demand after {iterations} iterations")
+            return
+        print(f"Decomposition met the cover demand after {iterations} iterations")
+        if schedule is not None:
+            solver, status = decomposition.evaluate(schedule)
+            print()
+            solver.print_fixed_assignments(fixed_assignments)
+            solver.print_solution(status)
+            export_solution(solver, status)
+        return
 
-    model.set_objective()
+    if _QUICK.value:
+        # Modo rápido: solo la heurística constructiva, sin construir el modelo de CP-SAT
+        from heuristic import GreedyRoster
+
+        roster = GreedyRoster(num_employees, num_weeks, inputs)
+        schedule = roster.build()
+        print()
+        Solver(Model(num_employees, num_weeks)).print_solutionSchedule(schedule)
+        print(f"Uncovered demand: {roster.uncovered_demand(schedule).sum()}")
+        return
+
+    # Inicializar modelo (desde la caché si las entradas no han cambiado)
+    if _PROFILE.value:
+        from instrumentation import profiled
+    with profiled(_PROFILE.value) if _PROFILE.value else contextlib.nullcontext():
+        if _CACHE_DIR.value:
+            from model_cache import ModelCache
+
+            model = ModelCache(_CACHE_DIR.value, _CACHE_MAX_MB.value << 20).load_or_build(
+                num_employees, num_weeks, inputs, compact=_COMPACT.value, symmetry_breaking=_SYMMETRY_BREAKING.value,
+                presolve=_PRESOLVE.value
+            )
+        else:
+            model = Model.build(num_employees, num_weeks, inputs, compact=_COMPACT.value,
+                                symmetry_breaking=_SYMMETRY_BREAKING.value, presolve=_PRESOLVE.value)
+    if _PRESOLVE.value:
+        print(model.presolve_summary())
+
+    if _ABSENCES.value:
+        # Reparación local del horario anterior para las ausencias indicadas
+        from repair import AbsenceRepair
+
+        if not (_PREVIOUS_SCHEDULE.value and os.path.exists(_PREVIOUS_SCHEDULE.value)):
+            raise app.UsageError("--absences needs an existing --previous_schedule")
+        absences = []
+        for absence in _ABSENCES.value:
+            name, day, *week = absence.split(":")
+            e, _, d = create_fixed_assignment(name, "libre", day, *map(int, week))
+            absences.append((e, d))
+        repair = AbsenceRepair(model, Solver.load_schedule(_PREVIOUS_SCHEDULE.value))
+        report = repair.repair(absences, _PARAMS.value)
+        print(f"Repair: {report['status']}, window days {report['window_days']}")
+        if "schedule" in report:
+            for e, d, old, new in report["changes"]:
+                print(f"  {model.employee_names[e]} day {d}: {model.shifts[old]} -> {model.shifts[new]}")
+            print(f"Shifts changed: {len(report['changes'])}, cost {report['cost_before']} -> "
+                  f"{report['cost_after']} (delta {report['cost_delta']})")
+            repair.solver.print_solutionSchedule(report["schedule"])
+            Solver.save_schedule(_PREVIOUS_SCHEDULE.value, report["schedule"])
+        return
+
+    if _LNS_TIME.value > 0:
+        # Búsqueda en vecindarios grandes desde el horario anterior o la heurística
+        from heuristic import GreedyRoster
+        from lns import LargeNeighborhoodSearch
+
+        if _PREVIOUS_SCHEDULE.value and os.path.exists(_PREVIOUS_SCHEDULE.value):
+            schedule = Solver.load_schedule(_PREVIOUS_SCHEDULE.value)
+        else:
+            schedule = GreedyRoster(num_employees, num_weeks, inputs).build()
+        lns = LargeNeighborhoodSearch(model, num_workers=_LNS_WORKERS.value)
+        schedule, objective = lns.run(schedule, _LNS_TIME.value)
+        if objective is None:
+            print("The initial schedule does not meet the hard constraints")
+            return
+        for record in lns.history:
+            print(f"LNS time = {record['time']:.2f} s, objective = {record['objective']}, "
+                  f"neighborhood = {record['neighborhood']}")
+        # Se evalúa el horario final fijándolo en el modelo para imprimirlo con sus penalizaciones
+        solver = Solver(model)
+        solver.add_schedule_hint(schedule)
+        with model.fixed_cells(schedule, np.ones(schedule.shape, dtype=bool)):
+            status = solver.solve(_PARAMS.value, _OUTPUT_PROTO.value, log_solutions=False)
+        print()
+        solver.print_fixed_assignments(fixed_assignments)
+        solver.print_solution(status)
+        export_solution(solver, status)
+        if _PREVIOUS_SCHEDULE.value:
+            Solver.save_schedule(_PREVIOUS_SCHEDULE.value, schedule)
+        return
 
     # Resolver modelo
     solver = Solver(model)
-    status = solver.solve(_PARAMS.value, _OUTPUT_PROTO.value)
+    # Modo incremental: se parte del horario anterior y se congelan las semanas indicadas
+    if _PREVIOUS_SCHEDULE.value and os.path.exists(_PREVIOUS_SCHEDULE.value):
+        previous_schedule = Solver.load_schedule(_PREVIOUS_SCHEDULE.value)
+        solver.add_schedule_hint(previous_schedule)
+        solver.freeze_weeks(previous_schedule, [int(week) - 1 for week in _FREEZE_WEEKS.value])
+    elif _GREEDY_HINT.value:
+        from heuristic import GreedyRoster
+
+        solver.add_schedule_hint(GreedyRoster(num_employees, num_weeks, inputs).build())
+    if _METRICS.value:
+        solver.enable_presolve_timing()
+    progress = None
+    if _PROGRESS_FILE.value or _STOP_GAP.value is not None or _STOP_STALL.value is not None:
+        from progress import ProgressRecorder
+
+        progress = ProgressRecorder(model, snapshots=_SNAPSHOTS.value, stream=_PROGRESS_FILE.value or None,
+                                    stop_gap=_STOP_GAP.value, stall_time=_STOP_STALL.value)
+    status = solver.solve(_PARAMS.value, _OUTPUT_PROTO.value, progress=progress)
+    if progress is not None and progress.stop_reason:
+        print(f"Search stopped early ({progress.stop_reason})")
+    if _METRICS.value:
+        from instrumentation import write_metrics
+
+        write_metrics(_METRICS.value, solver.metrics())
     print()
     solver.print_fixed_assignments(fixed_assignments)
     solver.print_solution(status)
+    export_solution(solver, status)
+    if _PREVIOUS_SCHEDULE.value and status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        Solver.save_schedule(_PREVIOUS_SCHEDULE.value, solver.schedule_matrix())
 
 
 if __name__ == "__main__":
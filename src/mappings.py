@@ -8,6 +8,14 @@ class Mappings:
         "Maria": 4, "Miguel": 5, "Juan": 6, "Sara": 7
     }
     ID_TO_WORKER = {v: k for k, v in EMPLOYEES.items()}
+    # Nombres con los que se imprimen los horarios
+    SHIFT_NAMES = ("Off", "Morning", "Afternoon", "Night")
+    DAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+    # Codificaciones disponibles para las restricciones de secuencia (ver Constraint).
+    # Se definen aquí para validar escenarios sin importar OR-Tools.
+    SPAN_ENCODING = "span"
+    AUTOMATON_ENCODING = "automaton"
+    SEQUENCE_ENCODINGS = (SPAN_ENCODING, AUTOMATON_ENCODING)
 
     @staticmethod
     def calculate_day_index(week: int, day_of_week: str) -> int:
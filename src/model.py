@@ -1,34 +1,244 @@
+import functools
+from collections import Counter
+from contextlib import contextmanager
+
+import numpy as np
 from ortools.sat.python import cp_model
 from constraint import Constraint
+from day_index import employee_signatures, entry_columns
+from mappings import Mappings
+from instrumentation import timed_phase
 
 class Model:
     """Encapsula la creación del modelo de programación de turnos."""
 
-    def __init__(self, num_employees, num_weeks):
+    def __init__(self, num_employees, num_weeks, compact=False, symmetry_breaking=False, shifts=None,
+                 eligible=None, presolve=False):
         # Datos básicos para la planificación.
         self.num_employees = num_employees
         self.num_weeks = num_weeks
         self.num_days = num_weeks * 7
-        self.day_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-        self.shifts = ["Off", "Morning", "Afternoon", "Night"] #["O", "M", "A", "N"]
+        self.day_names = list(Mappings.DAY_NAMES)
+        # Turnos propios del escenario (el primero es el libre); por defecto los de Mappings
+        self.shifts = list(Mappings.SHIFT_NAMES if shifts is None else shifts) #["O", "M", "A", "N"]
+        self.shift_labels = list(Mappings.ID_TO_SHIFT.values() if shifts is None else shifts)
+        self.employee_names = [Mappings.ID_TO_WORKER.get(e, f"Employee {e}") for e in range(num_employees)]
         self.num_shifts = len(self.shifts)
+        # Turnos que puede hacer cada empleado (empleados x turnos); el libre siempre
+        self.eligible = np.ones((num_employees, self.num_shifts), dtype=bool)
+        if eligible is not None:
+            self.eligible[:] = np.asarray(eligible, dtype=bool)
+            if not self.eligible[:, 0].all():
+                raise ValueError("Todos los empleados tienen que poder librar (turno 0).")
+        # Reglas que se aplican a cada empleado, para agrupar a los intercambiables
+        self.employee_rules = [[] for _ in range(num_employees)]
+        # Valor conocido de cada celda (empleado, turno, día) antes de crear las
+        # variables: -1 si es libre, 0 o 1 si es una constante. Los turnos no
+        # elegibles son siempre 0; con presolve, también las asignaciones fijas.
+        self.known = np.full((num_employees, self.num_shifts, self.num_days), -1, dtype=np.int8)
+        self.known[~self.eligible] = 0
+        self.presolve = presolve
+        # Lo que el presolve ha eliminado del modelo (ver fold_fixed_assignments)
+        self.presolve_report = Counter()
         self.model = cp_model.CpModel()
-        self.work = {}
+        # Tensor denso (empleado, turno, día) con las variables de trabajo y sus
+        # índices en el proto del modelo.
+        self.work = np.empty((0, self.num_shifts, self.num_days), dtype=object)
+        self.work_index = np.empty((0, self.num_shifts, self.num_days), dtype=np.int64)
+        # Índices de las restricciones de asignaciones fijas, para poder retirarlas
+        # sin reconstruir el modelo.
+        self.fixed_constraints = {}
+        # Estado previo al primer día (horizonte deslizante): último turno de cada
+        # empleado y longitud de la secuencia de cada turno que termina ese día.
+        self.last_shifts = None
+        self.initial_runs = np.zeros((num_employees, self.num_shifts), dtype=np.int64)
 
         self.obj_int_vars = []
         self.obj_int_coeffs = []
         self.obj_bool_vars = []
         self.obj_bool_coeffs = []
+        # Posiciones en obj_bool_vars de las peticiones de cada celda (e, s, d). Con el
+        # presolve las celdas fijas comparten la misma constante, así que las
+        # peticiones se identifican por su celda y no por la variable.
+        self.request_terms = {}
+        # Codificación compacta: sumas lineales directamente en el objetivo y en
+        # restricciones acotadas, sin variables auxiliares de suma ni de exceso.
+        self.compact = compact
+        # Términos del objetivo de la forma coeficiente * (suma de variables + desplazamiento)
+        self.obj_expr_vars = []
+        self.obj_expr_offsets = []
+        self.obj_expr_coeffs = []
+        self.obj_expr_names = []
+        # Orden lexicográfico entre empleados intercambiables
+        self.symmetry_breaking = symmetry_breaking
+        # Tiempo, variables y restricciones de cada fase de construcción
+        self.phases = []
+
+    @classmethod
+    def build(cls, num_employees, num_weeks, inputs, **options):
+        """Construye el modelo completo a partir de un diccionario con los argumentos de add_constraints.
+
+        Las opciones adicionales (p. ej. compact) se pasan al constructor.
+        """
+        model = cls(num_employees, num_weeks, **options)
+        if model.presolve:
+            model.fold_fixed_assignments(inputs["fixed_assignments"])
+        model.initialize_variables()
+        model.add_constraints(**inputs)
+        model.set_objective()
+        return model
+
+    def fold_fixed_assignments(self, fixed_assignments):
+        """Presolve: convierte las asignaciones fijas en constantes antes de crear las variables.
+
+        El día fijado de cada asignación (también los libres obligados, como las
+        vacaciones) queda sin variables: su turno vale 1 y los demás 0. Las reglas y
+        la cobertura que se generan después pliegan esos valores conocidos, de modo
+        que no crean las cláusulas, penalizaciones ni términos que ya se cumplen.
+        Las asignaciones plegadas no se pueden retirar sin reconstruir el modelo.
+        """
+        if len(fixed_assignments) == 0:
+            return
+        employees, shifts, days = entry_columns(fixed_assignments, 3)
+        if not self.eligible[employees, shifts].all():
+            e = employees[~self.eligible[employees, shifts]][0]
+            raise ValueError(f"El empleado {e} tiene fijado un turno que no puede hacer.")
+        cells = np.unique(np.stack([employees, days]), axis=1)
+        if cells.shape[1] != np.unique(np.stack([employees, shifts, days]), axis=1).shape[1]:
+            raise ValueError("Hay asignaciones fijas de dos turnos distintos el mismo día.")
+        self.known[employees, :, days] = 0
+        self.known[employees, shifts, days] = 1
+        self.presolve_report["fixed_days"] = cells.shape[1]
+
+    def presolve_summary(self):
+        """Resumen de una línea de lo que el presolve ha eliminado del modelo."""
+        labels = (
+            ("fixed_days", "fixed days"),
+            ("work_variables", "work variables"),
+            ("exactly_one", "one-shift-per-day constraints"),
+            ("fixed_constraints", "fixed assignment constraints"),
+            ("clauses", "sequence and transition clauses"),
+            ("sum_terms", "sum terms"),
+            ("objective_terms", "request terms"),
+        )
+        return "Presolve eliminated: " + ", ".join(f"{self.presolve_report[key]} {label}" for key, label in labels)
 
+    @timed_phase
     def initialize_variables(self):
-        """Inicializa las variables de trabajo (shift assignments)."""
-        for e in range(self.num_employees):
-            for s in range(self.num_shifts):
-                for d in range(self.num_days):
-                    self.work[e, s, d] = self.model.new_bool_var(f"work{e}_{s}_{d}")
+        """Inicializa las variables de trabajo (shift assignments).
+
+        Las celdas de valor conocido (self.known) no tienen variable: comparten la
+        constante 0 o 1 del modelo.
+        """
+        shape = (self.num_employees, self.num_shifts, self.num_days)
+        cells = self.known < 0
+        self.work = np.empty(shape, dtype=object)
+        self.work_index = np.empty(shape, dtype=np.int64)
+        for value in (0, 1):
+            constants = self.known == value
+            if constants.any():
+                constant = self.model.new_constant(value)
+                column = np.empty(np.count_nonzero(constants), dtype=object)
+                column.fill(constant)
+                self.work[constants] = column
+                self.work_index[constants] = constant.index
+        self.presolve_report["work_variables"] = int(np.count_nonzero(~cells))
+        first_index = len(self.model.Proto().variables)
+        work = np.empty(np.count_nonzero(cells), dtype=object)
+        for i, (e, s, d) in enumerate(np.argwhere(cells).tolist()):
+            work[i] = self.model.new_bool_var(f"work{e}_{s}_{d}")
+        self.work[cells] = work
+        # Las variables se crean consecutivamente, así que sus índices son un rango.
+        self.work_index[cells] = np.arange(first_index, first_index + work.size)
+
+    def set_initial_state(self, last_shifts, initial_runs):
+        """Fija el estado de los días anteriores al horizonte antes de añadir restricciones.
+
+        Args:
+            last_shifts: array (empleados,) con el turno de cada empleado el día anterior.
+            initial_runs: array (empleados x turnos) con la longitud de la secuencia de
+                cada turno que termina el día anterior.
+        """
+        self.last_shifts = np.asarray(last_shifts)
+        self.initial_runs = np.asarray(initial_runs)
+
+    def employee_day(self, e, d):
+        """Variables de todos los turnos del empleado e en el día d."""
+        return self.work[e, :, d]
+
+    def shift_day(self, s, d):
+        """Variables de todos los empleados en el turno s del día d."""
+        return self.work[:, s, d]
+
+    def employee_shift(self, e, s, days=slice(None)):
+        """Variables del empleado e en el turno s para los días indicados."""
+        return self.work[e, s, days]
+
+    def literals(self, e, s, days=slice(None)):
+        """Como employee_shift, pero con las celdas de valor conocido como bool de Python."""
+        works = self.work[e, s, days]
+        known = self.known[e, s, days]
+        if (known < 0).all():
+            return list(works)
+        return [bool(value) if value >= 0 else work for work, value in zip(works.tolist(), known.tolist())]
+
+    def week_days(self, w):
+        """Rango de días (slice) de la semana w."""
+        return slice(w * 7, (w + 1) * 7)
+
+    def rule_employees(self, rule, employees, shifts):
+        """Empleados a los que se aplica una regla sobre los turnos indicados.
+
+        Son los del selector de la regla (todos si es None) que pueden hacer esos
+        turnos: para los demás la regla no genera restricciones ni penalizaciones.
+        """
+        selected = range(self.num_employees) if employees is None else employees
+        selected = [e for e in selected if self.eligible[e, list(shifts)].all()]
+        for e in selected:
+            self.employee_rules[e].append(rule)
+        return selected
+
+    def hint_cells(self, schedule):
+        """Índices y valores de las variables de trabajo para dar un horario como pista.
+
+        Solo se incluyen las celdas con variable (las de valor conocido comparten una
+        constante); si el horario tiene menos días que el modelo, solo los primeros
+        días.
+
+        Returns:
+            tuple: (índices, valores) como listas.
+        """
+        num_days = schedule.shape[1]
+        hinted = schedule[:, np.newaxis, :] == np.arange(self.num_shifts)[np.newaxis, :, np.newaxis]
+        cells = self.known[:, :, :num_days] < 0
+        return (self.work_index[:, :, :num_days][cells].tolist(),
+                hinted[cells].astype(np.int64).tolist())
+
+    @contextmanager
+    def fixed_cells(self, schedule, mask, cp=None):
+        """Fija temporalmente las celdas (empleado, día) de mask al horario dado.
+
+        Se reducen los dominios de las variables de trabajo en el proto en lugar de
+        añadir restricciones, de modo que el presolve las elimina de inmediato. Al
+        salir los dominios vuelven a [0, 1]. cp permite usar una copia del modelo
+        (CpModel.clone) en lugar de self.model.
+        """
+        variables = (cp or self.model).Proto().variables
+        # (celdas x turnos), sin las celdas de valor conocido
+        free = (self.known.transpose(0, 2, 1)[mask] < 0).ravel()
+        indices = self.work_index.transpose(0, 2, 1)[mask].ravel()[free].tolist()
+        values = (schedule[mask][:, np.newaxis] == np.arange(self.num_shifts)).ravel()[free].tolist()
+        for index, value in zip(indices, values):
+            variables[index].domain[:] = [int(value), int(value)]
+        try:
+            yield
+        finally:
+            for index in indices:
+                variables[index].domain[:] = [0, 1]
 
     def add_constraints(self, fixed_assignments, requests, shift_constraints,
-                        weekly_constraints, penalized_transitions, weekly_cover_demands, excess_cover_penalties):
+                        weekly_constraints, penalized_transitions, weekly_cover_demands, excess_cover_penalties,
+                        cover_shortage_penalty=0):
         """Agrega las restricciones al modelo."""
         self.add_one_shift_per_day_constraint()
         self.add_fixed_assignments(fixed_assignments)
@@ -36,32 +246,166 @@ class Model:
         self.add_shift_constraints(shift_constraints)
         self.add_weekly_constraints(weekly_constraints)
         self.add_transition_constraints(penalized_transitions)
-        self.add_cover_constraints(weekly_cover_demands, excess_cover_penalties)
+        self.add_cover_constraints(weekly_cover_demands, excess_cover_penalties, cover_shortage_penalty)
+        if self.symmetry_breaking:
+            self.add_symmetry_breaking(fixed_assignments, requests)
+
+    def employee_classes(self, fixed_assignments, requests):
+        """Agrupa a los empleados intercambiables.
+
+        Dos empleados son intercambiables si pueden hacer los mismos turnos, se les
+        aplican las mismas reglas de secuencia, semanales y de transición y tienen
+        las mismas asignaciones fijas, las mismas peticiones y el mismo estado inicial.
 
+        Returns:
+            list: arrays con los empleados de cada clase de al menos dos empleados.
+        """
+        # Con un DayIndex las claves salen de los patrones, sin expandirlos
+        fixed_signatures = employee_signatures(fixed_assignments, self.num_employees)
+        request_signatures = employee_signatures(requests, self.num_employees)
+        classes = {}
+        for e in range(self.num_employees):
+            last_shift = None if self.last_shifts is None else int(self.last_shifts[e])
+            key = (fixed_signatures[e], request_signatures[e], last_shift, tuple(self.initial_runs[e].tolist()),
+                   tuple(self.eligible[e].tolist()), tuple(self.employee_rules[e]))
+            classes.setdefault(key, []).append(e)
+        return [np.array(members) for members in classes.values() if len(members) > 1]
+
+    @timed_phase
+    def add_symmetry_breaking(self, fixed_assignments, requests):
+        """Ordena lexicográficamente los horarios de los empleados intercambiables.
+
+        Dentro de cada clase, el vector de variables de trabajo de cada empleado,
+        recorrido por día y turno, debe ser lexicográficamente menor o igual que el
+        del siguiente. equal indica que ambos vectores coinciden hasta la posición
+        anterior; mientras coinciden, el primero no puede valer más, y dejan de
+        coincidir solo si vale estrictamente menos. Todo se expresa con cláusulas.
+
+        Las asignaciones fijas que se añadan después de construir el modelo, o los
+        horarios congelados, pueden ser incompatibles con este orden.
+        """
+        for members in self.employee_classes(fixed_assignments, requests):
+            for first, second in zip(members[:-1], members[1:]):
+                # Orden (día, turno): los primeros días deciden el orden
+                first_works = list(self.work[first].T.ravel())
+                second_works = list(self.work[second].T.ravel())
+                prefix = []  # [equal], o vacío en la primera posición
+                for k, (x, y) in enumerate(zip(first_works, second_works)):
+                    self.model.add_bool_or([~lit for lit in prefix] + [~x, y])
+                    if k == len(first_works) - 1:
+                        break
+                    next_equal = self.model.new_bool_var(f"lex_equal({first}, {second}, position={k + 1})")
+                    self.model.add_bool_or([~lit for lit in prefix] + [next_equal, ~x])
+                    self.model.add_bool_or([~lit for lit in prefix] + [next_equal, y])
+                    self.model.add_bool_or([~next_equal, ~x, y])
+                    self.model.add_bool_or([~next_equal, x, ~y])
+                    for lit in prefix:
+                        self.model.add_implication(next_equal, lit)
+                    prefix = [next_equal]
+
+    @timed_phase
     def add_one_shift_per_day_constraint(self):
-        """Asegura que cada empleado tenga exactamente un turno por día."""
+        """Asegura que cada empleado tenga exactamente un turno por día.
+
+        Los días con el turno ya conocido no necesitan la restricción, y los turnos
+        que valen 0 se quitan de ella.
+        """
+        if (self.known < 0).all():
+            for e in range(self.num_employees):
+                for d in range(self.num_days):
+                    self.model.add_exactly_one(self.employee_day(e, d))
+            return
+        fixed_days = (self.known == 1).any(axis=1)
         for e in range(self.num_employees):
             for d in range(self.num_days):
-                self.model.add_exactly_one(self.work[e, s, d] for s in range(self.num_shifts))
+                if fixed_days[e, d]:
+                    self.presolve_report["exactly_one"] += 1
+                    continue
+                self.model.add_exactly_one(self.work[e, self.known[e, :, d] < 0, d])
 
+    @timed_phase
     def add_fixed_assignments(self, fixed_assignments):
-        """Asigna turnos fijos según las restricciones."""
+        """Asigna turnos fijos según las restricciones.
+
+        Si el presolve ya las ha plegado todas se comprueban por columnas, sin
+        expandir los patrones de un DayIndex en tuplas.
+        """
+        if (self.known >= 0).any():
+            employees, shifts, days = entry_columns(fixed_assignments, 3)
+            if self.eligible[employees, shifts].all() and (self.known[employees, shifts, days] == 1).all():
+                self.presolve_report["fixed_constraints"] += len(employees)
+                return
         for e, s, d in fixed_assignments:
-            self.model.add(self.work[e, s, d] == 1)
+            self.add_fixed_assignment(e, s, d)
+
+    def add_fixed_assignment(self, e, s, d):
+        """Asigna el turno s al empleado e en el día d.
 
+        Si el presolve ya la ha plegado en una constante no hace falta restricción.
+        """
+        if not self.eligible[e, s]:
+            raise ValueError(f"El empleado {e} no puede hacer el turno {s} (asignación fija del día {d}).")
+        if self.known[e, s, d] == 1:
+            self.presolve_report["fixed_constraints"] += 1
+            return
+        if self.known[e, s, d] == 0:
+            raise ValueError(f"El empleado {e} ya tiene fijado otro turno el día {d}.")
+        if (e, s, d) not in self.fixed_constraints:
+            self.fixed_constraints[e, s, d] = self.model.add(self.work[e, s, d] == 1).index
+
+    def remove_fixed_assignment(self, e, s, d):
+        """Retira una asignación fija vaciando su restricción en el proto del modelo."""
+        if (e, s, d) not in self.fixed_constraints and self.known[e, s, d] == 1:
+            raise ValueError(f"La asignación fija ({e}, {s}, {d}) está plegada por el presolve; "
+                             "hay que reconstruir el modelo.")
+        self.model.Proto().constraints[self.fixed_constraints.pop((e, s, d))].Clear()
+
+    @timed_phase
     def add_employee_requests(self, requests):
         """Agrega las solicitudes de los empleados (positivas y negativas)."""
         for e, s, d, w in requests:
+            if self.known[e, s, d] == 0:
+                # La petición no puede cumplirse ni penaliza
+                self.presolve_report["objective_terms"] += 1
+                continue
+            self.request_terms.setdefault((e, s, d), []).append(len(self.obj_bool_vars))
             self.obj_bool_vars.append(self.work[e, s, d])
             self.obj_bool_coeffs.append(w)
 
+    def remove_employee_request(self, e, s, d):
+        """Retira las solicitudes sobre la celda (e, s, d). Hay que volver a llamar a set_objective."""
+        removed = set(self.request_terms.pop((e, s, d), ()))
+        if not removed:
+            return
+        kept = [i for i in range(len(self.obj_bool_vars)) if i not in removed]
+        self.obj_bool_vars = [self.obj_bool_vars[i] for i in kept]
+        self.obj_bool_coeffs = [self.obj_bool_coeffs[i] for i in kept]
+        # Las posiciones del resto de peticiones se desplazan
+        positions = {old: new for new, old in enumerate(kept)}
+        self.request_terms = {cell: [positions[i] for i in terms] for cell, terms in self.request_terms.items()}
+
+    @timed_phase
     def add_shift_constraints(self, shift_constraints):
-        """Agrega restricciones de secuencia para turnos específicos."""
+        """Agrega restricciones de secuencia para turnos específicos.
+
+        Cada regla puede terminar en la codificación y, tras ella, en los empleados a
+        los que se aplica (None o ausente: todos).
+        """
         for ct in shift_constraints:
-            shift, hard_min, soft_min, min_cost, soft_max, hard_max, max_cost = ct
-            for e in range(self.num_employees):
-                works = [self.work[e, shift, d] for d in range(self.num_days)]
-                variables, coeffs = Constraint.add_soft_sequence_constraint(
+            shift, hard_min, soft_min, min_cost, soft_max, hard_max, max_cost = ct[:7]
+            # La codificación es opcional: por defecto se enumeran los spans.
+            encoding = ct[7] if len(ct) > 7 else Constraint.SPAN_ENCODING
+            employees = ct[8] if len(ct) > 8 else None
+            if encoding == Constraint.AUTOMATON_ENCODING:
+                add_sequence_constraint = Constraint.add_automaton_sequence_constraint
+                obj_vars, obj_coeffs = self.obj_int_vars, self.obj_int_coeffs
+            else:
+                add_sequence_constraint = functools.partial(Constraint.add_soft_sequence_constraint,
+                                                            stats=self.presolve_report)
+                obj_vars, obj_coeffs = self.obj_bool_vars, self.obj_bool_coeffs
+            for e in self.rule_employees(("shift", *ct[:8]), employees, [shift]):
+                works = self.literals(e, shift)
+                variables, coeffs = add_sequence_constraint(
                     self.model,
                     works,
                     hard_min,
@@ -71,17 +415,26 @@ class Model:
                     hard_max,
                     max_cost,
                     f"shift_constraint(employee {e}, shift {shift})",
+                    int(self.initial_runs[e, shift]),
                 )
-                self.obj_bool_vars.extend(variables)
-                self.obj_bool_coeffs.extend(coeffs)
+                obj_vars.extend(variables)
+                obj_coeffs.extend(coeffs)
 
+    @timed_phase
     def add_weekly_constraints(self, weekly_constraints):
-        """Agrega restricciones semanales a los turnos."""
+        """Agrega restricciones semanales a los turnos.
+
+        Cada regla puede terminar en los empleados a los que se aplica (None o
+        ausente: todos).
+        """
         for ct in weekly_constraints:
-            shift, hard_min, soft_min, min_cost, soft_max, hard_max, max_cost = ct
-            for e in range(self.num_employees):
+            shift, hard_min, soft_min, min_cost, soft_max, hard_max, max_cost = ct[:7]
+            employees = ct[7] if len(ct) > 7 else None
+            for e in self.rule_employees(("weekly", *ct[:7]), employees, [shift]):
+                literals = self.literals(e, shift)
+                self.presolve_report["sum_terms"] += int(np.count_nonzero(self.known[e, shift] >= 0))
                 for w in range(self.num_weeks):
-                    works = [self.work[e, shift, d + w * 7] for d in range(7)]
+                    works = literals[self.week_days(w)]
                     variables, coeffs = Constraint.add_soft_sum_constraint(
                         self.model,
                         works,
@@ -92,19 +445,39 @@ class Model:
                         hard_max,
                         max_cost,
                         f"weekly_sum_constraint(employee {e}, shift {shift}, week {w})",
+                        compact=self.compact,
                     )
                     self.obj_int_vars.extend(variables)
                     self.obj_int_coeffs.extend(coeffs)
 
+    @timed_phase
     def add_transition_constraints(self, penalized_transitions):
-        """Agrega restricciones de transiciones penalizadas entre turnos."""
-        for previous_shift, next_shift, cost in penalized_transitions:
-            for e in range(self.num_employees):
-                for d in range(self.num_days - 1):
-                    transition = [
-                        ~self.work[e, previous_shift, d],
-                        ~self.work[e, next_shift, d + 1],
-                    ]
+        """Agrega restricciones de transiciones penalizadas entre turnos.
+
+        Cada transición puede terminar en los empleados a los que se aplica (None o
+        ausente: todos).
+        """
+        for previous_shift, next_shift, cost, *selector in penalized_transitions:
+            employees = selector[0] if selector else None
+            rule = ("transition", previous_shift, next_shift, cost)
+            for e in self.rule_employees(rule, employees, [previous_shift, next_shift]):
+                # Pares (hoy en previous_shift, mañana en next_shift) ya negados.
+                not_previous = [Constraint.negate(work) for work in self.literals(e, previous_shift)]
+                not_next = [Constraint.negate(work) for work in self.literals(e, next_shift)]
+                transitions = [[not_previous[d], not_next[d + 1]] for d in range(self.num_days - 1)]
+                days = range(self.num_days - 1)
+                # La transición desde el día anterior al horizonte solo depende de mañana.
+                if self.last_shifts is not None and self.last_shifts[e] == previous_shift:
+                    transitions.insert(0, [not_next[0]])
+                    days = range(-1, self.num_days - 1)
+                folded = (self.known[e, [previous_shift, next_shift]] >= 0).any()
+                for d, transition in zip(days, transitions):
+                    if folded:
+                        # Con un valor conocido la transición ya es imposible o segura
+                        transition = Constraint.fold_clause(transition)
+                        if transition is None:
+                            self.presolve_report["clauses"] += 1
+                            continue
                     if cost == 0:
                         self.model.add_bool_or(transition)
                     else:
@@ -116,26 +489,91 @@ class Model:
                         self.obj_bool_vars.append(trans_var)
                         self.obj_bool_coeffs.append(cost)
 
-    def add_cover_constraints(self, weekly_cover_demands, excess_cover_penalties):
-        """Asegura que se cumplan las demandas mínimas de turnos."""
+    @timed_phase
+    def add_cover_constraints(self, weekly_cover_demands, excess_cover_penalties, shortage_penalty=0):
+        """Asegura que se cumplan las demandas mínimas de turnos.
+
+        weekly_cover_demands tiene una fila por día de la semana, que se repite cada
+        semana, o una fila por día del horizonte. Con shortage_penalty > 0 la demanda
+        mínima deja de ser obligatoria y cada persona que falte se penaliza.
+        """
         for s in range(1, self.num_shifts):  # Ignoramos el turno "Off" (0)
             for w in range(self.num_weeks):
                 for d in range(7):
-                    works = [self.work[e, s, w * 7 + d] for e in range(self.num_employees)]
-                    min_demand = weekly_cover_demands[d][s - 1]
-                    worked = self.model.new_int_var(min_demand, self.num_employees, "")
-                    self.model.add(worked == sum(works))
+                    works, assigned = self.cover_terms(s, w * 7 + d)
+                    min_demand = weekly_cover_demands[(w * 7 + d) % len(weekly_cover_demands)][s - 1]
                     over_penalty = excess_cover_penalties[s - 1]
+                    if self.compact:
+                        self.add_compact_cover(works, min_demand, over_penalty, shortage_penalty, s, w, d, assigned)
+                        continue
+                    if shortage_penalty > 0:
+                        worked = self.model.new_int_var(0, self.num_employees, "")
+                        self.model.add(worked == cp_model.LinearExpr.sum(works) + assigned)
+                        name = f"shortage_demand(shift={s}, week={w}, day={d})"
+                        shortage = self.model.new_int_var(0, min_demand, name)
+                        self.model.add(shortage >= min_demand - worked)
+                        self.obj_int_vars.append(shortage)
+                        self.obj_int_coeffs.append(shortage_penalty)
+                    else:
+                        worked = self.model.new_int_var(min_demand, self.num_employees, "")
+                        self.model.add(worked == cp_model.LinearExpr.sum(works) + assigned)
                     if over_penalty > 0:
                         name = f"excess_demand(shift={s}, week={w}, day={d})"
-                        excess = self.model.new_int_var(0, self.num_employees - min_demand, name)
-                        self.model.add(excess == worked - min_demand)
+                        excess = self.model.new_int_var(0, max(self.num_employees - min_demand, 0), name)
+                        if shortage_penalty > 0:
+                            self.model.add(excess >= worked - min_demand)
+                        else:
+                            self.model.add(excess == worked - min_demand)
                         self.obj_int_vars.append(excess)
                         self.obj_int_coeffs.append(over_penalty)
 
+    def cover_terms(self, s, d):
+        """Variables del turno s el día d sin las celdas de valor conocido, y cuántas de ellas valen 1."""
+        known = self.known[:, s, d]
+        if (known < 0).all():
+            return list(self.shift_day(s, d)), 0
+        self.presolve_report["sum_terms"] += int(np.count_nonzero(known >= 0))
+        return list(self.work[known < 0, s, d]), int(np.count_nonzero(known == 1))
+
+    def add_compact_cover(self, works, min_demand, over_penalty, shortage_penalty, s, w, d, assigned=0):
+        """Cobertura de un (turno, semana, día) sin las variables auxiliares worked/excess.
+
+        Con demanda obligatoria el exceso es exactamente sum(works) - min_demand, así
+        que entra en el objetivo como expresión lineal y la demanda queda como una única
+        restricción acotada. Con déficit penalizable el exceso y el déficit son máximos
+        con 0 y necesitan su variable, pero acotada por una sola desigualdad. assigned
+        es el número de empleados que el presolve ya ha asignado al turno.
+        """
+        total = cp_model.LinearExpr.sum(works) + assigned
+        if shortage_penalty > 0:
+            name = f"shortage_demand(shift={s}, week={w}, day={d})"
+            shortage = self.model.new_int_var(0, min_demand, name)
+            self.model.add(shortage + total >= min_demand)
+            self.obj_int_vars.append(shortage)
+            self.obj_int_coeffs.append(shortage_penalty)
+            if over_penalty > 0:
+                name = f"excess_demand(shift={s}, week={w}, day={d})"
+                excess = self.model.new_int_var(0, max(self.num_employees - min_demand, 0), name)
+                self.model.add(excess >= total - min_demand)
+                self.obj_int_vars.append(excess)
+                self.obj_int_coeffs.append(over_penalty)
+            return
+        self.model.add_linear_constraint(total, min_demand, self.num_employees)
+        if over_penalty > 0:
+            self.obj_expr_vars.append(works)
+            self.obj_expr_offsets.append(assigned - min_demand)
+            self.obj_expr_coeffs.append(over_penalty)
+            self.obj_expr_names.append(f"excess_demand(shift={s}, week={w}, day={d})")
+
+    @timed_phase
     def set_objective(self):
         """Configura la minimización del objetivo."""
-        self.model.minimize(
-            sum(self.obj_bool_vars[i] * self.obj_bool_coeffs[i] for i in range(len(self.obj_bool_vars)))
-            + sum(self.obj_int_vars[i] * self.obj_int_coeffs[i] for i in range(len(self.obj_int_vars)))
-        )
+        # Una única suma ponderada plana en lugar de una cadena de sumas parciales
+        variables = self.obj_bool_vars + self.obj_int_vars
+        coeffs = self.obj_bool_coeffs + self.obj_int_coeffs
+        offset = 0
+        for expr_vars, expr_offset, coeff in zip(self.obj_expr_vars, self.obj_expr_offsets, self.obj_expr_coeffs):
+            variables.extend(expr_vars)
+            coeffs.extend([coeff] * len(expr_vars))
+            offset += coeff * expr_offset
+        self.model.minimize(cp_model.LinearExpr.weighted_sum(variables, coeffs) + offset)
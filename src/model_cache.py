@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from day_index import DayIndex
+from model import Model
+
+# Ficheros cuyo código determina el modelo construido: si cambian, cambian las claves.
+_SOURCE_FILES = ("model.py", "constraint.py", "day_index.py")
+
+
+class ModelCache:
+    """Caché en disco de modelos ya construidos, indexada por un hash de las entradas.
+
+    Cada entrada guarda el CpModelProto serializado en binario junto con los
+    índices de las variables de trabajo y de penalización, de modo que el Model
+    se puede reconstruir sin volver a generar las restricciones. Cuando la caché
+    supera max_bytes se eliminan las entradas usadas hace más tiempo (LRU).
+    """
+
+    def __init__(self, cache_dir, max_bytes=1 << 30):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(num_employees, num_weeks, inputs, **options):
+        """Calcula la clave de un modelo a partir de sus datos de entrada y opciones."""
+        digest = hashlib.sha256()
+        for source_file in _SOURCE_FILES:
+            digest.update(Path(__file__).with_name(source_file).read_bytes())
+        payload = [num_employees, num_weeks, inputs, options]
+        digest.update(json.dumps(payload, sort_keys=True, ensure_ascii=False, default=_encode).encode())
+        return digest.hexdigest()
+
+    def path(self, key):
+        return self.cache_dir / f"{key}.npz"
+
+    def load_or_build(self, num_employees, num_weeks, inputs, **options):
+        """Devuelve el modelo de la caché o lo construye y lo guarda."""
+        key = self.key(num_employees, num_weeks, inputs, **options)
+        model = self.load(key, num_employees, num_weeks, **options)
+        if model is None:
+            model = Model.build(num_employees, num_weeks, inputs, **options)
+            self.store(key, model)
+        return model
+
+    def load(self, key, num_employees, num_weeks, **options):
+        """Reconstruye un Model desde la caché, o devuelve None si no está."""
+        path = self.path(key)
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            model = Model(num_employees, num_weeks, **options)
+            model.model.Proto().ParseFromString(data["proto"].tobytes())
+            model.model.rebuild_constant_map()
+
+            work = np.empty(data["work_index"].size, dtype=object)
+            for i, index in enumerate(data["work_index"].ravel().tolist()):
+                work[i] = model.model.get_bool_var_from_proto_index(index)
+            model.work = work.reshape(data["work_index"].shape)
+            model.work_index = data["work_index"]
+            # Celdas plegadas por el presolve, sin variable propia
+            model.known = data["known"]
+            model.presolve_report.update(dict(zip(data["presolve_keys"].tolist(), data["presolve_counts"].tolist())))
+
+            model.obj_bool_vars = [model.model.get_bool_var_from_proto_index(index)
+                                   for index in data["obj_bool_index"].tolist()]
+            model.obj_bool_coeffs = data["obj_bool_coeffs"].tolist()
+            for cell, position in zip(data["request_cells"].tolist(), data["request_positions"].tolist()):
+                model.request_terms.setdefault(tuple(cell), []).append(position)
+            model.obj_int_vars = [model.model.get_int_var_from_proto_index(index)
+                                  for index in data["obj_int_index"].tolist()]
+            model.obj_int_coeffs = data["obj_int_coeffs"].tolist()
+            # Las expresiones se guardan aplanadas junto con su número de variables
+            expr_index = np.split(data["obj_expr_index"], np.cumsum(data["obj_expr_sizes"])[:-1])
+            model.obj_expr_vars = [[model.model.get_bool_var_from_proto_index(index) for index in indices.tolist()]
+                                   for indices in expr_index] if len(data["obj_expr_sizes"]) else []
+            model.obj_expr_offsets = data["obj_expr_offsets"].tolist()
+            model.obj_expr_coeffs = data["obj_expr_coeffs"].tolist()
+            model.obj_expr_names = data["obj_expr_names"].tolist()
+            model.fixed_constraints = {
+                tuple(assignment): index
+                for assignment, index in zip(data["fixed_assignments"].tolist(), data["fixed_index"].tolist())
+            }
+        # Se actualiza la fecha de modificación para la política LRU.
+        os.utime(path)
+        return model
+
+    def store(self, key, model):
+        """Guarda un modelo construido y aplica la política de expulsión."""
+        fixed_assignments = list(model.fixed_constraints)
+        path = self.path(key)
+        # Se escribe en un fichero temporal para no dejar entradas a medias.
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as cache_file:
+            np.savez(
+                cache_file,
+                proto=np.frombuffer(model.model.Proto().SerializeToString(), dtype=np.uint8),
+                work_index=model.work_index,
+                known=model.known,
+                presolve_keys=np.array(list(model.presolve_report), dtype=str),
+                presolve_counts=np.array(list(model.presolve_report.values()), dtype=np.int64),
+                obj_bool_index=np.array([var.index for var in model.obj_bool_vars], dtype=np.int64),
+                obj_bool_coeffs=np.array(model.obj_bool_coeffs, dtype=np.int64),
+                request_cells=np.array([cell for cell, terms in model.request_terms.items() for _ in terms],
+                                       dtype=np.int64).reshape(-1, 3),
+                request_positions=np.array([i for terms in model.request_terms.values() for i in terms],
+                                           dtype=np.int64),
+                obj_int_index=np.array([var.index for var in model.obj_int_vars], dtype=np.int64),
+                obj_int_coeffs=np.array(model.obj_int_coeffs, dtype=np.int64),
+                obj_expr_index=np.array([var.index for variables in model.obj_expr_vars for var in variables],
+                                        dtype=np.int64),
+                obj_expr_sizes=np.array([len(variables) for variables in model.obj_expr_vars], dtype=np.int64),
+                obj_expr_offsets=np.array(model.obj_expr_offsets, dtype=np.int64),
+                obj_expr_coeffs=np.array(model.obj_expr_coeffs, dtype=np.int64),
+                obj_expr_names=np.array(model.obj_expr_names, dtype=str),
+                fixed_assignments=np.array(fixed_assignments, dtype=np.int64).reshape(-1, 3),
+                fixed_index=np.array([model.fixed_constraints[a] for a in fixed_assignments], dtype=np.int64),
+            )
+        os.replace(tmp_path, path)
+        self.evict(keep=path)
+
+    def evict(self, keep=None):
+        """Elimina las entradas menos usadas recientemente hasta caber en max_bytes.
+
+        La entrada keep (la que se acaba de guardar) no se elimina aunque no quepa
+        o tenga la misma fecha que otras.
+        """
+        entries = sorted(self.cache_dir.glob("*.npz"), key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+            total -= entry.stat().st_size
+            entry.unlink()
+
+
+def _encode(value):
+    """Valores de las entradas que json no serializa: enteros de NumPy y DayIndex."""
+    if isinstance(value, DayIndex):
+        return value.describe()
+    return int(value)
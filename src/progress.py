@@ -0,0 +1,134 @@
+import json
+import threading
+import time
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+
+def relative_gap(objective, bound):
+    """Gap relativo (en %) entre el objetivo y la cota, como el que informa CP-SAT."""
+    return 100 * abs(objective - bound) / max(1.0, abs(objective))
+
+
+class ProgressRecorder(cp_model.CpSolverSolutionCallback):
+    """Registra cada solución mejorada y detiene la búsqueda cuando basta.
+
+    Cada solución añade a history un registro con el instante, el objetivo, la
+    cota y el gap (en %), y opcionalmente el horario (empleados x días). Los
+    registros se envían además a stream, que puede ser la ruta de un fichero
+    JSON lines o una cola (cualquier objeto con put).
+
+    La búsqueda se detiene cuando el gap baja de stop_gap (en %) o cuando pasan
+    stall_time segundos sin mejorar el objetivo. La cota también se vigila
+    fuera de las soluciones, de modo que el gap se comprueba aunque no aparezcan
+    soluciones nuevas.
+    """
+
+    def __init__(self, model, snapshots=False, stream=None, stop_gap=None, stall_time=None, verbose=True):
+        super().__init__()
+        self.model = model
+        self.snapshots = snapshots
+        self.stream = stream
+        self.stop_gap = stop_gap
+        self.stall_time = stall_time
+        self.verbose = verbose
+        self.history = []
+        self.stop_reason = None
+        self._stop_requested = None
+        self._solver = None
+        self._file = None
+        self._last_improvement = None
+        self._done = threading.Event()
+        self._watchdog = None
+
+    def start(self, solver):
+        """Se prepara para una resolución con el CpSolver indicado."""
+        self._solver = solver
+        self._last_improvement = time.perf_counter()
+        self.stop_reason = self._stop_requested
+        self._done.clear()
+        if isinstance(self.stream, str):
+            self._file = open(self.stream, "a", encoding="utf-8")
+        if self.stop_gap is not None:
+            solver.best_bound_callback = self.on_best_bound
+        if self.stall_time is not None:
+            self._watchdog = threading.Thread(target=self._watch_stall, daemon=True)
+            self._watchdog.start()
+
+    def finish(self):
+        """Libera el fichero y el hilo de vigilancia al terminar la resolución."""
+        self._done.set()
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+        if self._solver is not None and self.stop_gap is not None:
+            self._solver.best_bound_callback = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def stop(self, reason="cancelled"):
+        """Detiene la búsqueda desde otro hilo (p. ej. al cancelar un trabajo).
+
+        Si la búsqueda aún no ha empezado, se detiene en la primera solución.
+        """
+        self._stop_requested = reason
+        self.stop_reason = reason
+        if self._solver is not None:
+            self._solver.stop_search()
+
+    def on_solution_callback(self):
+        if self._stop_requested is not None:
+            self.stop_search()
+            return
+        objective = self.objective_value
+        bound = self.best_objective_bound
+        if self.history and objective >= self.history[-1]["objective"]:
+            return
+        self._last_improvement = time.perf_counter()
+        record = {
+            "time": round(self.wall_time, 3),
+            "objective": objective,
+            "bound": bound,
+            "gap": relative_gap(objective, bound),
+        }
+        if self.snapshots:
+            values = np.array(self.response_proto.solution, dtype=np.int64)
+            record["schedule"] = values[self.model.work_index].argmax(axis=1).astype(np.int8)
+        self.history.append(record)
+        self._emit(record)
+        if self.verbose:
+            print(f"Solution {len(self.history) - 1}, time = {record['time']:.2f} s, objective = {objective}, "
+                  f"gap = {record['gap']:.2f}%")
+        self._check_gap(record["gap"], "gap")
+
+    def on_best_bound(self, bound):
+        """Comprueba el gap cuando mejora la cota, sin esperar a otra solución."""
+        if self.history:
+            self._check_gap(relative_gap(self.history[-1]["objective"], bound), "gap (bound)")
+
+    def _check_gap(self, gap, reason):
+        if self.stop_gap is not None and gap <= self.stop_gap and self.stop_reason is None:
+            self.stop_reason = reason
+            self._solver.stop_search()
+
+    def _watch_stall(self):
+        # Se revisa periódicamente el tiempo desde la última mejora
+        while not self._done.wait(min(self.stall_time / 10, 1.0)):
+            if time.perf_counter() - self._last_improvement >= self.stall_time and self.history:
+                self.stop_reason = "stall"
+                self._solver.stop_search()
+                return
+
+    def _emit(self, record):
+        if self.stream is None:
+            return
+        if self._file is not None:
+            line = dict(record)
+            if "schedule" in line:
+                line["schedule"] = line["schedule"].tolist()
+            self._file.write(json.dumps(line) + "\n")
+            self._file.flush()
+        else:
+            self.stream.put(record)
@@ -0,0 +1,54 @@
+import gzip
+
+from google.protobuf import text_format
+from ortools.sat import cp_model_pb2
+from ortools.sat.python import cp_model
+
+# Extensiones que se escriben en binario; el resto se escribe en formato texto.
+BINARY_SUFFIXES = (".pb", ".bin")
+
+
+def _is_binary(path):
+    return path.removesuffix(".gz").endswith(BINARY_SUFFIXES)
+
+
+def _open(path, mode):
+    """Abre el fichero comprimiendo con gzip si termina en .gz."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode)
+    return open(path, mode)
+
+
+def write_model_proto(proto, path):
+    """Escribe un CpModelProto con el formato indicado por la extensión del fichero.
+
+    .pb/.bin se escriben directamente desde SerializeToString; cualquier otra
+    extensión en formato texto, volcado al fichero a medida que se genera.
+    Añadir .gz comprime la salida con gzip.
+    """
+    if _is_binary(path):
+        with _open(path, "wb") as proto_file:
+            proto_file.write(proto.SerializeToString())
+    else:
+        with _open(path, "wt") as proto_file:
+            text_format.PrintMessage(proto, proto_file)
+
+
+def read_model_proto(path):
+    """Lee un CpModelProto escrito con write_model_proto."""
+    proto = cp_model_pb2.CpModelProto()
+    if _is_binary(path):
+        with _open(path, "rb") as proto_file:
+            proto.ParseFromString(proto_file.read())
+    else:
+        with _open(path, "rt") as proto_file:
+            text_format.Parse(proto_file.read(), proto)
+    return proto
+
+
+def load_model(path):
+    """Carga un modelo volcado con --output_proto para resolverlo de nuevo."""
+    model = cp_model.CpModel()
+    model.Proto().CopyFrom(read_model_proto(path))
+    model.rebuild_constant_map()
+    return model
@@ -0,0 +1,56 @@
+import numpy as np
+
+from mappings import Mappings
+
+
+def print_schedule(schedule, shifts=Mappings.SHIFT_NAMES, day_names=Mappings.DAY_NAMES, employee_names=None):
+    """Imprime un horario (empleados x días) por semanas, con los empleados de cada turno.
+
+    Solo depende de NumPy, de modo que los horarios guardados se pueden mostrar sin
+    cargar OR-Tools. Sin employee_names se usan los nombres de Mappings.
+    """
+    if employee_names is None:
+        employee_names = [Mappings.ID_TO_WORKER.get(e, f"Employee {e}") for e in range(schedule.shape[0])]
+    num_weeks = schedule.shape[1] // 7
+    # Imprime por semana
+    print("=== Solution Schedule ===")
+    for week in range(num_weeks):
+        print(f"Week {week + 1}")
+        # Encabezado con nombres de los días
+        header = " " * 15 + "| "  # Espaciado inicial para alineación correcta
+        header += " | ".join(f"{day:<11}" for day in day_names)
+        header += " |"
+        print(header)
+        print("—" * len(header))  # Línea horizontal que cruza el ancho del encabezado
+
+        # Imprime los turnos para cada día de la semana
+        for shift_index, shift_name in enumerate(shifts):
+            # Ignorar el turno libre (0)
+            if shift_index == 0:
+                continue
+
+            # Separación entre turnos
+            if shift_index > 1:
+                print("—" * len(header))  # Línea de separación
+
+            # Construir filas de empleados asignados para cada día
+            rows = [[] for _ in range(7)]  # 7 días en una semana
+            max_lines = 1  # Máximo número de líneas en cualquier columna
+            for d in range(week * 7, (week + 1) * 7):  # Días de la semana actual
+                # Encuentra empleados asignados al turno actual
+                employees = [employee_names[e] for e in np.flatnonzero(schedule[:, d] == shift_index)]
+                rows[d % 7] = employees
+                max_lines = max(max_lines, len(employees))
+
+            # Imprime línea por línea para el turno
+            for line in range(max_lines):
+                row = f"{shift_name if line == 0 else '':<15}" + "| "  # Nombre del turno solo en la primera línea
+                for day in range(7):  # Repite por los 7 días
+                    if line < len(rows[day]):  # Hay un empleado asignado en esta línea
+                        row += f"{rows[day][line]:<11} | "
+                    else:  # Espacio vacío
+                        row += " " * 11 + " | "
+                print(row)
+
+        print("—" * len(header))  # Línea horizontal al final de cada semana
+        print() if week < num_weeks - 1 else None  # Línea vacía entre semanas
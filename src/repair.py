@@ -0,0 +1,120 @@
+import numpy as np
+from ortools.sat.python import cp_model
+
+from solver import Solver
+
+
+class AbsenceRepair:
+    """Repara un horario ya resuelto cuando algunos empleados dejan de estar disponibles.
+
+    En lugar de resolver de nuevo todo el horizonte, solo se liberan los días en
+    una ventana alrededor de las ausencias; el resto de variables de Model.work se
+    fijan al horario actual. Cada celda (empleado, día) que cambia respecto al
+    horario actual se penaliza con change_penalty, de modo que se buscan los
+    mínimos cambios. Si la ventana no tiene solución se va ampliando.
+
+    Las variables de trabajo no deben tener dominios propios (p. ej. fijadas con
+    presolve), porque al terminar se restauran a [0, 1].
+    """
+
+    def __init__(self, model, schedule, window=1, change_penalty=50):
+        """
+        Args:
+            model: Model ya construido con las mismas entradas que el horario (sin
+                ruptura de simetrías, que podría no respetar el horario reparado).
+            schedule: horario actual (empleados x días).
+            window: días libres a cada lado de cada ausencia.
+            change_penalty: penalización por cada celda cambiada.
+        """
+        if model.symmetry_breaking:
+            raise ValueError("La reparación necesita un modelo sin ruptura de simetrías.")
+        if schedule.shape != (model.num_employees, model.num_days):
+            raise ValueError(f"El horario {schedule.shape} no coincide con el modelo "
+                             f"({model.num_employees}, {model.num_days}).")
+        self.model = model
+        self.schedule = schedule
+        self.window = window
+        self.change_penalty = change_penalty
+        self.solver = Solver(model)
+
+    def schedule_cost(self, params):
+        """Coste del horario actual en el modelo, antes de añadir las ausencias."""
+        with self.model.fixed_cells(self.schedule, np.ones(self.schedule.shape, dtype=bool)):
+            status = self.solver.solve(params, "", log_solutions=False)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return None
+        return self.solver.solver.objective_value
+
+    def window_days(self, absences, window):
+        """Máscara de los días libres alrededor de las ausencias."""
+        days = np.zeros(self.model.num_days, dtype=bool)
+        for _, d in absences:
+            days[max(d - window, 0):d + window + 1] = True
+        return days
+
+    def add_absences(self, absences):
+        """Fija el libre en las ausencias, retirando las asignaciones fijas incompatibles."""
+        for e, d in absences:
+            for s in range(1, self.model.num_shifts):
+                if (e, s, d) in self.model.fixed_constraints:
+                    self.model.remove_fixed_assignment(e, s, d)
+            self.model.add_fixed_assignment(e, 0, d)
+
+    def add_change_penalties(self, days, change_vars):
+        """Penaliza cada celda de la ventana que no conserva su turno actual.
+
+        change_vars (celda (e, d) -> variable de cambio) se completa con las celdas
+        nuevas de la ventana; las que ya tenían variable, de una ventana anterior
+        más pequeña, la conservan.
+        """
+        for e in range(self.model.num_employees):
+            for d in np.flatnonzero(days).tolist():
+                if (e, d) in change_vars:
+                    continue
+                changed = self.model.model.new_bool_var(f"changed(employee={e}, day={d})")
+                self.model.model.add_bool_or([self.model.work[e, self.schedule[e, d], d], changed])
+                self.model.obj_bool_vars.append(changed)
+                self.model.obj_bool_coeffs.append(self.change_penalty)
+                change_vars[e, d] = changed
+
+    def repair(self, absences, params="max_time_in_seconds:10"):
+        """Repara el horario para las ausencias [(empleado, día), ...].
+
+        Returns:
+            dict: status, horario reparado, celdas cambiadas, días liberados, coste
+            antes y después (sin las penalizaciones por cambio) y su diferencia.
+        """
+        cost_before = self.schedule_cost(params)
+        self.add_absences(absences)
+        self.solver.add_schedule_hint(self.schedule)
+
+        window = self.window
+        change_vars = {}
+        while True:
+            days = self.window_days(absences, window)
+            self.add_change_penalties(days, change_vars)
+            self.model.set_objective()
+            with self.model.fixed_cells(self.schedule, np.broadcast_to(~days, self.schedule.shape)):
+                status = self.solver.solve(params, "", log_solutions=False)
+            if status != cp_model.INFEASIBLE or days.all():
+                break
+            # Sin solución en la ventana: se amplía, conservando las variables de cambio de sus celdas
+            window = 2 * window + 1
+
+        report = {"status": self.solver.solver.status_name(status), "window_days": np.flatnonzero(days).tolist()}
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return report
+        repaired = self.solver.schedule_matrix()
+        changes = [(int(e), int(d), int(self.schedule[e, d]), int(repaired[e, d]))
+                   for e, d in zip(*np.nonzero(repaired != self.schedule))]
+        # Las variables de cambio solo están acotadas por debajo, así que se descuenta su valor
+        penalties = self.change_penalty * sum(self.solver.solver.boolean_value(var) for var in change_vars.values())
+        cost_after = self.solver.solver.objective_value - penalties
+        report.update(
+            schedule=repaired,
+            changes=changes,
+            cost_before=cost_before,
+            cost_after=cost_after,
+            cost_delta=None if cost_before is None else cost_after - cost_before,
+        )
+        return report
@@ -0,0 +1,108 @@
+import numpy as np
+from ortools.sat.python import cp_model
+
+from day_index import window as window_entries
+from model import Model
+from solver import Solver
+
+
+def boundary_state(schedule, num_shifts):
+    """Calcula el estado al final de un horario (empleados x días).
+
+    Returns:
+        (last_shifts, initial_runs): el último turno de cada empleado y la longitud
+        de la secuencia de cada turno que termina el último día.
+    """
+    num_employees, num_days = schedule.shape
+    last_shifts = schedule[:, -1].astype(np.int64)
+    initial_runs = np.zeros((num_employees, num_shifts), dtype=np.int64)
+    for e in range(num_employees):
+        run = 1
+        while run < num_days and schedule[e, num_days - 1 - run] == last_shifts[e]:
+            run += 1
+        initial_runs[e, last_shifts[e]] = run
+    return last_shifts, initial_runs
+
+
+def window_inputs(inputs, first_day, num_days):
+    """Recorta y desplaza las entradas con días absolutos a una ventana del horizonte.
+
+    Las demandas con una fila por día del horizonte (más de 7 filas) también se
+    recortan; las semanales se repiten igual en todas las ventanas.
+    """
+    last_day = first_day + num_days
+    shifted = dict(inputs)
+    shifted["fixed_assignments"] = window_entries(inputs["fixed_assignments"], first_day, last_day)
+    shifted["requests"] = window_entries(inputs["requests"], first_day, last_day)
+    if len(inputs["weekly_cover_demands"]) > 7:
+        shifted["weekly_cover_demands"] = inputs["weekly_cover_demands"][first_day:last_day]
+    return shifted
+
+
+class RollingHorizon:
+    """Resuelve horizontes largos por ventanas deslizantes de window_weeks semanas.
+
+    Cada ventana se resuelve con Model y Solver, se congela su primera semana y el
+    estado final de esa semana (último turno y secuencias en curso) se arrastra a la
+    siguiente ventana. La última ventana se conserva completa.
+
+    model_options son las opciones de Model (compact, presolve, shifts,
+    eligible...), que se aplican a todas las ventanas.
+    """
+
+    def __init__(self, num_employees, num_weeks, inputs, window_weeks, model_options=None):
+        self.num_employees = num_employees
+        self.num_weeks = num_weeks
+        self.inputs = inputs
+        self.window_weeks = window_weeks
+        self.model_options = dict(model_options or {})
+
+    def solve(self, params):
+        """Resuelve todas las ventanas y devuelve (status, horario empleados x días)."""
+        schedule = np.zeros((self.num_employees, 0), dtype=np.int8)
+        hint = None
+        status = cp_model.OPTIMAL
+        for first_week in range(self.num_weeks):
+            window = min(self.window_weeks, self.num_weeks - first_week)
+            model = Model(self.num_employees, window, **self.model_options)
+            inputs = window_inputs(self.inputs, first_week * 7, model.num_days)
+            if model.presolve:
+                model.fold_fixed_assignments(inputs["fixed_assignments"])
+            model.initialize_variables()
+            if first_week > 0:
+                model.set_initial_state(*boundary_state(schedule, model.num_shifts))
+            model.add_constraints(**inputs)
+            model.set_objective()
+
+            solver = Solver(model)
+            # Las semanas que ya se resolvieron en la ventana anterior sirven de pista
+            if hint is not None:
+                solver.add_schedule_hint(hint)
+            window_status = solver.solve(params, "")
+            if window_status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                return window_status, None
+            if window_status == cp_model.FEASIBLE:
+                status = cp_model.FEASIBLE
+
+            window_schedule = solver.schedule_matrix()
+            if first_week + window == self.num_weeks:
+                # Última ventana: se conservan todas sus semanas
+                return status, np.hstack([schedule, window_schedule])
+            schedule = np.hstack([schedule, window_schedule[:, :7]])
+            hint = window_schedule[:, 7:]
+        return status, schedule
+
+    def evaluate(self, schedule, params=""):
+        """Evalúa un horario completo sobre el modelo monolítico.
+
+        El horario completo no tiene por qué respetar el orden de la ruptura de
+        simetrías de las ventanas, así que se evalúa sin ella.
+
+        Returns:
+            (solver, status): el Solver con el horario fijado, listo para imprimirlo.
+        """
+        options = dict(self.model_options, symmetry_breaking=False)
+        model = Model.build(self.num_employees, self.num_weeks, self.inputs, **options)
+        solver = Solver(model)
+        solver.freeze_weeks(schedule, range(self.num_weeks))
+        return solver, solver.solve(params, "")
@@ -0,0 +1,396 @@
+import csv
+import io
+import json
+import os
+import re
+
+import numpy as np
+
+from day_index import DayIndex, entry_columns
+from mappings import Mappings
+
+# Espacios alrededor de los separadores de un CSV sin comillas
+_FIELD_SPACES = re.compile(r"[ \t]+(?=[,\n])|(?<=[,\n])[ \t]+")
+# Columnas de las tablas grandes del escenario y valores por defecto de las opcionales
+FIXED_COLUMNS = ("employee", "shift", "day", "week")
+REQUEST_COLUMNS = ("employee", "shift", "day", "weight", "week")
+_DEFAULTS = {"week": 1, "tags": ""}
+
+
+def load_scenario(path):
+    """Carga un escenario desde un fichero JSON con los mismos datos que main.main.
+
+    El fichero contiene num_employees, num_weeks y las entradas de add_constraints
+    con nombres en lugar de identificadores, por ejemplo:
+        "fixed_assignments": [["Pepito", "libre", "lunes", 1], ...]
+        "requests": [["Ana", "libre", "sábado", -2], ...]
+        "shift_constraints": [["noche", 1, 2, 20, 3, 4, 5, "automaton"], ...]
+        "weekly_constraints": [["libre", 1, 2, 7, 2, 3, 4], ...]
+        "penalized_transitions": [["tarde", "noche", 4], ...]
+        "weekly_cover_demands": [[2, 3, 1], ...]
+        "excess_cover_penalties": [2, 2, 5]
+    Ver load_team para los nombres propios del equipo y las tablas en CSV.
+
+    Returns:
+        tuple: (num_employees, num_weeks, inputs) donde inputs son los argumentos de
+        Model.add_constraints.
+    """
+    team = load_team(path)
+    return team.num_employees, team.num_weeks, team.inputs
+
+
+def parse_scenario(data):
+    """Convierte los datos de un escenario ya decodificados (ver load_scenario).
+
+    Returns:
+        tuple: (num_employees, num_weeks, inputs).
+    """
+    team = parse_team(data)
+    return team.num_employees, team.num_weeks, team.inputs
+
+
+def load_team(path):
+    """Carga un escenario JSON; las tablas en CSV se buscan junto al fichero."""
+    with open(path, encoding="utf-8") as scenario_file:
+        return parse_team(json.load(scenario_file), os.path.dirname(os.path.abspath(path)))
+
+
+def parse_team(data, base_dir=".", confine=False):
+    """Convierte los datos de un escenario con los nombres de su propio equipo.
+
+    Además del formato de load_scenario, el escenario puede definir:
+        "employees": ["Ana", ...] o un CSV con la columna name y, opcionalmente,
+            tags con etiquetas separadas por ";" (num_employees es entonces opcional)
+        "shifts": ["libre", "mañana", "tarde", "noche"], con el libre primero
+        "days": los 7 nombres de los días de la semana
+        "tags": {"media-jornada": ["Ana", ...], ...}, etiquetas de empleados
+        "qualifications": {"noche": "nocturno", ...}, los únicos empleados que
+            pueden hacer cada turno; los demás no tienen variables para él
+    Sin ellos se usan los de Mappings. Las reglas de secuencia (tras la
+    codificación), las semanales y las transiciones pueden terminar en un selector
+    de empleados: un nombre, una etiqueta o una lista de ellos, por ejemplo
+        "weekly_constraints": [["noche", 0, 1, 2, 2, 3, 4, "media-jornada"], ...]
+    fixed_assignments y requests pueden ser la ruta de un CSV (relativa a
+    base_dir) con las columnas employee, shift, day, week (opcional, 1 por
+    defecto) y, en las peticiones, weight; en JSON las peticiones admiten la
+    semana como quinto elemento.
+
+    En JSON, una fila también puede ser un patrón que se expande al construir el
+    modelo (ver DayIndex), por ejemplo
+        {"employee": "Ana", "shift": "libre", "weekdays": ["sábado", "domingo"], "every": 2}
+        {"employee": "noches", "shift": "libre", "from": "2025-08-04", "to": "2025-08-17"}
+        {"shift": "libre", "dates": ["2025-12-25"], "weight": -4}
+    con un selector de empleados (todos si falta), weekdays, every (semanas),
+    first_week y last_week, from y to o dates; las fechas absolutas necesitan
+    "start_date", el lunes de la primera semana.
+
+    Las tablas grandes se leen por columnas y sus nombres se traducen a
+    identificadores columna a columna (ver _intern).
+
+    Con base_dir None el escenario no puede nombrar ficheros, y con confine solo
+    puede nombrar ficheros dentro de base_dir (p. ej. escenarios de clientes
+    remotos del servicio).
+
+    Returns:
+        Team: el escenario con sus nombres y las entradas de add_constraints.
+    """
+    employees, tags = _read_employees(data.get("employees"), base_dir, confine)
+    if employees is None:
+        employees = [Mappings.ID_TO_WORKER.get(e, f"Employee {e}") for e in range(data["num_employees"])]
+    elif data.get("num_employees", len(employees)) != len(employees):
+        raise ValueError(f"num_employees ({data['num_employees']}) no coincide con los {len(employees)} empleados.")
+    if len(set(employees)) != len(employees):
+        raise ValueError("Hay nombres de empleado repetidos.")
+    shifts = data.get("shifts")
+    days = data.get("days")
+    if days is not None and len(days) != 7:
+        raise ValueError(f"Se esperaban 7 días y hay {len(days)}.")
+    team = Team(employees, data["num_weeks"], shifts, days, data.get("start_date"))
+    for tag, members in data.get("tags", {}).items():
+        tags.setdefault(tag, []).extend(members)
+    team.tags = {tag: team.select(members) for tag, members in tags.items()}
+    for shift, selector in data.get("qualifications", {}).items():
+        team.qualify(shift, selector)
+
+    team.inputs = dict(
+        fixed_assignments=team.day_table(data.get("fixed_assignments"), base_dir, FIXED_COLUMNS, confine),
+        requests=team.day_table(data.get("requests"), base_dir, REQUEST_COLUMNS, confine),
+        shift_constraints=[team.shift_rule(row, encoded=True) for row in data.get("shift_constraints", [])],
+        weekly_constraints=[team.shift_rule(row) for row in data.get("weekly_constraints", [])],
+        penalized_transitions=[
+            (team.shift_id(previous_shift), team.shift_id(next_shift), cost, *map(team.select, selector))
+            for previous_shift, next_shift, cost, *selector in data.get("penalized_transitions", [])
+        ],
+        weekly_cover_demands=[tuple(row) for row in data["weekly_cover_demands"]],
+        excess_cover_penalties=tuple(data["excess_cover_penalties"]),
+    )
+    if "cover_shortage_penalty" in data:
+        team.inputs["cover_shortage_penalty"] = data["cover_shortage_penalty"]
+    team.validate_demands()
+    team.validate_eligibility()
+    return team
+
+
+class Team:
+    """Nombres de empleados, turnos y días de un escenario y sus entradas de add_constraints.
+
+    shifts y days son None si el escenario usa los de Mappings; eligible es None
+    si todos los empleados pueden hacer todos los turnos.
+    """
+
+    def __init__(self, employees, num_weeks, shifts=None, days=None, start_date=None):
+        self.employees = list(employees)
+        self.num_employees = len(self.employees)
+        self.num_weeks = num_weeks
+        self.num_days = num_weeks * 7
+        self.start_date = start_date
+        self.shifts = None if shifts is None else list(shifts)
+        self.days = None if days is None else list(days)
+        self.employee_ids = {name: e for e, name in enumerate(self.employees)}
+        self.shift_ids = Mappings.SHIFT if shifts is None else {name.lower(): s for s, name in enumerate(shifts)}
+        self.day_ids = Mappings.DAYS if days is None else {name.lower(): d for d, name in enumerate(days)}
+        self.num_shifts = len(self.shift_ids)
+        self.tags = {}
+        self.eligible = None
+        self.inputs = {}
+
+    def shift_id(self, name):
+        try:
+            return self.shift_ids[name.lower()]
+        except KeyError:
+            raise ValueError(f"Turno '{name}' no es válido. Usa: {', '.join(self.shift_ids)}") from None
+
+    def select(self, selector):
+        """Identificadores de los empleados de un selector: nombre, etiqueta o lista de ellos."""
+        selected = set()
+        for name in [selector] if isinstance(selector, str) else selector:
+            if name in self.employee_ids:
+                selected.add(self.employee_ids[name])
+            elif name in self.tags:
+                selected.update(self.tags[name])
+            else:
+                raise ValueError(f"'{name}' no es un empleado ni una etiqueta.")
+        return tuple(sorted(selected))
+
+    def qualify(self, shift, selector):
+        """Restringe el turno a los empleados del selector."""
+        s = self.shift_id(shift)
+        if s == 0:
+            raise ValueError("El turno libre no puede restringirse.")
+        if self.eligible is None:
+            self.eligible = np.ones((self.num_employees, self.num_shifts), dtype=bool)
+        self.eligible[:, s] = False
+        self.eligible[list(self.select(selector)), s] = True
+
+    def shift_rule(self, row, encoded=False):
+        """Tupla de una regla de secuencia (encoded) o semanal con el turno traducido.
+
+        Tras los seis límites y costes (y la codificación) puede venir un selector de
+        empleados, que se traduce a sus identificadores.
+        """
+        shift, *bounds = row
+        bounds, rest = bounds[:6], bounds[6:]
+        if encoded:
+            # Las reglas de secuencia llevan siempre su codificación, por defecto la de spans
+            encoding, *rest = rest or [Mappings.SPAN_ENCODING]
+            if encoding not in Mappings.SEQUENCE_ENCODINGS:
+                raise ValueError(f"Codificación '{encoding}' no válida. Usa: "
+                                 f"{', '.join(Mappings.SEQUENCE_ENCODINGS)}")
+            bounds.append(encoding)
+        return (self.shift_id(shift), *bounds, *map(self.select, rest[:1]))
+
+    def day_table(self, source, base_dir, columns, confine=False):
+        """Traduce una tabla de asignaciones fijas o peticiones a tuplas (e, s, d[, peso]).
+
+        Las semanas y los días se combinan con NumPy sobre columnas enteras. Si hay
+        filas con patrones (diccionarios), el resultado es un DayIndex con las filas
+        sueltas y los patrones sin expandir.
+        """
+        if isinstance(source, list) and any(isinstance(row, dict) for row in source):
+            index = DayIndex(self.num_employees, self.num_days, weighted="weight" in columns,
+                             start_date=self.start_date)
+            index.extend(self.day_table([row for row in source if not isinstance(row, dict)], base_dir, columns,
+                                        confine))
+            for row in source:
+                if isinstance(row, dict):
+                    self.day_pattern(index, row)
+            return index
+        table = _read_table(source, base_dir, columns, confine)
+        if table is None:
+            return []
+        employees = _intern(table["employee"], self.employee_ids, "Empleados", fold_case=False)
+        shifts = _intern(table["shift"], self.shift_ids, "Turnos")
+        days = _intern(table["day"], self.day_ids, "Días")
+        weeks = np.asarray(table["week"], dtype=np.int64)
+        outside = (weeks < 1) | (weeks > self.num_weeks)
+        if outside.any():
+            raise ValueError(f"Semana {weeks[outside][0]} fuera del horizonte de {self.num_weeks} semanas.")
+        days += (weeks - 1) * 7
+        if "weight" in table:
+            weights = np.asarray(table["weight"], dtype=np.int64)
+            return list(zip(employees.tolist(), shifts.tolist(), days.tolist(), weights.tolist()))
+        return list(zip(employees.tolist(), shifts.tolist(), days.tolist()))
+
+    def day_pattern(self, index, row):
+        """Añade al índice el patrón de una fila JSON (ver parse_team)."""
+        unknown = set(row) - {"employee", "shift", "weight", "weekdays", "every", "first_week", "last_week",
+                              "from", "to", "dates"}
+        if unknown:
+            raise ValueError(f"Campos de patrón no reconocidos: {', '.join(sorted(unknown))}")
+        employees = self.select(row["employee"]) if "employee" in row else None
+        s = self.shift_id(row["shift"])
+        weight = row.get("weight")
+        if "dates" in row:
+            index.add_dates(employees, s, row["dates"], weight)
+            return
+        first = row.get("from", (row.get("first_week", 1) - 1) * 7)
+        last = row.get("to", row["last_week"] * 7 - 1 if "last_week" in row else None)
+        weekdays = row.get("weekdays")
+        if weekdays is not None:
+            weekdays = _intern([weekdays] if isinstance(weekdays, str) else weekdays, self.day_ids, "Días")
+        index.add_pattern(employees, s, first, last, weekdays, row.get("every", 1), weight)
+
+    def validate_demands(self):
+        """Comprueba las filas de demanda (7 o una por día) y que tienen un valor por turno de trabajo."""
+        num_rows = len(self.inputs["weekly_cover_demands"])
+        if num_rows not in (7, self.num_days):
+            raise ValueError(f"weekly_cover_demands necesita 7 filas (una por día de la semana) o {self.num_days} "
+                             f"(una por día del horizonte), y tiene {num_rows}.")
+        width = self.num_shifts - 1
+        for row in self.inputs["weekly_cover_demands"]:
+            if len(row) != width:
+                raise ValueError(f"Cada demanda necesita {width} valores (uno por turno de trabajo): {row}")
+        if len(self.inputs["excess_cover_penalties"]) != width:
+            raise ValueError(f"excess_cover_penalties necesita {width} valores (uno por turno de trabajo).")
+
+    def validate_eligibility(self):
+        """Comprueba que ninguna asignación fija da a un empleado un turno que no puede hacer."""
+        if self.eligible is None or not len(self.inputs["fixed_assignments"]):
+            return
+        employees, shifts, days = entry_columns(self.inputs["fixed_assignments"], 3)
+        invalid = np.flatnonzero(~self.eligible[employees, shifts])
+        if len(invalid):
+            e, s, d = employees[invalid[0]], shifts[invalid[0]], days[invalid[0]]
+            raise ValueError(f"{self.employees[e]} no puede hacer el turno {s} que tiene fijado el día {d}.")
+
+    def build_model(self, **options):
+        """Construye el Model del escenario con los nombres del equipo para imprimir los horarios."""
+        from model import Model
+
+        if self.shifts is not None:
+            options["shifts"] = self.shifts
+        if self.eligible is not None:
+            options["eligible"] = self.eligible.tolist()
+        model = Model.build(self.num_employees, self.num_weeks, self.inputs, **options)
+        self.name_model(model)
+        return model
+
+    def name_model(self, model):
+        """Pone los nombres del equipo a un Model ya construido (p. ej. desde la caché)."""
+        model.employee_names = self.employees
+        if self.days is not None:
+            model.day_names = self.days
+
+
+def _read_employees(source, base_dir, confine=False):
+    """Nombres en JSON o columnas name y tags de un CSV.
+
+    Returns:
+        tuple: (nombres o None si no se indican, etiqueta -> lista de nombres).
+    """
+    if source is None or isinstance(source, list):
+        return source, {}
+    table = _read_table(source, base_dir, ("name", "tags"), confine)
+    tags = {}
+    for name, employee_tags in zip(table["name"], table["tags"]):
+        for tag in filter(None, (tag.strip() for tag in employee_tags.split(";"))):
+            tags.setdefault(tag, []).append(name)
+    return list(table["name"]), tags
+
+
+def _read_table(source, base_dir, columns, confine=False):
+    """Lee una tabla por columnas desde un CSV (con cabecera) o una lista de filas JSON.
+
+    Las columnas que faltan toman su valor de _DEFAULTS.
+
+    Returns:
+        dict: columna -> secuencia de valores, o None si no hay tabla.
+    """
+    if source is None:
+        return None
+    if isinstance(source, str):
+        header, values = _read_csv(_table_path(source, base_dir, confine))
+    else:
+        # Filas JSON: las cortas se completan con los valores por defecto
+        header = columns
+        defaults = [_DEFAULTS.get(name) for name in columns]
+        values = list(zip(*(list(row) + defaults[len(row):] for row in source))) or [()] * len(header)
+    num_rows = len(values[0])
+    table = {}
+    for name in columns:
+        if name in header:
+            table[name] = values[header.index(name)]
+        elif name in _DEFAULTS:
+            table[name] = [_DEFAULTS[name]] * num_rows
+        else:
+            raise ValueError(f"Falta la columna '{name}' en {source}.")
+        if None in table[name]:
+            raise ValueError(f"Faltan valores de la columna '{name}'.")
+    return table
+
+
+def _table_path(source, base_dir, confine):
+    """Ruta de una tabla relativa a base_dir; sin base_dir, o fuera de él con confine, es un error."""
+    if base_dir is None:
+        raise ValueError("Este escenario no puede leer ficheros: envía las tablas como listas JSON.")
+    path = os.path.realpath(os.path.join(base_dir, source))
+    if confine and os.path.commonpath([path, os.path.realpath(base_dir)]) != os.path.realpath(base_dir):
+        raise ValueError(f"La tabla '{source}' está fuera del directorio de datos.")
+    return path
+
+
+def _read_csv(path):
+    """Lee un CSV con cabecera por columnas.
+
+    Sin comillas, el fichero se parte de una vez en campos y cada columna es un
+    slice de la lista, sin recorrer las filas en Python; con comillas se usa csv.
+    En los dos casos se quitan los espacios de alrededor de cada campo.
+
+    Returns:
+        tuple: (cabecera, lista de columnas).
+    """
+    with open(path, encoding="utf-8", newline="") as table_file:
+        text = table_file.read().replace("\r\n", "\n")
+    if '"' in text:
+        reader = csv.reader(io.StringIO(text))
+        header = [name.strip() for name in next(reader)]
+        return header, list(zip(*([field.strip() for field in row] for row in reader))) or [()] * len(header)
+    # La búsqueda de subcadenas es mucho más rápida que la expresión regular, que
+    # solo se aplica si hay espacios junto a algún separador
+    if any(spaces in text for spaces in (" ,", ", ", " \n", "\n ", "\t")):
+        text = _FIELD_SPACES.sub("", text)
+    first_line, _, body = text.partition("\n")
+    header = first_line.strip().split(",")
+    body = body.strip()
+    fields = body.replace("\n", ",").split(",") if body else []
+    if len(fields) % len(header):
+        raise ValueError(f"Las filas de {path} no tienen las {len(header)} columnas de la cabecera.")
+    return header, [fields[i::len(header)] for i in range(len(header))]
+
+
+def _intern(values, ids, kind, fold_case=True):
+    """Traduce una columna de nombres a identificadores.
+
+    Se hace una sola búsqueda por fila (map sobre dict.get), sin lower(); solo los
+    nombres que no aparecen tal cual en ids (p. ej. con otras mayúsculas) se pasan a
+    minúsculas, una vez por nombre distinto.
+    """
+    result = list(map(ids.get, values))
+    if None in result:
+        names = {value for value, found in zip(values, result) if found is None}
+        fixes = {name: ids.get(name.lower() if fold_case else name) for name in names}
+        unknown = [name for name, fixed in fixes.items() if fixed is None]
+        if unknown:
+            raise ValueError(f"{kind} no reconocidos: {', '.join(map(str, unknown[:5]))}")
+        result = [fixes[value] if found is None else found for value, found in zip(values, result)]
+    return np.array(result, dtype=np.int64)
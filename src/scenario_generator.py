@@ -0,0 +1,110 @@
+import numpy as np
+
+from constraint import Constraint
+
+# Reglas candidatas, en el formato de Model.add_shift_constraints y
+# Model.add_weekly_constraints. Las primeras son las de main.py; el número de
+# reglas de un escenario toma las n primeras de cada lista.
+SHIFT_RULES = [
+    (0, 1, 1, 0, 2, 2, 0),  # Días libres consecutivos: entre 1 y 2
+    (3, 1, 2, 20, 3, 4, 5),  # Noches consecutivas: entre 1 y 4, preferiblemente 2 o 3
+    (1, 1, 2, 3, 5, 6, 2),  # Mañanas consecutivas: entre 1 y 6, preferiblemente de 2 a 5
+    (2, 1, 2, 3, 5, 6, 2),  # Tardes consecutivas: entre 1 y 6, preferiblemente de 2 a 5
+]
+WEEKLY_RULES = [
+    (0, 1, 2, 7, 2, 3, 4),  # Días libres por semana: entre 1 y 3, preferiblemente 2
+    (3, 0, 1, 3, 4, 4, 0),  # Noches por semana: como mucho 4
+    (1, 0, 1, 1, 4, 5, 2),  # Mañanas por semana: como mucho 5
+    (2, 0, 1, 1, 4, 5, 2),  # Tardes por semana: como mucho 5
+]
+TRANSITIONS = [
+    (2, 3, 4),  # Tarde -> noche penalizada
+    (3, 1, 0),  # Noche -> mañana prohibida
+    (3, 2, 2),  # Noche -> tarde penalizada
+    (2, 1, 1),  # Tarde -> mañana penalizada
+]
+
+# Demanda semanal de main.py para 8 empleados
+MAIN_DEMANDS = [(2, 3, 1), (2, 3, 1), (2, 2, 2), (2, 3, 1), (2, 2, 2), (1, 2, 3), (1, 3, 1)]
+MAIN_COVER_PENALTIES = (2, 2, 5)
+
+
+def scaled_scenario(num_employees, encoding=Constraint.SPAN_ENCODING):
+    """Las reglas de main.py con su demanda escalada al número de empleados, sin asignaciones ni peticiones.
+
+    Returns:
+        dict: las entradas de Model.add_constraints.
+    """
+    scale = num_employees / 8
+    return dict(
+        fixed_assignments=[],
+        requests=[],
+        shift_constraints=[rule + (encoding,) for rule in SHIFT_RULES[:2]],
+        weekly_constraints=WEEKLY_RULES[:2],
+        penalized_transitions=TRANSITIONS[:2],
+        weekly_cover_demands=[tuple(int(demand * scale) for demand in day) for day in MAIN_DEMANDS],
+        excess_cover_penalties=MAIN_COVER_PENALTIES,
+    )
+
+
+def generate_scenario(num_employees, num_weeks, seed=0, num_rules=2, encoding=Constraint.SPAN_ENCODING,
+                      fixed_rate=0.02, request_rate=0.05, occupancy=0.6):
+    """Genera un escenario aleatorio reproducible con las entradas de Model.add_constraints.
+
+    La demanda de cada día reparte en torno a occupancy * num_employees personas
+    entre los tres turnos de trabajo, de modo que siempre quede personal para los
+    días libres obligatorios. Las asignaciones fijas son días libres (vacaciones)
+    y las peticiones piden o rechazan un turno con pesos entre -4 y 4.
+
+    Args:
+        num_employees: número de empleados.
+        num_weeks: número de semanas.
+        seed: semilla del generador aleatorio.
+        num_rules: número de reglas de secuencia, semanales y de transición.
+        encoding: codificación de las reglas de secuencia.
+        fixed_rate: fracción de (empleado, día) con un día libre fijo, con un
+            máximo de uno por empleado y semana.
+        request_rate: fracción de (empleado, día) con una petición.
+        occupancy: fracción media de la plantilla que trabaja cada día.
+
+    Returns:
+        tuple: (num_employees, num_weeks, inputs).
+    """
+    if not 1 <= num_rules <= len(SHIFT_RULES):
+        raise ValueError(f"El número de reglas debe estar entre 1 y {len(SHIFT_RULES)}.")
+    rng = np.random.default_rng(seed)
+    num_days = num_weeks * 7
+
+    # Demanda semanal: personas por día en torno a la ocupación, repartidas entre
+    # mañana, tarde y noche con más peso en los turnos de día
+    daily_staff = np.maximum(np.round(num_employees * occupancy * rng.uniform(0.85, 1.0, size=7)), 3)
+    proportions = rng.dirichlet([4, 4, 2], size=7)
+    demands = np.floor(daily_staff[:, np.newaxis] * proportions).astype(np.int64)
+    demands = np.maximum(demands, 1)
+    excess_cover_penalties = tuple(int(penalty) for penalty in rng.integers(1, 6, size=3))
+
+    # Como mucho un día libre fijo por empleado y semana, para no encadenar más días
+    # libres de los que permiten las reglas de secuencia
+    has_fixed = rng.random((num_employees, num_weeks)) < fixed_rate * 7
+    fixed_days = rng.integers(0, 7, size=(num_employees, num_weeks))
+    fixed_assignments = [(int(e), 0, int(w * 7 + fixed_days[e, w])) for e, w in zip(*np.nonzero(has_fixed))]
+
+    num_requests = int(num_employees * num_days * request_rate)
+    request_cells = rng.choice(num_employees * num_days, size=num_requests, replace=False)
+    request_shifts = rng.integers(0, 4, size=num_requests)
+    request_weights = rng.choice([-4, -2, -1, 1, 2, 4], size=num_requests)
+    requests = [
+        (int(cell // num_days), int(shift), int(cell % num_days), int(weight))
+        for cell, shift, weight in zip(request_cells, request_shifts, request_weights)
+    ]
+
+    inputs = dict(
+        fixed_assignments=fixed_assignments,
+        requests=requests,
+        shift_constraints=[rule + (encoding,) for rule in SHIFT_RULES[:num_rules]],
+        weekly_constraints=list(WEEKLY_RULES[:num_rules]),
+        penalized_transitions=list(TRANSITIONS[:num_rules]),
+        weekly_cover_demands=[tuple(int(demand) for demand in day) for day in demands],
+        excess_cover_penalties=excess_cover_penalties,
+    )
+    return num_employees, num_weeks, inputs
@@ -0,0 +1,287 @@
+import asyncio
+import collections
+import itertools
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from absl import app, flags
+from ortools.sat.python import cp_model
+
+from progress import ProgressRecorder
+from scenario import parse_team
+from solver import Solver
+
+# Parámetros de la línea de comandos
+_HOST = flags.DEFINE_string("host", "127.0.0.1", "Address to listen on.")
+_PORT = flags.DEFINE_integer("port", 8765, "TCP port to listen on.")
+_SOCKET = flags.DEFINE_string("socket", "", "Unix socket path to listen on instead of --host and --port.")
+_JOBS = flags.DEFINE_integer("jobs", 2, "Number of jobs solved at the same time.")
+_WORKERS = flags.DEFINE_integer("workers", 4, "CP-SAT search workers per job.")
+_TIME_LIMIT = flags.DEFINE_float("time_limit", 10.0, "Default time limit per job in seconds.")
+_DATA_DIR = flags.DEFINE_string("data_dir", "", "Directory with the CSV tables scenarios may name; without it "
+                                                "scenarios can not reference files.")
+_KEEP_JOBS = flags.DEFINE_integer("keep_jobs", 100, "Number of finished jobs kept for status and watch.")
+
+# Estados de un trabajo
+QUEUED, RUNNING, DONE, CANCELLED, FAILED = "queued", "running", "done", "cancelled", "failed"
+FINISHED = (DONE, CANCELLED, FAILED)
+
+
+class Job:
+    """Un escenario enviado al servicio, con su estado, su progreso y su resultado."""
+
+    def __init__(self, job_id, team, time_limit, params):
+        self.job_id = job_id
+        self.team = team
+        self.time_limit = time_limit
+        self.params = params
+        self.state = QUEUED
+        self.submitted = time.time()
+        self.history = []
+        self.result = None
+        self.error = None
+        self.recorder = None
+        # Colas de los clientes que siguen el progreso (watch)
+        self.watchers = []
+
+    def summary(self, with_schedule=False):
+        """Estado del trabajo serializable en JSON."""
+        summary = {
+            "job_id": self.job_id,
+            "state": self.state,
+            "num_employees": self.team.num_employees,
+            "num_weeks": self.team.num_weeks,
+            "history": self.history,
+            "error": self.error,
+        }
+        if self.result is not None:
+            summary.update({key: value for key, value in self.result.items() if key != "schedule"})
+            if with_schedule:
+                summary["schedule"] = self.result["schedule"]
+        return summary
+
+    def publish(self, event):
+        """Envía un evento a los clientes que siguen el trabajo. Solo desde el bucle de eventos."""
+        for queue in self.watchers:
+            queue.put_nowait(event)
+
+
+class _JobStream:
+    """Adapta el stream de ProgressRecorder: cada solución se publica desde el bucle de eventos."""
+
+    def __init__(self, job, loop):
+        self.job = job
+        self.loop = loop
+
+    def put(self, record):
+        self.loop.call_soon_threadsafe(self._publish, record)
+
+    def _publish(self, record):
+        self.job.history.append(record)
+        self.job.publish({"event": "progress", "job_id": self.job.job_id, **record})
+
+
+class SchedulingService:
+    """Servicio asyncio que resuelve escenarios en una cola de trabajos.
+
+    Los clientes se conectan por TCP o por un socket Unix y envían peticiones JSON
+    de una línea; cada respuesta es también una línea JSON con "ok" y, si falla,
+    "error". Las operaciones son:
+        {"op": "submit", "scenario": {...}, "time_limit": 10, "params": ""} -> job_id
+        {"op": "status", "job_id": "1", "schedule": false} -> estado del trabajo
+        {"op": "cancel", "job_id": "1"} -> estado del trabajo
+        {"op": "list"} -> estado de todos los trabajos
+        {"op": "watch", "job_id": "1"} -> una línea por cada solución mejorada
+            ({"event": "progress", ...}) y una última {"event": "done", ...}
+    El escenario tiene el formato de scenario.parse_team; solo puede nombrar
+    tablas CSV dentro de data_dir, y ninguna si no se indica.
+
+    Los trabajos se resuelven en un ThreadPoolExecutor de num_jobs hilos, fuera
+    del bucle de eventos (CP-SAT libera el GIL mientras resuelve), de modo que el
+    proceso y OR-Tools se cargan una sola vez para todas las peticiones.
+
+    Solo se conservan los keep_jobs últimos trabajos terminados (con su horario y
+    su progreso); los anteriores se olvidan.
+    """
+
+    def __init__(self, num_jobs=2, num_workers=4, time_limit=10.0, keep_jobs=100, data_dir=None):
+        self.num_jobs = num_jobs
+        self.num_workers = num_workers
+        self.time_limit = time_limit
+        self.keep_jobs = keep_jobs
+        self.data_dir = data_dir
+        self.jobs = {}
+        # Trabajos terminados, del más antiguo al más reciente
+        self.finished = collections.deque()
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=num_jobs)
+        self._ids = itertools.count(1)
+        self._runners = []
+
+    async def start(self):
+        """Arranca las tareas que sacan trabajos de la cola."""
+        self._runners = [asyncio.create_task(self._runner()) for _ in range(self.num_jobs)]
+
+    async def close(self):
+        """Cancela los trabajos pendientes y detiene las tareas de la cola."""
+        # cancel() puede olvidar trabajos terminados, así que se recorre una copia
+        for job in list(self.jobs.values()):
+            self.cancel(job)
+        for runner in self._runners:
+            runner.cancel()
+        await asyncio.gather(*self._runners, return_exceptions=True)
+        self.executor.shutdown(wait=True)
+
+    def submit(self, scenario, time_limit=None, params=""):
+        """Valida el escenario y lo encola. Devuelve el trabajo creado."""
+        team = parse_team(scenario, self.data_dir, confine=True)
+        job = Job(str(next(self._ids)), team, time_limit or self.time_limit, params)
+        self.jobs[job.job_id] = job
+        self.queue.put_nowait(job)
+        return job
+
+    def cancel(self, job):
+        """Cancela un trabajo en cola o detiene su búsqueda si se está resolviendo."""
+        if job.state == QUEUED:
+            self._finish(job, CANCELLED)
+        elif job.state == RUNNING and job.recorder is not None:
+            job.recorder.stop()
+
+    def _finish(self, job, state):
+        job.state = state
+        job.publish({"event": "done", **job.summary()})
+        self.finished.append(job.job_id)
+        while len(self.finished) > self.keep_jobs:
+            self.jobs.pop(self.finished.popleft(), None)
+
+    async def _runner(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            if job.state != QUEUED:
+                continue
+            job.state = RUNNING
+            # El modelo se asigna al construirlo; el recorder existe antes para poder cancelar
+            job.recorder = ProgressRecorder(None, stream=_JobStream(job, loop), verbose=False)
+            # Cualquier error del trabajo lo marca como fallido sin detener la cola
+            state = FAILED
+            try:
+                job.result = await loop.run_in_executor(self.executor, self.solve_job, job)
+                state = CANCELLED if job.recorder.stop_reason == "cancelled" else DONE
+            except asyncio.CancelledError:
+                state = CANCELLED
+                raise
+            except Exception as error:
+                job.error = f"{type(error).__name__}: {error}"
+            finally:
+                self._finish(job, state)
+
+    def solve_job(self, job):
+        """Construye y resuelve el modelo de un trabajo. Se ejecuta en un hilo del executor."""
+        start = time.perf_counter()
+        model = job.team.build_model()
+        build_time = time.perf_counter() - start
+        job.recorder.model = model
+        if job.recorder.stop_reason == "cancelled":
+            # Cancelado mientras se construía el modelo
+            return None
+        solver = Solver(model)
+        # Ctrl-C lo atiende el bucle de eventos (close), no CP-SAT desde el hilo del trabajo
+        params = f"max_time_in_seconds:{job.time_limit},num_workers:{self.num_workers},catch_sigint_signal:false"
+        if job.params:
+            params += "," + job.params
+        status = solver.solve(params, "", progress=job.recorder)
+        has_solution = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        return {
+            "status": solver.solver.status_name(status),
+            "objective": solver.solver.objective_value if has_solution else None,
+            "build_time": round(build_time, 3),
+            "solve_time": round(solver.solver.wall_time, 3),
+            "schedule": solver.schedule_matrix().tolist() if has_solution else None,
+        }
+
+    async def handle_client(self, reader, writer):
+        """Atiende las peticiones de una conexión, una por línea."""
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    await self.handle_request(request, writer)
+                except (ValueError, KeyError, TypeError, IndexError, OSError) as error:
+                    await self._send(writer, {"ok": False, "error": f"{type(error).__name__}: {error}"})
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, request, writer):
+        op = request["op"]
+        if op == "submit":
+            job = self.submit(request["scenario"], request.get("time_limit"), request.get("params", ""))
+            await self._send(writer, {"ok": True, "job_id": job.job_id})
+        elif op == "list":
+            await self._send(writer, {"ok": True, "jobs": [job.summary() for job in self.jobs.values()]})
+        elif op in ("status", "cancel", "watch"):
+            job = self.jobs.get(str(request["job_id"]))
+            if job is None:
+                raise KeyError(f"Trabajo '{request['job_id']}' no encontrado.")
+            if op == "cancel":
+                self.cancel(job)
+            if op == "watch":
+                await self.watch(job, writer)
+            else:
+                await self._send(writer, {"ok": True, "job": job.summary(request.get("schedule", False))})
+        else:
+            raise ValueError(f"Operación '{op}' no reconocida.")
+
+    async def watch(self, job, writer):
+        """Envía el progreso ya registrado y el nuevo hasta que el trabajo termina."""
+        queue = asyncio.Queue()
+        job.watchers.append(queue)
+        # Lo que llegue mientras se envía el historial queda en la cola
+        history, finished = list(job.history), job.state in FINISHED
+        try:
+            for record in history:
+                await self._send(writer, {"ok": True, "event": "progress", "job_id": job.job_id, **record})
+            event = {"event": "done", **job.summary()} if finished else await queue.get()
+            while True:
+                await self._send(writer, {"ok": True, **event})
+                if event["event"] == "done":
+                    return
+                event = await queue.get()
+        finally:
+            job.watchers.remove(queue)
+
+    @staticmethod
+    async def _send(writer, message):
+        writer.write(json.dumps(message, ensure_ascii=False).encode() + b"\n")
+        await writer.drain()
+
+
+async def serve(service, host="127.0.0.1", port=8765, socket_path=""):
+    """Sirve las peticiones hasta que se cancela la tarea."""
+    await service.start()
+    if socket_path:
+        server = await asyncio.start_unix_server(service.handle_client, socket_path)
+    else:
+        server = await asyncio.start_server(service.handle_client, host, port)
+    print(f"Listening on {socket_path or f'{host}:{port}'}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(_):
+    service = SchedulingService(_JOBS.value, _WORKERS.value, _TIME_LIMIT.value, _KEEP_JOBS.value,
+                                _DATA_DIR.value or None)
+    try:
+        asyncio.run(serve(service, _HOST.value, _PORT.value, _SOCKET.value))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    app.run(main)
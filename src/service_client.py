@@ -0,0 +1,113 @@
+import asyncio
+import json
+import sys
+
+from absl import app, flags
+
+# Parámetros de la línea de comandos
+_HOST = flags.DEFINE_string("host", "127.0.0.1", "Address of the scheduling service.")
+_PORT = flags.DEFINE_integer("port", 8765, "TCP port of the scheduling service.")
+_SOCKET = flags.DEFINE_string("socket", "", "Unix socket path of the service instead of --host and --port.")
+_SCENARIO = flags.DEFINE_string("scenario", "", "Scenario file (.json) to submit; its progress is streamed.")
+_TIME_LIMIT = flags.DEFINE_float("time_limit", None, "Time limit of the submitted job in seconds.")
+_JOB = flags.DEFINE_string("job", "", "Job id for --action.")
+_ACTION = flags.DEFINE_enum("action", "watch", ["watch", "status", "cancel", "list"],
+                            "What to do with --job when no --scenario is given.")
+
+
+class ServiceClient:
+    """Cliente asyncio del servicio de planificación (ver service.SchedulingService)."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=8765, socket_path=""):
+        if socket_path:
+            return cls(*await asyncio.open_unix_connection(socket_path))
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+    async def request(self, **request):
+        """Envía una petición y devuelve su respuesta; lanza RuntimeError si falla."""
+        await self._send(request)
+        return await self._receive()
+
+    async def submit(self, scenario, time_limit=None, params=""):
+        """Encola un escenario (diccionario con el formato de scenario.parse_team) y devuelve su job_id."""
+        response = await self.request(op="submit", scenario=scenario, time_limit=time_limit, params=params)
+        return response["job_id"]
+
+    async def status(self, job_id, schedule=False):
+        return (await self.request(op="status", job_id=job_id, schedule=schedule))["job"]
+
+    async def cancel(self, job_id):
+        return (await self.request(op="cancel", job_id=job_id))["job"]
+
+    async def list(self):
+        return (await self.request(op="list"))["jobs"]
+
+    async def watch(self, job_id):
+        """Generador asíncrono de los eventos del trabajo, hasta el evento "done" incluido."""
+        await self._send({"op": "watch", "job_id": job_id})
+        while True:
+            event = await self._receive()
+            yield event
+            if event["event"] == "done":
+                return
+
+    async def _send(self, request):
+        self.writer.write(json.dumps(request, ensure_ascii=False).encode() + b"\n")
+        await self.writer.drain()
+
+    async def _receive(self):
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("El servicio ha cerrado la conexión.")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response
+
+
+async def run(scenario_path, job_id, action, time_limit):
+    client = await ServiceClient.connect(_HOST.value, _PORT.value, _SOCKET.value)
+    try:
+        if scenario_path:
+            with open(scenario_path, encoding="utf-8") as scenario_file:
+                job_id = await client.submit(json.load(scenario_file), time_limit)
+            print(f"Submitted job {job_id}")
+            action = "watch"
+        if action == "list":
+            for job in await client.list():
+                print(f"  job {job['job_id']}: {job['state']}, objective={job.get('objective')}")
+        elif action == "watch":
+            async for event in client.watch(job_id):
+                if event["event"] == "progress":
+                    print(f"  time = {event['time']:.2f} s, objective = {event['objective']}, "
+                          f"gap = {event['gap']:.2f}%")
+                else:
+                    print(f"Job {job_id}: {event['state']}, status={event.get('status')}, "
+                          f"objective={event.get('objective')}")
+        else:
+            job = await (client.status(job_id) if action == "status" else client.cancel(job_id))
+            print(json.dumps(job, ensure_ascii=False, indent=2))
+    finally:
+        await client.close()
+
+
+def main(_):
+    if not _SCENARIO.value and _ACTION.value != "list" and not _JOB.value:
+        raise app.UsageError("Give --scenario to submit, or --job with --action")
+    try:
+        asyncio.run(run(_SCENARIO.value, _JOB.value, _ACTION.value, _TIME_LIMIT.value))
+    except (RuntimeError, ConnectionError) as error:
+        sys.exit(f"Error: {error}")
+
+
+if __name__ == "__main__":
+    app.run(main)
@@ -1,7 +1,13 @@
+import os
+
+import numpy as np
 from ortools.sat.python import cp_model
 from google.protobuf import text_format
 
-from mappings import Mappings
+from export import write_schedule, write_table
+from instrumentation import PresolveTimer, response_stats, timed
+from proto_io import write_model_proto
+from render import print_schedule
 
 class Solver:
     """Se encarga de resolver el problema del modelo."""
@@ -9,17 +15,179 @@ class Solver:
     def __init__(self, model):
         self.model = model
         self.solver = cp_model.CpSolver()
+        self._values = None
+        # Restricciones que congelan semanas de un horario anterior, por semana.
+        self.frozen_weeks = {}
+        # Duración de las fases de resolución (volcado del proto, búsqueda)
+        self.phases = []
+        self.time_presolve = False
+        self.presolve_timer = None
+
+    def solve(self, params, output_proto, log_solutions=True, progress=None):
+        """Resuelve el modelo especificado.
 
-    def solve(self, params, output_proto):
-        """Resuelve el modelo especificado."""
+        Si se indica progress (un ProgressRecorder), sustituye a la impresión de
+        soluciones y puede detener la búsqueda antes del límite de tiempo.
+        """
         if output_proto:
             print(f"Writing proto to {output_proto}")
-            with open(output_proto, "w") as text_file:
-                text_file.write(str(self.model.model))
+            with timed(self.phases, "write_proto"):
+                write_model_proto(self.model.model.Proto(), output_proto)
         if params:
-            text_format.Parse(params, self.solver.parameters)
-        solution_printer = cp_model.ObjectiveSolutionPrinter()
-        return self.solver.solve(self.model.model, solution_printer)
+            # Merge permite volver a resolver con parámetros que sobrescriben los anteriores
+            text_format.Merge(params, self.solver.parameters)
+        if self.time_presolve:
+            self.presolve_timer = PresolveTimer(self.solver)
+        self._values = None
+        if progress is not None:
+            progress.start(self.solver)
+            try:
+                with timed(self.phases, "solve"):
+                    return self.solver.solve(self.model.model, progress)
+            finally:
+                progress.finish()
+        solution_printer = cp_model.ObjectiveSolutionPrinter() if log_solutions else None
+        with timed(self.phases, "solve"):
+            return self.solver.solve(self.model.model, solution_printer)
+
+    def enable_presolve_timing(self):
+        """Mide el presolve en las próximas resoluciones a partir del log de CP-SAT."""
+        self.time_presolve = True
+
+    def metrics(self):
+        """Métricas de construcción y de la última resolución, serializables en JSON."""
+        response = self.solver.response_proto
+        return {
+            "build_phases": self.model.phases,
+            "presolve_report": dict(self.model.presolve_report),
+            "solve_phases": self.phases,
+            "variables": len(self.model.model.Proto().variables),
+            "constraints": len(self.model.model.Proto().constraints),
+            "status": self.solver.status_name(response.status),
+            "objective": response.objective_value if response.solution else None,
+            "presolve_time": self.presolve_timer.presolve_time if self.presolve_timer else None,
+            "response": response_stats(response),
+        }
+
+    def resolve(self, params, output_proto=""):
+        """Vuelve a resolver el modelo (ya modificado) partiendo de la última solución.
+
+        El horario anterior se pasa como pista (hint) completa, de forma que
+        CP-SAT parte de un roster casi idéntico en lugar de empezar de cero.
+        """
+        if self.solver.response_proto.solution:
+            self.add_schedule_hint(self.schedule_matrix())
+        return self.solve(params, output_proto)
+
+    def add_schedule_hint(self, schedule):
+        """Sustituye las pistas del modelo por el horario (empleados x días) indicado.
+
+        Si el horario tiene menos días que el modelo, solo se dan pistas para los
+        primeros días.
+        """
+        model = self.model
+        num_days = schedule.shape[1]
+        if schedule.shape[0] != model.num_employees or num_days > model.num_days:
+            raise ValueError(f"El horario {schedule.shape} no coincide con el modelo "
+                             f"({model.num_employees}, {model.num_days}).")
+        proto = model.model.Proto()
+        model.model.clear_hints()
+        indices, values = model.hint_cells(schedule)
+        proto.solution_hint.vars.extend(indices)
+        proto.solution_hint.values.extend(values)
+
+    def freeze_weeks(self, schedule, weeks):
+        """Fija las semanas indicadas (0-indexadas) al horario dado."""
+        model = self.model
+        for w in weeks:
+            self.unfreeze_week(w)
+            literals = []
+            for d in range(w * 7, (w + 1) * 7):
+                for e in range(model.num_employees):
+                    for s, work in enumerate(model.employee_day(e, d)):
+                        literals.append(work if schedule[e, d] == s else ~work)
+            self.frozen_weeks[w] = model.model.add_bool_and(literals)
+
+    def unfreeze_week(self, w):
+        """Libera una semana congelada con freeze_weeks."""
+        if w in self.frozen_weeks:
+            self.frozen_weeks.pop(w).proto.Clear()
+
+    @staticmethod
+    def save_schedule(path, schedule):
+        """Guarda un horario (empleados x días) para reutilizarlo como pista."""
+        with open(path, "wb") as schedule_file:
+            np.save(schedule_file, schedule)
+
+    @staticmethod
+    def load_schedule(path):
+        """Carga un horario guardado con save_schedule."""
+        return np.load(path)
+
+    def solution_values(self):
+        """Devuelve los valores de todas las variables de la solución en un único array.
+
+        Se leen de una sola vez del vector de solución de la respuesta, indexado
+        por el índice de cada variable en el proto del modelo.
+        """
+        if self._values is None:
+            self._values = np.asarray(self.solver.response_proto.solution, dtype=np.int64)
+        return self._values
+
+    def schedule_matrix(self):
+        """Devuelve una matriz (empleados x días) int8 con el turno asignado a cada día."""
+        work_values = self.solution_values()[self.model.work_index]
+        return work_values.argmax(axis=1).astype(np.int8)
+
+    def penalty_values(self):
+        """Devuelve los valores de las penalizaciones (bool, int, expresiones) de la solución."""
+        values = self.solution_values()
+        bool_values = values[[var.index for var in self.model.obj_bool_vars]]
+        int_values = values[[var.index for var in self.model.obj_int_vars]]
+        expr_values = np.array([
+            values[[var.index for var in variables]].sum() + offset
+            for variables, offset in zip(self.model.obj_expr_vars, self.model.obj_expr_offsets)
+        ], dtype=np.int64)
+        return bool_values, int_values, expr_values
+
+    def penalty_table(self):
+        """Penalizaciones incumplidas (o peticiones cumplidas) de la solución, por columnas.
+
+        Returns:
+            dict: columna -> array, con el nombre de cada término, su tipo (bool,
+            int o expr), su valor, su coeficiente y el coste (valor x coeficiente).
+        """
+        bool_values, int_values, expr_values = self.penalty_values()
+        bool_rows = np.flatnonzero(bool_values)
+        int_rows = np.flatnonzero(int_values > 0)
+        expr_rows = np.flatnonzero(expr_values > 0)
+        names = ([self.model.obj_bool_vars[i].name for i in bool_rows]
+                 + [self.model.obj_int_vars[i].Name() for i in int_rows]
+                 + [self.model.obj_expr_names[i] for i in expr_rows])
+        values = np.concatenate([bool_values[bool_rows], int_values[int_rows], expr_values[expr_rows]])
+        coefficients = np.concatenate([
+            np.asarray(self.model.obj_bool_coeffs, dtype=np.int64)[bool_rows],
+            np.asarray(self.model.obj_int_coeffs, dtype=np.int64)[int_rows],
+            np.asarray(self.model.obj_expr_coeffs, dtype=np.int64)[expr_rows],
+        ])
+        kinds = ["bool"] * len(bool_rows) + ["int"] * len(int_rows) + ["expr"] * len(expr_rows)
+        return {
+            "name": np.asarray(names, dtype=object),
+            "kind": np.asarray(kinds, dtype=object),
+            "value": values,
+            "coefficient": coefficients,
+            "cost": values * coefficients,
+        }
+
+    def export_schedule(self, path, start_date=None, schedule=None):
+        """Exporta el horario de la solución a CSV, JSON Lines, Parquet o calendarios .ics (ver export)."""
+        if schedule is None:
+            schedule = self.schedule_matrix()
+        write_schedule(path, schedule, self.model.shifts, self.model.employee_names, start_date)
+
+    def export_penalties(self, path):
+        """Exporta las penalizaciones de la solución a CSV, JSON Lines o Parquet."""
+        write_table(path, self.penalty_table())
 
     def print_fixed_assignments(self, fixed_assignments):
         """Imprime las asignaciones fijas antes de resolver el problema."""
@@ -28,12 +196,12 @@ class Solver:
         num_days = 7
         num_weeks = (max(day for _, _, day in fixed_assignments) // num_days) + 1  # Calcular cuántas semanas
         fixed_schedule = {shift_name: [[] for _ in range(num_days * num_weeks)] for shift_name in
-                          Mappings.ID_TO_SHIFT.values()}
+                          self.model.shift_labels}
 
         # Agrupar las asignaciones fijas por turno y día
         for emp_id, shift_id, day in fixed_assignments:
-            shift_name = Mappings.ID_TO_SHIFT[shift_id]
-            fixed_schedule[shift_name][day].append(Mappings.ID_TO_WORKER[emp_id])
+            shift_name = self.model.shift_labels[shift_id]
+            fixed_schedule[shift_name][day].append(self.model.employee_names[emp_id])
 
         # Imprimir por cada semana
         for week in range(num_weeks):
@@ -62,74 +230,33 @@ class Solver:
 
             print()  # Separación visual entre semanas
 
-    def print_solutionSchedule(self):
-        # Imprime por semana
-        print("=== Solution Schedule ===")
-        for week in range(self.model.num_weeks):
-            print(f"Week {week + 1}")
-            # Encabezado con nombres de los días
-            header = " " * 15 + "| "  # Espaciado inicial para alineación correcta
-            header += " | ".join(f"{day:<11}" for day in self.model.day_names)
-            header += " |"
-            print(header)
-            print("—" * len(header))  # Línea horizontal que cruza el ancho del encabezado
-
-            # Imprime los turnos para cada día de la semana
-            previous_group = None  # Para comprobar el grupo de turnos
-            for shift_index, shift_name in enumerate(self.model.shifts):
-                # Ignorar el turno "Off"
-                if shift_name.lower() == "off":
-                    continue
-
-                # Separación entre grupos de turnos
-                current_group = "Morning" if "Morning" in shift_name else \
-                    "Afternoon" if "Afternoon" in shift_name else \
-                        "Night" if "Night" in shift_name else "Other"
-                if current_group != previous_group and previous_group is not None:
-                    print("—" * len(header))  # Línea de separación
-                previous_group = current_group
-
-                # Construir filas de empleados asignados para cada día
-                rows = [[] for _ in range(7)]  # 7 días en una semana
-                max_lines = 1  # Máximo número de líneas en cualquier columna
-                for d in range(week * 7, (week + 1) * 7):  # Días de la semana actual
-                    # Encuentra empleados asignados al turno actual
-                    employees = [
-                        Mappings.ID_TO_WORKER[e]
-                        for e in range(self.model.num_employees)
-                        if self.solver.boolean_value(self.model.work[e, shift_index, d])
-                    ]
-                    rows[d % 7] = employees
-                    max_lines = max(max_lines, len(employees))
-
-                # Imprime línea por línea para el turno
-                for line in range(max_lines):
-                    row = f"{shift_name if line == 0 else '':<15}" + "| "  # Nombre del turno solo en la primera línea
-                    for day in range(7):  # Repite por los 7 días
-                        if line < len(rows[day]):  # Hay un empleado asignado en esta línea
-                            row += f"{rows[day][line]:<11} | "
-                        else:  # Espacio vacío
-                            row += " " * 11 + " | "
-                    print(row)
-
-            print("—" * len(header))  # Línea horizontal al final de cada semana
-            print() if week < self.model.num_weeks-1 else None # Línea vacía entre semanas
+    def print_solutionSchedule(self, schedule=None):
+        # La matriz de turnos se extrae una sola vez del solver
+        if schedule is None:
+            schedule = self.schedule_matrix()
+        print_schedule(schedule, self.model.shifts, self.model.day_names, self.model.employee_names)
 
     def print_penalties(self):
         # Imprimir penalizaciones
         print("=== Penalties ===")
-        for i, var in enumerate(self.model.obj_bool_vars):
-            if self.solver.boolean_value(var):
-                penalty = self.model.obj_bool_coeffs[i]
-                if penalty > 0:
-                    print(f"  {var.name} violated, penalty={penalty}")
-                else:
-                    print(f"  {var.name} fulfilled, gain={-penalty}")
-
-        for i, int_var in enumerate(self.model.obj_int_vars):
-            if self.solver.value(int_var) > 0:
-                penalty = self.model.obj_int_coeffs[i]
-                print(f"  {int_var.Name()} violated by {self.solver.value(int_var)}, linear penalty={penalty}")
+        bool_values, int_values, expr_values = self.penalty_values()
+        for i in np.flatnonzero(bool_values):
+            var = self.model.obj_bool_vars[i]
+            penalty = self.model.obj_bool_coeffs[i]
+            if penalty > 0:
+                print(f"  {var.name} violated, penalty={penalty}")
+            else:
+                print(f"  {var.name} fulfilled, gain={-penalty}")
+
+        for i in np.flatnonzero(int_values > 0):
+            int_var = self.model.obj_int_vars[i]
+            penalty = self.model.obj_int_coeffs[i]
+            print(f"  {int_var.Name()} violated by {int_values[i]}, linear penalty={penalty}")
+
+        for i in np.flatnonzero(expr_values > 0):
+            name = self.model.obj_expr_names[i]
+            penalty = self.model.obj_expr_coeffs[i]
+            print(f"  {name} violated by {expr_values[i]}, linear penalty={penalty}")
 
     def print_solution(self, status):
         """Imprime la solución en caso de ser óptima o factible."""
@@ -142,3 +269,13 @@ class Solver:
             # Agregar el resumen de la respuesta del solver
             print(self.solver.ResponseStats())
 
+
+def split_cores(num_tasks, parallel=0, cores=None):
+    """Reparte los núcleos entre tareas en paralelo (procesos o hilos) y workers de CP-SAT.
+
+    Returns:
+        tuple: (tareas en paralelo, num_workers de CP-SAT por tarea).
+    """
+    cores = cores or os.cpu_count() or 1
+    parallel = min(parallel or cores, num_tasks, cores)
+    return parallel, max(1, cores // parallel)
@@ -0,0 +1,53 @@
+import os
+import sys
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from constraint import Constraint  # noqa: E402
+from model import Model  # noqa: E402
+from solver import Solver  # noqa: E402
+
+NUM_EMPLOYEES, NUM_WEEKS = 4, 2
+# Solo límites blandos, para que cualquier horario sea factible
+RULES = [(1, 1, 3, 4, 4, 14, 3), (3, 1, 2, 5, 2, 14, 6), (0, 1, 2, 7, 2, 14, 4)]
+
+
+def schedule_penalty(encoding, schedule, initial_state=None):
+    """Objetivo del horario fijado con las reglas de secuencia en la codificación indicada."""
+    model = Model(NUM_EMPLOYEES, NUM_WEEKS)
+    model.initialize_variables()
+    if initial_state is not None:
+        model.set_initial_state(*initial_state)
+    model.add_constraints(fixed_assignments=[], requests=[],
+                          shift_constraints=[rule + (encoding,) for rule in RULES], weekly_constraints=[],
+                          penalized_transitions=[], weekly_cover_demands=[(0, 0, 0)] * 7,
+                          excess_cover_penalties=(0, 0, 0))
+    model.set_objective()
+    solver = Solver(model)
+    with model.fixed_cells(schedule, np.ones(schedule.shape, dtype=bool)):
+        assert solver.solve("num_workers:1", "", log_solutions=False) == cp_model.OPTIMAL
+    return solver.solver.objective_value
+
+
+def test_encodings_give_the_same_penalties():
+    rng = np.random.default_rng(0)
+    for _ in range(5):
+        schedule = rng.integers(0, 4, size=(NUM_EMPLOYEES, NUM_WEEKS * 7)).astype(np.int8)
+        penalties = {encoding: schedule_penalty(encoding, schedule) for encoding in Constraint.SEQUENCE_ENCODINGS}
+        assert len(set(penalties.values())) == 1, penalties
+
+
+def test_encodings_give_the_same_penalties_with_initial_runs():
+    rng = np.random.default_rng(1)
+    for _ in range(5):
+        schedule = rng.integers(0, 4, size=(NUM_EMPLOYEES, NUM_WEEKS * 7)).astype(np.int8)
+        last_shifts = rng.integers(0, 4, size=NUM_EMPLOYEES)
+        initial_runs = np.zeros((NUM_EMPLOYEES, 4), dtype=np.int64)
+        initial_runs[np.arange(NUM_EMPLOYEES), last_shifts] = rng.integers(1, 5, size=NUM_EMPLOYEES)
+        penalties = {encoding: schedule_penalty(encoding, schedule, (last_shifts, initial_runs))
+                     for encoding in Constraint.SEQUENCE_ENCODINGS}
+        assert len(set(penalties.values())) == 1, penalties
+        assert penalties[Constraint.SPAN_ENCODING] != schedule_penalty(Constraint.SPAN_ENCODING, schedule)
@@ -0,0 +1,99 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from day_index import DayIndex, employee_signatures, entry_columns, select, window  # noqa: E402
+from model import Model  # noqa: E402
+
+NUM_EMPLOYEES, NUM_DAYS = 6, 8 * 7
+
+
+def patterns():
+    index = DayIndex(NUM_EMPLOYEES, NUM_DAYS, start_date="2025-01-06")
+    index.add(1, 2, 3)
+    index.add_pattern(0, 0, weekdays=[5, 6], every=2)
+    index.add_pattern([2, 3], 1, weekdays=[0])
+    index.add_pattern(4, 0, first="2025-02-03", last="2025-02-16")
+    index.add_dates(None, 0, ["2025-01-06", "2025-02-25"])
+    index.add_pattern(5, 3, first=10, last=40, weekdays=[1, 3], every=3)
+    return index
+
+
+def expanded():
+    """La lista equivalente a patterns(), replicada semana a semana como en main.py."""
+    weeks = [[] for _ in range(NUM_DAYS // 7)]
+    weeks[0].append((1, 2, 3))
+    for d in range(NUM_DAYS):
+        week = weeks[d // 7]
+        if d % 7 in (5, 6) and d // 7 % 2 == 0:
+            week.append((0, 0, d))
+        if d % 7 == 0:
+            week.extend([(2, 1, d), (3, 1, d)])
+        if 28 <= d <= 41:
+            week.append((4, 0, d))
+        if d in (0, 50):
+            week.extend((e, 0, d) for e in range(NUM_EMPLOYEES))
+        if 10 <= d <= 40 and d % 7 in (1, 3) and (d // 7 - 1) % 3 == 0:
+            week.append((5, 3, d))
+    return weeks
+
+
+def test_iteration_matches_expanded_list_week_by_week():
+    index, weeks = patterns(), expanded()
+    entries = list(index)
+    assert len(index) == len(entries) == sum(map(len, weeks))
+    # Dentro de cada semana el orden es el de las fuentes, no el de los días
+    position = 0
+    for week in weeks:
+        assert sorted(entries[position:position + len(week)]) == sorted(week)
+        position += len(week)
+    columns = list(zip(*(column.tolist() for column in entry_columns(index, 3))))
+    assert sorted(columns) == sorted(entries)
+
+
+def test_window_and_select_match_the_list():
+    index = patterns()
+    entries = list(index)
+    for first_day, last_day in ((0, 7), (7, 21), (10, 31), (50, NUM_DAYS)):
+        assert sorted(window(index, first_day, last_day)) == sorted(window(entries, first_day, last_day))
+        nested = window(window(index, first_day, last_day), 3, 9)
+        assert sorted(nested) == sorted(window(window(entries, first_day, last_day), 3, 9))
+    local_ids = {5: 0, 0: 1, 3: 2}
+    assert sorted(select(index, local_ids)) == sorted(select(entries, local_ids))
+    assert sorted(window(select(index, local_ids), 7, 21)) == sorted(window(select(entries, local_ids), 7, 21))
+
+
+def test_signatures_group_employees_with_the_same_patterns():
+    index = DayIndex(5, 28)
+    index.add_pattern([1, 2], 0, weekdays=[6])
+    index.add_pattern(3, 0, weekdays=[6])
+    index.add(4, 1, 0)
+    index.add_pattern(None, 2, weekdays=[2], every=2)
+    signatures = employee_signatures(index, 5)
+    assert signatures[1] == signatures[2] == signatures[3]
+    assert len({signatures[0], signatures[1], signatures[4]}) == 3
+    # Lo mismo con la lista expandida
+    listed = employee_signatures(list(index), 5)
+    assert listed[1] == listed[2] == listed[3] != listed[0]
+
+
+def test_symmetry_breaking_accepts_patterns():
+    fixed = DayIndex(4, 14)
+    fixed.add_pattern([0, 1, 2, 3], 0, weekdays=[6])
+    requests = DayIndex(4, 14, weighted=True)
+    requests.add_pattern([2, 3], 1, weekdays=[0], weight=-2)
+    inputs = dict(fixed_assignments=fixed, requests=requests, shift_constraints=[], weekly_constraints=[],
+                  penalized_transitions=[], weekly_cover_demands=[(1, 1, 0)] * 7,
+                  excess_cover_penalties=(2, 2, 5))
+    model = Model.build(4, 2, inputs, symmetry_breaking=True)
+    assert sorted(members.tolist() for members in model.employee_classes(fixed, requests)) == [[0, 1], [2, 3]]
+
+
+def test_describe_uses_the_pattern_parameters():
+    index = DayIndex(3, 7 * 52)
+    index.add_pattern(None, 0, weekdays=[5, 6], every=2)
+    description = index.window(7, 21).describe()
+    assert description == [{"employees": None, "shift": 0, "weight": None, "first": 0, "last": 7 * 52 - 1,
+                            "weekdays": [5, 6], "every": 2, "anchor": 0, "days": None, "offset": 7, "lo": 7,
+                            "hi": 20}]
@@ -0,0 +1,48 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from decomposition import Decomposition, group_inputs  # noqa: E402
+from scenario_generator import scaled_scenario  # noqa: E402
+from solver import Solver, split_cores  # noqa: E402
+
+
+def test_group_inputs_remaps_rule_selectors():
+    inputs = dict(
+        fixed_assignments=[(4, 0, 0)],
+        requests=[(2, 3, 1, -2)],
+        shift_constraints=[(3, 1, 2, 20, 3, 4, 5, "span", (0, 4)), (0, 1, 1, 0, 2, 2, 0, "span", (1,)),
+                           (0, 1, 1, 0, 2, 2, 0, "span")],
+        weekly_constraints=[(3, 0, 1, 3, 4, 4, 0, (2, 3)), (0, 1, 2, 7, 2, 3, 4, None)],
+        penalized_transitions=[(2, 3, 4, (4,)), (3, 1, 0)],
+        weekly_cover_demands=[(1, 1, 1)] * 7,
+        excess_cover_penalties=(2, 2, 5),
+    )
+    group = np.array([4, 2, 0])
+    sub_inputs = group_inputs(inputs, group, np.zeros((7, 3), dtype=np.int64), 1000)
+
+    assert sub_inputs["fixed_assignments"] == [(0, 0, 0)]
+    assert sub_inputs["requests"] == [(1, 3, 1, -2)]
+    # La regla del empleado 1 no afecta a nadie del grupo
+    assert sub_inputs["shift_constraints"] == [(3, 1, 2, 20, 3, 4, 5, "span", (2, 0)), (0, 1, 1, 0, 2, 2, 0, "span")]
+    assert sub_inputs["weekly_constraints"] == [(3, 0, 1, 3, 4, 4, 0, (1,)), (0, 1, 2, 7, 2, 3, 4, None)]
+    assert sub_inputs["penalized_transitions"] == [(2, 3, 4, (0,)), (3, 1, 0)]
+
+
+def test_groups_share_the_cores(monkeypatch):
+    params = []
+    solve = Solver.solve
+
+    def recorded_solve(self, solve_params, *args, **kwargs):
+        params.append(solve_params)
+        return solve(self, solve_params, *args, **kwargs)
+
+    monkeypatch.setattr(os, "cpu_count", lambda: 8)
+    monkeypatch.setattr(Solver, "solve", recorded_solve)
+    Decomposition(16, 1, scaled_scenario(16), 2, max_iterations=1).solve("max_time_in_seconds:1")
+    assert set(params) == {"max_time_in_seconds:1,num_workers:4"}
+    assert split_cores(3, 2, 8) == (2, 4)
+    assert split_cores(5, 0, 1) == (1, 1)
@@ -0,0 +1,71 @@
+import csv
+import gzip
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from export import schedule_table, write_calendars, write_schedule  # noqa: E402
+
+SCHEDULE = np.array([[1, 0, 3, 3, 0, 2, 2], [0, 2, 2, 1, 1, 0, 3]], dtype=np.int8)
+NAMES = ["Ana", "Luis, el nuevo"]
+START = "2025-01-06"
+
+
+def expected_rows(include_off=False):
+    table = schedule_table(SCHEDULE, employee_names=NAMES, start_date=START, include_off=include_off)
+    return [dict(zip(table, row)) for row in zip(*(values.tolist() for values in table.values()))]
+
+
+def test_schedule_table_skips_days_off():
+    rows = expected_rows()
+    assert len(rows) == np.count_nonzero(SCHEDULE)
+    assert rows[0] == {"employee_id": 0, "employee": "Ana", "day": 0, "week": 1, "date": "2025-01-06",
+                       "shift_id": 1, "shift": "Morning"}
+    assert len(expected_rows(include_off=True)) == SCHEDULE.size
+
+
+@pytest.mark.parametrize("name", ["schedule.csv", "schedule.csv.gz"])
+def test_csv_round_trip(tmp_path, name):
+    path = str(tmp_path / name)
+    write_schedule(path, SCHEDULE, employee_names=NAMES, start_date=START)
+    with (gzip.open if name.endswith(".gz") else open)(path, "rt", encoding="utf-8", newline="") as table_file:
+        rows = list(csv.DictReader(table_file))
+    assert rows == [{key: str(value) for key, value in row.items()} for row in expected_rows()]
+
+
+@pytest.mark.parametrize("name", ["schedule.jsonl", "schedule.jsonl.gz"])
+def test_jsonl_round_trip(tmp_path, name):
+    path = str(tmp_path / name)
+    write_schedule(path, SCHEDULE, employee_names=NAMES, start_date=START)
+    with (gzip.open if name.endswith(".gz") else open)(path, "rt", encoding="utf-8") as table_file:
+        assert [json.loads(line) for line in table_file] == expected_rows()
+
+
+def test_parquet_round_trip(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "schedule.parquet")
+    write_schedule(path, SCHEDULE, employee_names=NAMES, start_date=START)
+    assert pq.read_table(path).to_pylist() == expected_rows()
+
+
+def test_calendars(tmp_path):
+    paths = write_calendars(str(tmp_path / "calendars"), SCHEDULE, employee_names=NAMES, start_date=START)
+    assert [os.path.basename(path) for path in paths] == ["000-Ana.ics", "001-Luis_el_nuevo.ics"]
+    with open(paths[1], encoding="utf-8", newline="") as calendar_file:
+        calendar = calendar_file.read()
+    assert calendar.count("BEGIN:VEVENT") == np.count_nonzero(SCHEDULE[1])
+    assert "X-WR-CALNAME:Luis\\, el nuevo\r\n" in calendar
+    # La noche del domingo termina el lunes siguiente
+    assert "DTSTART:20250112T220000\r\nDTEND:20250113T060000\r\n" in calendar
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError, match="Formato de exportación no reconocido"):
+        write_schedule(str(tmp_path / "schedule.xlsx"), SCHEDULE, start_date=START)
+    with pytest.raises(ValueError, match="start_date"):
+        write_calendars(str(tmp_path / "calendars"), SCHEDULE)
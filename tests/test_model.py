@@ -0,0 +1,41 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from model import Model  # noqa: E402
+
+
+def small_inputs(fixed_assignments, requests):
+    return dict(
+        fixed_assignments=fixed_assignments,
+        requests=requests,
+        shift_constraints=[],
+        weekly_constraints=[],
+        penalized_transitions=[],
+        weekly_cover_demands=[(1, 1, 0)] * 7,
+        excess_cover_penalties=(2, 2, 5),
+    )
+
+
+def test_remove_request_on_fixed_cell_with_presolve():
+    # Con el presolve las dos celdas fijas comparten la misma constante
+    inputs = small_inputs([(0, 0, 0), (1, 0, 0)], [(0, 0, 0, -2), (1, 0, 0, -3), (2, 1, 3, 4)])
+    model = Model.build(3, 1, inputs, presolve=True)
+    assert model.obj_bool_vars[0].index == model.obj_bool_vars[1].index
+
+    model.remove_employee_request(0, 0, 0)
+
+    assert model.obj_bool_coeffs == [-3, 4]
+    assert model.request_terms == {(1, 0, 0): [0], (2, 1, 3): [1]}
+    model.remove_employee_request(2, 1, 3)
+    assert model.obj_bool_coeffs == [-3]
+    assert model.obj_bool_vars[0].index == model.work_index[1, 0, 0]
+
+
+def test_remove_request_matches_plain_model():
+    inputs = small_inputs([(0, 0, 0), (1, 0, 0)], [(0, 0, 0, -2), (1, 0, 0, -3)])
+    for presolve in (False, True):
+        model = Model.build(3, 1, inputs, presolve=presolve)
+        model.remove_employee_request(1, 0, 0)
+        assert model.obj_bool_coeffs == [-2]
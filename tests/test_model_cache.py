@@ -0,0 +1,66 @@
+import os
+import sys
+
+from ortools.sat.python import cp_model
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from model_cache import ModelCache  # noqa: E402
+from solver import Solver  # noqa: E402
+
+INPUTS = dict(
+    fixed_assignments=[(0, 0, 0), (1, 2, 3)],
+    requests=[(2, 1, 1, -2), (0, 3, 4, 3), (1, 2, 3, -1)],
+    shift_constraints=[(0, 1, 1, 0, 2, 2, 0, "span"), (3, 1, 2, 20, 3, 4, 5, "automaton")],
+    weekly_constraints=[(0, 1, 2, 7, 2, 3, 4)],
+    penalized_transitions=[(2, 3, 4), (3, 1, 0)],
+    weekly_cover_demands=[(1, 1, 1)] * 7,
+    excess_cover_penalties=(2, 2, 5),
+)
+
+
+def objective(model):
+    solver = Solver(model)
+    assert solver.solve("num_workers:1", "", log_solutions=False) == cp_model.OPTIMAL
+    return solver.solver.objective_value
+
+
+def test_round_trip_gives_the_same_objective(tmp_path):
+    for options in ({}, {"presolve": True}, {"compact": True}):
+        cache = ModelCache(tmp_path / str(sorted(options)))
+        built = cache.load_or_build(5, 1, INPUTS, **options)
+        key = cache.key(5, 1, INPUTS, **options)
+        assert cache.path(key).exists()
+        loaded = cache.load(key, 5, 1, **options)
+        assert loaded is not None
+        assert loaded.fixed_constraints == built.fixed_constraints
+        assert loaded.request_terms == built.request_terms
+        assert objective(loaded) == objective(built)
+
+
+def test_loaded_model_supports_removing_requests(tmp_path):
+    cache = ModelCache(tmp_path)
+    cache.load_or_build(5, 1, INPUTS)
+    model = cache.load_or_build(5, 1, INPUTS)
+    model.remove_employee_request(2, 1, 1)
+    model.remove_fixed_assignment(1, 2, 3)
+    model.set_objective()
+    fresh = dict(INPUTS, fixed_assignments=[(0, 0, 0)], requests=[(0, 3, 4, 3), (1, 2, 3, -1)])
+    assert objective(model) == objective(ModelCache(tmp_path / "fresh").load_or_build(5, 1, fresh))
+
+
+def test_key_depends_on_inputs_and_options():
+    key = ModelCache.key(5, 1, INPUTS)
+    assert key == ModelCache.key(5, 1, dict(INPUTS))
+    assert key != ModelCache.key(5, 1, INPUTS, compact=True)
+    assert key != ModelCache.key(5, 1, dict(INPUTS, requests=INPUTS["requests"][:2]))
+
+
+def test_store_keeps_the_new_entry(tmp_path):
+    # Cualquier entrada supera el límite: solo queda la última guardada
+    cache = ModelCache(tmp_path, max_bytes=1)
+    for requests in (INPUTS["requests"], INPUTS["requests"][:2], INPUTS["requests"][:1]):
+        inputs = dict(INPUTS, requests=requests)
+        cache.load_or_build(5, 1, inputs)
+        assert [path.name for path in tmp_path.glob("*.npz")] == [f"{cache.key(5, 1, inputs)}.npz"]
+        assert cache.load(cache.key(5, 1, inputs), 5, 1) is not None
@@ -0,0 +1,54 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from progress import ProgressRecorder, relative_gap  # noqa: E402
+from scenario import load_team  # noqa: E402
+from solver import Solver  # noqa: E402
+
+SCENARIO = os.path.join(os.path.dirname(__file__), "..", "scenarios", "main.json")
+# El escenario de main.py tarda mucho más que esto en llegar al óptimo
+PARAMS = "max_time_in_seconds:30,num_workers:1"
+
+
+def hard_model():
+    return load_team(SCENARIO).build_model()
+
+
+def test_relative_gap():
+    assert relative_gap(200, 150) == 25
+    assert relative_gap(0, 0) == 0
+
+
+def test_stop_gap_stops_the_search():
+    model = hard_model()
+    recorder = ProgressRecorder(model, stop_gap=100, verbose=False)
+    solver = Solver(model)
+    solver.solve(PARAMS, "", progress=recorder)
+    assert recorder.stop_reason in ("gap", "gap (bound)")
+    assert recorder.history[-1]["gap"] <= 100
+    assert solver.solver.wall_time < 20
+
+
+def test_stall_time_stops_the_search():
+    model = hard_model()
+    recorder = ProgressRecorder(model, stall_time=0.5, verbose=False, snapshots=True)
+    solver = Solver(model)
+    solver.solve(PARAMS, "", progress=recorder)
+    assert recorder.stop_reason == "stall"
+    assert solver.solver.wall_time < 20
+    # Cada solución registrada mejora la anterior y guarda su horario
+    objectives = [record["objective"] for record in recorder.history]
+    assert objectives == sorted(objectives, reverse=True) and len(set(objectives)) == len(objectives)
+    assert (recorder.history[-1]["schedule"] == solver.schedule_matrix()).all()
+
+
+def test_stop_before_the_search_starts():
+    model = hard_model()
+    recorder = ProgressRecorder(model, verbose=False)
+    recorder.stop()
+    solver = Solver(model)
+    solver.solve(PARAMS, "", progress=recorder)
+    assert recorder.stop_reason == "cancelled"
+    assert recorder.history == []
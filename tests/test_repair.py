@@ -0,0 +1,58 @@
+import os
+import sys
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from model import Model  # noqa: E402
+from repair import AbsenceRepair  # noqa: E402
+from solver import Solver  # noqa: E402
+
+PARAMS = "max_time_in_seconds:10,num_workers:1"
+INPUTS = dict(
+    fixed_assignments=[],
+    requests=[(0, 1, d, -2) for d in range(14)],
+    shift_constraints=[],
+    weekly_constraints=[],
+    penalized_transitions=[],
+    weekly_cover_demands=[(1, 1, 0)] * 7,
+    excess_cover_penalties=(2, 2, 5),
+)
+
+
+def solved_schedule():
+    solver = Solver(Model.build(3, 2, INPUTS))
+    assert solver.solve(PARAMS, "", log_solutions=False) == cp_model.OPTIMAL
+    return solver.schedule_matrix()
+
+
+def test_repair_keeps_cells_outside_the_window():
+    schedule = solved_schedule()
+    assert (schedule[0] == 1).all()
+    repair = AbsenceRepair(Model.build(3, 2, INPUTS), schedule, window=1)
+    report = repair.repair([(0, 5)], PARAMS)
+
+    repaired = report["schedule"]
+    assert report["window_days"] == [4, 5, 6]
+    assert repaired[0, 5] == 0
+    outside = np.ones(14, dtype=bool)
+    outside[4:7] = False
+    assert (repaired[:, outside] == schedule[:, outside]).all()
+    # Solo cambia el ausente y quien lo cubre
+    assert len(report["changes"]) == 2
+    assert report["cost_delta"] == 2
+
+
+def test_wider_windows_reuse_the_change_variables():
+    repair = AbsenceRepair(Model.build(3, 2, INPUTS), solved_schedule())
+    num_terms = len(repair.model.obj_bool_vars)
+    change_vars = {}
+    repair.add_change_penalties(repair.window_days([(0, 5)], 1), change_vars)
+    first = dict(change_vars)
+    repair.add_change_penalties(repair.window_days([(0, 5)], 3), change_vars)
+
+    assert len(change_vars) == 3 * 7
+    assert all(change_vars[cell] is var for cell, var in first.items())
+    assert len(repair.model.obj_bool_vars) == num_terms + len(change_vars)
@@ -0,0 +1,55 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from rolling_horizon import RollingHorizon, boundary_state, window_inputs  # noqa: E402
+
+PARAMS = "max_time_in_seconds:10,num_workers:1"
+
+
+def inputs(weekly_cover_demands, requests=(), shift_constraints=()):
+    return dict(
+        fixed_assignments=[],
+        requests=list(requests),
+        shift_constraints=list(shift_constraints),
+        weekly_constraints=[],
+        penalized_transitions=[],
+        weekly_cover_demands=weekly_cover_demands,
+        excess_cover_penalties=(2, 2, 5),
+    )
+
+
+def test_window_inputs_cuts_daily_demands():
+    daily = [(d, 0, 0) for d in range(21)]
+    window = window_inputs(inputs(daily), 7, 14)
+    assert window["weekly_cover_demands"] == daily[7:21]
+    weekly = [(1, 1, 1)] * 7
+    assert window_inputs(inputs(weekly), 7, 14)["weekly_cover_demands"] == weekly
+
+
+def test_daily_demands_stay_aligned_across_windows():
+    # Cada día obliga a todos a hacer un turno; el ciclo de 3 días no coincide con las semanas
+    daily = [tuple(3 if s == d % 3 else 0 for s in range(3)) for d in range(21)]
+    status, schedule = RollingHorizon(3, 3, inputs(daily), 2).solve(PARAMS)
+    assert schedule.shape == (3, 21)
+    assert (schedule == np.arange(21) % 3 + 1).all()
+
+
+def test_boundary_state():
+    last_shifts, initial_runs = boundary_state(np.array([[1, 3, 3, 3], [2, 2, 2, 0]]), 4)
+    assert last_shifts.tolist() == [3, 0]
+    assert initial_runs.tolist() == [[0, 0, 0, 3], [1, 0, 0, 0]]
+
+
+def test_next_window_carries_the_running_sequence():
+    # Como mucho dos noches seguidas: las dos últimas noches de la primera semana
+    # impiden la noche que se pide el primer día de la segunda
+    daily = [(0, 0, 1 if d in (5, 6) else 0) for d in range(14)]
+    at_most_two_nights = (3, 1, 1, 0, 2, 2, 0, "span")
+    problem = inputs(daily, requests=[(0, 3, 7, -10)], shift_constraints=[at_most_two_nights])
+    status, schedule = RollingHorizon(1, 2, problem, 1).solve(PARAMS)
+    assert schedule[0, 5:7].tolist() == [3, 3]
+    assert schedule[0, 7] != 3
@@ -0,0 +1,91 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from scenario import parse_team  # noqa: E402
+
+EMPLOYEES = "name,tags\nAna,noches;senior\nLuis,\nEva,noches\n"
+FIXED = "employee,shift,day,week\nAna,libre,lunes,1\nLuis,Mañana,martes,2\n"
+REQUESTS = "employee,shift,day,weight\nEva,noche,domingo,-2\nAna,tarde,lunes,3\n"
+
+
+def scenario(**overrides):
+    data = dict(
+        employees="employees.csv",
+        num_weeks=2,
+        fixed_assignments="fixed.csv",
+        requests="requests.csv",
+        qualifications={"noche": "noches"},
+        weekly_cover_demands=[[1, 1, 0]] * 7,
+        excess_cover_penalties=[2, 2, 5],
+    )
+    data.update(overrides)
+    return data
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for name, text in (("employees.csv", EMPLOYEES), ("fixed.csv", FIXED), ("requests.csv", REQUESTS)):
+        (tmp_path / name).write_text(text, encoding="utf-8")
+    return tmp_path
+
+
+def test_csv_tables(data_dir):
+    team = parse_team(scenario(), data_dir)
+    assert team.employees == ["Ana", "Luis", "Eva"]
+    assert team.tags == {"noches": (0, 2), "senior": (0,)}
+    assert team.eligible[:, 3].tolist() == [True, False, True]
+    assert team.inputs["fixed_assignments"] == [(0, 0, 0), (1, 1, 8)]
+    assert team.inputs["requests"] == [(2, 3, 6, -2), (0, 2, 0, 3)]
+
+
+def test_quoted_csv_matches_the_plain_one(data_dir):
+    (data_dir / "quoted.csv").write_text('employee,shift,day,week\n"Ana",libre,lunes,1\nLuis,"Mañana",martes,2\n',
+                                         encoding="utf-8")
+    team = parse_team(scenario(fixed_assignments="quoted.csv"), data_dir)
+    assert team.inputs["fixed_assignments"] == [(0, 0, 0), (1, 1, 8)]
+
+
+@pytest.mark.parametrize("table", [
+    "employee , shift,day, week\n Ana,libre , lunes,1\nLuis,\tMañana,martes , 2 \n\n",
+    'employee , shift,day, week\n"Ana ",libre , lunes,1\nLuis,"Mañana"  ,martes , 2 \n',
+])
+def test_fields_are_stripped(data_dir, table):
+    (data_dir / "spaces.csv").write_text(table, encoding="utf-8")
+    team = parse_team(scenario(fixed_assignments="spaces.csv"), data_dir)
+    assert team.inputs["fixed_assignments"] == [(0, 0, 0), (1, 1, 8)]
+
+
+@pytest.mark.parametrize("table, message", [
+    ("employee,shift,day\nMarta,libre,lunes\n", "Empleados no reconocidos: Marta"),
+    ("employee,shift,day\nAna,siesta,lunes\n", "Turnos no reconocidos: siesta"),
+    ("employee,shift,day,week\nAna,libre,lunes,3\n", "Semana 3 fuera del horizonte"),
+    ("employee,day\nAna,lunes\n", "Falta la columna 'shift'"),
+    ("employee,shift,day\nAna,libre\n", "no tienen las 3 columnas"),
+    ("employee,shift,day\nLuis,noche,lunes\n", "Luis no puede hacer el turno 3"),
+])
+def test_invalid_tables(data_dir, table, message):
+    (data_dir / "bad.csv").write_text(table, encoding="utf-8")
+    with pytest.raises(ValueError, match=message):
+        parse_team(scenario(fixed_assignments="bad.csv"), data_dir)
+
+
+def test_invalid_demands(data_dir):
+    with pytest.raises(ValueError, match="necesita 3 valores"):
+        parse_team(scenario(weekly_cover_demands=[[1, 1]] * 7), data_dir)
+    with pytest.raises(ValueError, match="necesita 7 filas .* o 14 .* y tiene 8"):
+        parse_team(scenario(weekly_cover_demands=[[1, 1, 0]] * 8), data_dir)
+    daily = parse_team(scenario(weekly_cover_demands=[[1, 1, 0]] * 14), data_dir)
+    assert len(daily.inputs["weekly_cover_demands"]) == 14
+    with pytest.raises(ValueError, match="excess_cover_penalties"):
+        parse_team(scenario(excess_cover_penalties=[2, 2]), data_dir)
+
+
+def test_tables_outside_the_data_directory(data_dir):
+    with pytest.raises(ValueError, match="no puede leer ficheros"):
+        parse_team(scenario(), None)
+    with pytest.raises(ValueError, match="fuera del directorio de datos"):
+        parse_team(scenario(requests="../requests.csv"), data_dir, confine=True)
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+SRC = os.path.join(os.path.dirname(__file__), "..", "src")
+sys.path.insert(0, SRC)
+
+from service_client import ServiceClient  # noqa: E402
+
+with open(os.path.join(os.path.dirname(__file__), "..", "scenarios", "main.json"), encoding="utf-8") as f:
+    SCENARIO = json.load(f)
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    """Servicio en un proceso aparte (un trabajo a la vez, dos trabajos terminados guardados)."""
+    path = str(tmp_path / "service.sock")
+    process = subprocess.Popen([sys.executable, os.path.join(SRC, "service.py"), f"--socket={path}", "--jobs=1",
+                                "--workers=1", "--keep_jobs=2"], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.time() + 30
+    while not os.path.exists(path):
+        assert process.poll() is None and time.time() < deadline, "El servicio no ha arrancado."
+        time.sleep(0.05)
+    yield path
+    # Al interrumpirlo, close() cancela los trabajos que quedan y el proceso termina sin error
+    process.send_signal(signal.SIGINT)
+    _, stderr = process.communicate(timeout=30)
+    assert process.returncode == 0, stderr.decode()
+
+
+def run(socket_path, session):
+    async def main():
+        client = await ServiceClient.connect(socket_path=socket_path)
+        try:
+            return await session(client)
+        finally:
+            await client.close()
+    return asyncio.run(main())
+
+
+async def wait(client, job_id):
+    async for event in client.watch(job_id):
+        if event["event"] == "done":
+            return event
+
+
+def test_submit_and_poll(socket_path):
+    async def session(client):
+        job_id = await client.submit(SCENARIO, time_limit=0.5)
+        assert (await client.status(job_id))["state"] in ("queued", "running")
+        await wait(client, job_id)
+        return await client.status(job_id, schedule=True)
+
+    job = run(socket_path, session)
+    assert job["state"] == "done"
+    assert job["status"] in ("OPTIMAL", "FEASIBLE")
+    assert len(job["schedule"]) == SCENARIO["num_employees"]
+    assert len(job["schedule"][0]) == 7 * SCENARIO["num_weeks"]
+
+
+def test_watch_streams_progress_until_done(socket_path):
+    async def session(client):
+        job_id = await client.submit(SCENARIO, time_limit=1)
+        return [event async for event in client.watch(job_id)]
+
+    events = run(socket_path, session)
+    assert events[-1]["event"] == "done" and events[-1]["state"] == "done"
+    progress = [event["objective"] for event in events[:-1]]
+    assert progress and all(event["event"] == "progress" for event in events[:-1])
+    assert progress == sorted(progress, reverse=True)
+    assert progress[-1] == events[-1]["objective"]
+
+
+def test_cancel_running_and_queued_jobs(socket_path):
+    async def session(client):
+        running = await client.submit(SCENARIO, time_limit=60)
+        queued = await client.submit(SCENARIO, time_limit=60)
+        while (await client.status(running))["state"] != "running":
+            await asyncio.sleep(0.05)
+        assert (await client.cancel(queued))["state"] == "cancelled"
+        await client.cancel(running)
+        return await wait(client, running)
+
+    start = time.time()
+    done = run(socket_path, session)
+    assert done["state"] == "cancelled"
+    assert time.time() - start < 30
+
+
+def test_finished_jobs_are_evicted(socket_path):
+    async def session(client):
+        job_ids = [await client.submit(SCENARIO, time_limit=0.2) for _ in range(3)]
+        for job_id in job_ids:
+            await wait(client, job_id)
+        with pytest.raises(RuntimeError, match="no encontrado"):
+            await client.status(job_ids[0])
+        jobs = await client.list()
+        # Al cerrar el servicio con estos pendientes, cancelar el de la cola olvida otro terminado
+        await client.submit(SCENARIO, time_limit=60)
+        await client.submit(SCENARIO, time_limit=60)
+        return job_ids, jobs
+
+    job_ids, jobs = run(socket_path, session)
+    assert [job["job_id"] for job in jobs] == job_ids[1:]
+
+
+def test_invalid_scenario_does_not_stop_the_queue(socket_path):
+    async def session(client):
+        with pytest.raises(RuntimeError, match="ValueError"):
+            await client.submit({**SCENARIO, "fixed_assignments": "tabla.csv"})
+        job_id = await client.submit(SCENARIO, time_limit=0.2)
+        return await wait(client, job_id)
+
+    assert run(socket_path, session)["state"] == "done"